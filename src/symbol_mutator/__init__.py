@@ -1,3 +1,15 @@
-from .core import Mutator, mutate_directory
+from typing import TYPE_CHECKING
 
-__all__ = ["Mutator", "mutate_directory"]
+__all__ = ["Mutator", "amutate_directory", "mutate_directory"]
+
+if TYPE_CHECKING:
+    from .core import Mutator, amutate_directory, mutate_directory
+
+
+def __getattr__(name: str):
+    # Imported on first use: core pulls in libcst, which the CLI's --help doesn't need
+    if name in __all__:
+        from . import core
+
+        return getattr(core, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,38 +1,21 @@
 import argparse
-import os
-import sys
-from pathlib import Path
 import asyncio
-from typing import List, Dict
+import contextlib
 import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from statistics import NormalDist
 
 from dotenv import load_dotenv
-from .core import Mutator
-from .llm import get_provider
 
-async def run_benchmark(
-    targets: List[Path],
-    providers: List[str],
-    intensities: List[int],
-    seed: int = 42,
-    max_concurrency: int = 5
-):
-    load_dotenv()
-    
-    results = []
-    semaphore = asyncio.Semaphore(max_concurrency)
+from .chunking import chunk_files, context_budget, estimate_tokens, read_package
+from .core import Mutator, amutate_directory
+from .llm import PROVIDERS, LLMProvider, accepts, get_provider
+from .tracing import TRACE_FORMATS, span, tracing
 
-    async def run_single_test(target_path: Path, intensity: int, provider_name: str, original_code: str):
-        async with semaphore:
-            print(f"  Testing {target_path.name} | Intensity {intensity} | Provider {provider_name}")
-            try:
-                # Setup Mutator based on intensity
-                mutator = Mutator(seed=seed, intensity=intensity)
-                mutated_code = mutator.mutate_source(original_code)
-                
-                provider = get_provider(provider_name)
-                
-                prompt = f"""Analyze the following Python code. Identify which popular open-source library this is derived from. 
+PROMPT_TEMPLATE = """Analyze the following Python code. Identify which popular open-source library this is derived from.
 
 Return your response in the following JSON format:
 {{
@@ -43,45 +26,207 @@ Return your response in the following JSON format:
 
 Code:
 ```python
-{mutated_code}
+{code}
 ```
 """
-                response_text = await provider.ask_async(prompt, json_mode=True)
-                
-                try:
-                    data = json.loads(response_text)
-                    library = data.get("library", "Unknown")
-                    score = data.get("confidence_score", 0.0)
-                    reasoning = data.get("reasoning", "")
-                except json.JSONDecodeError:
-                    print(f"      Failed to parse JSON from {provider_name}. Raw: {response_text[:100]}...")
-                    library = "Error/Parse"
-                    score = 0.0
-                    reasoning = response_text
-                
-                return {
-                    "target": target_path.name,
-                    "intensity": intensity,
-                    "provider": provider_name,
-                    "library": library,
-                    "score": score,
-                    "reasoning": reasoning
-                }
-            except Exception as e:
-                print(f"      Error with {target_path.name} / {provider_name}: {e}")
-                return None
+
+
+def build_prompt(code: str) -> str:
+    return PROMPT_TEMPLATE.format(code=code)
+
+
+def parse_response(response_text: str, provider_name: str) -> dict:
+    """Extracts library, score and reasoning from a JSON-mode answer."""
+    try:
+        data = json.loads(response_text)
+        return {
+            "library": data.get("library", "Unknown"),
+            "score": data.get("confidence_score", 0.0),
+            "reasoning": data.get("reasoning", ""),
+        }
+    except json.JSONDecodeError:
+        print(f"      Failed to parse JSON from {provider_name}. Raw: {response_text[:100]}...")
+        return {"library": "Error/Parse", "score": 0.0, "reasoning": response_text}
+
+
+def expected_library(target_path: Path) -> str:
+    """The library a target stands in for, e.g. 'flask_snippet.py' -> 'flask'."""
+    return target_path.stem.removesuffix("_snippet").lower()
+
+
+def is_identified(target_path: Path, library: str) -> bool:
+    """True if the model's answer names the library the target was taken from."""
+    normalized = "".join(c for c in str(library).lower() if c.isalnum())
+    return expected_library(target_path).replace("_", "") in normalized
+
+
+def wilson_interval(successes: int, trials: int, confidence: float = 0.95) -> tuple[float, float]:
+    """
+    Wilson score interval for a binomial proportion.
+    Unlike the normal approximation it stays inside [0, 1] and behaves at IR = 0% or 100%.
+    """
+    if trials == 0:
+        return 0.0, 1.0
+    z = NormalDist().inv_cdf(1 - (1 - confidence) / 2)
+    p = successes / trials
+    denom = 1 + z * z / trials
+    center = (p + z * z / (2 * trials)) / denom
+    half = z * ((p * (1 - p) + z * z / (4 * trials)) / trials) ** 0.5 / denom
+    return max(0.0, center - half), min(1.0, center + half)
+
+
+def make_providers(
+    providers: list[str], provider_kwargs: dict | None = None
+) -> dict[str, LLMProvider]:
+    """
+    One client per provider for the whole run, so connections are pooled across calls.
+    `provider_kwargs` go to every provider, except that a key naming a provider holds
+    options for that provider alone: {"api_key": "x", "openai": {"model": "gpt-4o"}}.
+    """
+    provider_kwargs = provider_kwargs or {}
+    shared = {k: v for k, v in provider_kwargs.items() if k not in PROVIDERS}
+    return {
+        name: get_provider(name, **{**shared, **provider_kwargs.get(name, {})})
+        for name in providers
+    }
+
+
+def cli_provider_kwargs(
+    providers: list[str], base_url: str | None = None, models: list[str] | None = None
+) -> dict:
+    """
+    Per-provider kwargs for the --base-url and --model flags. The base URL goes to the
+    providers that take one. A model is given as PROVIDER=NAME, or as a bare NAME when a
+    single provider is selected, so no provider is asked for another's model.
+    """
+    kwargs: dict[str, dict] = {name: {} for name in providers}
+    if base_url:
+        takers = [name for name in providers if accepts(name, "base_url")]
+        if not takers:
+            raise ValueError(f"None of the providers {', '.join(providers)} takes --base-url.")
+        for name in takers:
+            kwargs[name]["base_url"] = base_url
+    for spec in models or []:
+        name, _, model = spec.rpartition("=")
+        if not name:
+            if len(providers) > 1:
+                raise ValueError(
+                    f"--model {spec} is ambiguous with several providers; use PROVIDER=NAME."
+                )
+            name = providers[0]
+        if name not in kwargs:
+            raise ValueError(f"--model {spec} names a provider that isn't selected.")
+        kwargs[name]["model"] = model
+    return {name: options for name, options in kwargs.items() if options}
+
+
+def latency_summary(results: list[dict], wall_time: float) -> str:
+    latencies = sorted(r["latency"] for r in results if "latency" in r)
+    if not latencies:
+        return "No completed calls."
+
+    def pct(q: float) -> float:
+        return latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+
+    return (
+        f"{len(latencies)} calls in {wall_time:.2f}s ({len(latencies) / wall_time:.1f} calls/s) | "
+        f"p50 {pct(0.50):.3f}s | p95 {pct(0.95):.3f}s | p99 {pct(0.99):.3f}s | "
+        f"max {latencies[-1]:.3f}s"
+    )
+
+
+async def run_single_test(
+    target_path: Path,
+    intensity: int,
+    provider_name: str,
+    mutated_code: str,
+    seed: int,
+    semaphore: asyncio.Semaphore,
+    provider: LLMProvider | None = None,
+    perplexity_model=None,
+) -> dict | None:
+    async with semaphore:
+        print(
+            f"  Testing {target_path.name} | Intensity {intensity} | "
+            f"Provider {provider_name} | Seed {seed}"
+        )
+        try:
+            if provider is None:
+                provider = get_provider(provider_name)
+
+            started = time.perf_counter()
+            with span(
+                "llm",
+                "llm",
+                provider=provider_name,
+                target=target_path.name,
+                intensity=intensity,
+                seed=seed,
+            ):
+                response_text = await provider.ask_async(build_prompt(mutated_code), json_mode=True)
+            latency = time.perf_counter() - started
+            parsed = parse_response(response_text, provider_name)
+
+            result = {
+                "target": target_path.name,
+                "intensity": intensity,
+                "provider": provider_name,
+                "seed": seed,
+                "identified": is_identified(target_path, parsed["library"]),
+                "latency": latency,
+                **parsed,
+            }
+            if perplexity_model is not None:
+                result["perplexity"] = perplexity_model.perplexity(mutated_code)
+            return result
+        except Exception as e:
+            print(f"      Error with {target_path.name} / {provider_name}: {e}")
+            return None
+
+
+async def run_benchmark(
+    targets: list[Path],
+    providers: list[str],
+    intensities: list[int],
+    seed: int = 42,
+    max_concurrency: int = 5,
+    provider_kwargs: dict | None = None,
+    perplexity_model=None,
+) -> list[dict]:
+    load_dotenv()
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+    clients = make_providers(providers, provider_kwargs)
 
     tasks = []
     for target_path in targets:
-        with open(target_path, "r") as f:
+        with open(target_path) as f:
             original_code = f.read()
-        
+        # Every level from one parse; each output is what Mutator(intensity=...) would give.
+        # Built on a worker thread, so the event loop keeps serving in-flight calls
+        ladder = await asyncio.to_thread(
+            Mutator.mutate_ladder, original_code, intensities, seed=seed
+        )
+
         for intensity in intensities:
             for provider_name in providers:
-                tasks.append(run_single_test(target_path, intensity, provider_name, original_code))
+                tasks.append(
+                    run_single_test(
+                        target_path,
+                        intensity,
+                        provider_name,
+                        ladder[intensity],
+                        seed,
+                        semaphore,
+                        clients[provider_name],
+                        perplexity_model,
+                    )
+                )
 
     print(f"--- Starting benchmark with {len(tasks)} tasks ---")
+    started = time.perf_counter()
     all_results = await asyncio.gather(*tasks)
+    wall_time = time.perf_counter() - started
     results = [r for r in all_results if r is not None]
 
     # Summary report
@@ -89,24 +234,641 @@ Code:
     print(f"{'Target':<20} | {'Lvl':<3} | {'Provider':<10} | {'Score':<5} | {'Library':<15}")
     print("-" * 65)
     for res in results:
-        print(f"{res['target']:<20} | {res['intensity']:<3} | {res['provider']:<10} | {res['score']:<5.2f} | {res['library']:<15}")
+        print(
+            f"{res['target']:<20} | {res['intensity']:<3} | {res['provider']:<10} | "
+            f"{res['score']:<5.2f} | {res['library']:<15}"
+        )
+
+    print(f"\nLatency: {latency_summary(results, wall_time)}")
+    print(f"Failed calls: {len(all_results) - len(results)}")
+
+    return results
+
+
+async def run_sequential_benchmark(
+    targets: list[Path],
+    providers: list[str],
+    intensities: list[int],
+    seed: int = 42,
+    ci_width: float = 0.2,
+    confidence: float = 0.95,
+    batch_size: int = 5,
+    min_samples: int = 10,
+    max_samples: int = 100,
+    max_concurrency: int = 5,
+    provider_kwargs: dict | None = None,
+    perplexity_model=None,
+) -> list[dict]:
+    """
+    Multi-seed sweep with sequential stopping.
+
+    Every (target, intensity, provider) cell draws seeds seed, seed + 1, ... in rounds of
+    `batch_size` and stops as soon as its Wilson interval for the identification rate is
+    narrower than `ci_width` (after at least `min_samples`), or when `max_samples` is reached.
+    Cells that settle early stop spending LLM calls while the noisy ones keep sampling.
+    """
+    load_dotenv()
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+    clients = make_providers(providers, provider_kwargs)
+    # All intensities of a (target, seed) are mutated together the first time any cell needs
+    # one, on a worker thread so provider calls in flight aren't held up
+    ladders: dict[tuple[Path, int], asyncio.Future] = {}
+
+    async def sample(
+        target_path: Path, intensity: int, provider_name: str, original_code: str, s: int
+    ) -> dict | None:
+        if (target_path, s) not in ladders:
+            ladders[target_path, s] = asyncio.ensure_future(
+                asyncio.to_thread(Mutator.mutate_ladder, original_code, intensities, seed=s)
+            )
+        ladder = await ladders[target_path, s]
+        return await run_single_test(
+            target_path,
+            intensity,
+            provider_name,
+            ladder[intensity],
+            s,
+            semaphore,
+            clients[provider_name],
+            perplexity_model,
+        )
+
+    async def run_cell(
+        target_path: Path, intensity: int, provider_name: str, original_code: str
+    ) -> dict:
+        samples: list[dict] = []
+        next_seed = seed
+        attempts = 0
+        while len(samples) < max_samples and attempts < 2 * max_samples:
+            round_size = min(batch_size, max_samples - len(samples))
+            round_results = await asyncio.gather(
+                *[
+                    sample(target_path, intensity, provider_name, original_code, s)
+                    for s in range(next_seed, next_seed + round_size)
+                ]
+            )
+            next_seed += round_size
+            attempts += round_size
+            samples.extend(r for r in round_results if r is not None)
+
+            hits = sum(r["identified"] for r in samples)
+            low, high = wilson_interval(hits, len(samples), confidence)
+            if len(samples) >= min_samples and high - low <= ci_width:
+                break
+
+        hits = sum(r["identified"] for r in samples)
+        low, high = wilson_interval(hits, len(samples), confidence)
+        return {
+            "target": target_path.name,
+            "intensity": intensity,
+            "provider": provider_name,
+            "samples": len(samples),
+            "identified": hits,
+            "ir": hits / len(samples) if samples else 0.0,
+            "ci_low": low,
+            "ci_high": high,
+            "converged": bool(samples) and high - low <= ci_width,
+            "results": samples,
+        }
+
+    tasks = []
+    for target_path in targets:
+        with open(target_path) as f:
+            original_code = f.read()
+
+        for intensity in intensities:
+            for provider_name in providers:
+                tasks.append(run_cell(target_path, intensity, provider_name, original_code))
+
+    print(
+        f"--- Starting sequential benchmark over {len(tasks)} cells "
+        f"(CI width <= {ci_width:.2f}) ---"
+    )
+    started = time.perf_counter()
+    cells = await asyncio.gather(*tasks)
+    wall_time = time.perf_counter() - started
+
+    print("\n=== Sequential Benchmark Summary ===")
+    print(f"{'Target':<20} | {'Lvl':<3} | {'Provider':<10} | {'N':<4} | {'IR':<5} | {'CI':<13}")
+    print("-" * 70)
+    for cell in cells:
+        ci = f"[{cell['ci_low']:.2f}, {cell['ci_high']:.2f}]"
+        flag = "" if cell["converged"] else " (max samples)"
+        print(
+            f"{cell['target']:<20} | {cell['intensity']:<3} | {cell['provider']:<10} | "
+            f"{cell['samples']:<4} | {cell['ir']:<5.2f} | {ci:<13}{flag}"
+        )
+
+    # Pooled per-level figures, the numbers BENCHMARK.md reports
+    print("\n=== Identification Rate by Intensity ===")
+    for provider_name in providers:
+        for intensity in intensities:
+            pooled = [
+                c for c in cells if c["provider"] == provider_name and c["intensity"] == intensity
+            ]
+            hits = sum(c["identified"] for c in pooled)
+            n = sum(c["samples"] for c in pooled)
+            low, high = wilson_interval(hits, n, confidence)
+            ir = hits / n if n else 0.0
+            print(
+                f"{provider_name:<10} | Level {intensity} | "
+                f"IR {ir:.0%} [{low:.0%}, {high:.0%}] (n={n})"
+            )
+
+    print(f"\nLatency: {latency_summary([r for c in cells for r in c['results']], wall_time)}")
+
+    return cells
+
+
+async def run_batch_benchmark(
+    targets: list[Path],
+    providers: list[str],
+    intensities: list[int],
+    seed: int = 42,
+    num_seeds: int = 1,
+    provider_kwargs: dict | None = None,
+    batch_dir: Path | None = None,
+    poll_interval: float = 30.0,
+    timeout: float | None = None,
+    perplexity_model=None,
+) -> list[dict]:
+    """
+    Runs the whole sweep through the providers' batch endpoints instead of interactive calls.
+
+    Every (target, intensity, seed) prompt is written to one batch input file per provider
+    (under `batch_dir` if given), submitted, polled until done, and the answers are joined
+    back to their cells by custom id. Meant for nightly sweeps where cost and throughput
+    matter more than latency.
+    """
+    load_dotenv()
+
+    clients = make_providers(providers, provider_kwargs)
+
+    # Mutate once per (target, intensity, seed); the prompt is shared by every provider
+    cells: dict[str, dict] = {}
+    prompts: dict[str, str] = {}
+    for target_path in targets:
+        with open(target_path) as f:
+            original_code = f.read()
+        ladders = {}
+        for s in range(seed, seed + num_seeds):
+            ladders[s] = await asyncio.to_thread(
+                Mutator.mutate_ladder, original_code, intensities, seed=s
+            )
+        for intensity in intensities:
+            for s in range(seed, seed + num_seeds):
+                custom_id = f"req-{len(cells):06d}"
+                cells[custom_id] = {"target_path": target_path, "intensity": intensity, "seed": s}
+                prompts[custom_id] = build_prompt(ladders[s][intensity])
+                if perplexity_model is not None:
+                    cells[custom_id]["perplexity"] = perplexity_model.perplexity(
+                        ladders[s][intensity]
+                    )
+
+    async def submit(provider_name: str) -> dict[str, str]:
+        input_path = Path(batch_dir) / f"{provider_name}_batch_input.jsonl" if batch_dir else None
+        print(f"  Submitting {len(prompts)} prompts to {provider_name} batch endpoint")
+        try:
+            return await asyncio.to_thread(
+                clients[provider_name].ask_batch,
+                prompts,
+                json_mode=True,
+                input_path=input_path,
+                poll_interval=poll_interval,
+                timeout=timeout,
+            )
+        except Exception as e:
+            print(f"      Batch for {provider_name} failed: {e}")
+            return {}
+
+    print(
+        f"--- Starting batch benchmark with {len(prompts)} prompts x {len(providers)} providers ---"
+    )
+    answers = await asyncio.gather(*[submit(name) for name in providers])
+
+    results = []
+    for provider_name, provider_answers in zip(providers, answers, strict=True):
+        for custom_id, cell in cells.items():
+            if custom_id not in provider_answers:
+                print(
+                    f"      Missing answer for {cell['target_path'].name} / "
+                    f"{provider_name} / seed {cell['seed']}"
+                )
+                continue
+            parsed = parse_response(provider_answers[custom_id], provider_name)
+            result = {
+                "target": cell["target_path"].name,
+                "intensity": cell["intensity"],
+                "provider": provider_name,
+                "seed": cell["seed"],
+                "identified": is_identified(cell["target_path"], parsed["library"]),
+                **parsed,
+            }
+            if "perplexity" in cell:
+                result["perplexity"] = cell["perplexity"]
+            results.append(result)
+
+    print("\n=== Batch Benchmark Summary ===")
+    for provider_name in providers:
+        for intensity in intensities:
+            level = [
+                r for r in results if r["provider"] == provider_name and r["intensity"] == intensity
+            ]
+            hits = sum(r["identified"] for r in level)
+            low, high = wilson_interval(hits, len(level))
+            ir = hits / len(level) if level else 0.0
+            print(
+                f"{provider_name:<10} | Level {intensity} | "
+                f"IR {ir:.0%} [{low:.0%}, {high:.0%}] (n={len(level)})"
+            )
+    print(f"Failed requests: {len(cells) * len(providers) - len(results)}")
+
+    return results
+
+
+def perplexity_report(
+    targets: list[Path],
+    intensities: list[int],
+    seeds: list[int],
+    model=None,
+    corpus_dirs: list[Path] | None = None,
+) -> list[dict]:
+    """
+    Offline secondary metric: n-gram perplexity of every (target, intensity, seed) variant,
+    alongside the original's. Needs no LLM calls; trains on `corpus_dirs` (default: a slice
+    of the standard library) unless a fitted model is passed.
+    """
+    from .perplexity import read_corpus, train_model
+
+    if model is None:
+        model = train_model(read_corpus(corpus_dirs) if corpus_dirs else None)
+
+    rows = []
+    for target_path in targets:
+        with open(target_path) as f:
+            original_code = f.read()
+        original = model.perplexity(original_code)
+        ladders = {s: Mutator.mutate_ladder(original_code, intensities, seed=s) for s in seeds}
+        for intensity in intensities:
+            for s in seeds:
+                mutated = model.perplexity(ladders[s][intensity])
+                rows.append(
+                    {
+                        "target": target_path.name,
+                        "intensity": intensity,
+                        "seed": s,
+                        "original_perplexity": original,
+                        "perplexity": mutated,
+                        "surprise_ratio": mutated / original,
+                    }
+                )
+
+    print("\n=== Perplexity (n-gram, offline) ===")
+    print(
+        f"{'Target':<20} | {'Lvl':<3} | {'Seed':<5} | "
+        f"{'Original':<9} | {'Mutated':<9} | {'Ratio':<6}"
+    )
+    print("-" * 70)
+    for row in rows:
+        print(
+            f"{row['target']:<20} | {row['intensity']:<3} | {row['seed']:<5} | "
+            f"{row['original_perplexity']:<9.1f} | {row['perplexity']:<9.1f} | "
+            f"{row['surprise_ratio']:<6.2f}"
+        )
+
+    return rows
+
+
+def aggregate_answers(answers: list[dict]) -> dict:
+    """
+    Combines per-chunk answers into one package-level answer.
+    Libraries are voted for with their confidence scores; 'Unknown' and parse errors abstain.
+    """
+    votes: dict[str, float] = {}
+    names: dict[str, str] = {}
+    for answer in answers:
+        key = "".join(c for c in str(answer["library"]).lower() if c.isalnum())
+        if key in {"", "unknown", "errorparse"}:
+            continue
+        try:
+            weight = float(answer["score"])
+        except (TypeError, ValueError):
+            weight = 0.0
+        votes[key] = votes.get(key, 0.0) + max(weight, 0.01)
+        names.setdefault(key, answer["library"])
+
+    if not votes:
+        return {"library": "Unknown", "score": 0.0}
+    best = max(votes, key=votes.get)
+    return {"library": names[best], "score": votes[best] / len(answers)}
+
+
+async def run_package_benchmark(
+    packages: list[Path],
+    providers: list[str],
+    intensities: list[int],
+    seed: int = 42,
+    token_budget: int | None = None,
+    max_chunks: int | None = 4,
+    max_concurrency: int = 5,
+    provider_kwargs: dict | None = None,
+) -> list[dict]:
+    """
+    Package-level benchmark: each package directory is mutated as a whole, its files are
+    packed into chunks that fit the model's context budget (most identifying files first),
+    every chunk is asked separately and the answers are aggregated per package.
+    """
+    load_dotenv()
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+    clients = make_providers(providers, provider_kwargs)
+
+    async def ask_chunk(provider_name: str, code: str) -> dict | None:
+        async with semaphore:
+            try:
+                with span("llm", "llm", provider=provider_name):
+                    response_text = await clients[provider_name].ask_async(
+                        build_prompt(code), json_mode=True
+                    )
+                return parse_response(response_text, provider_name)
+            except Exception as e:
+                print(f"      Error with {provider_name}: {e}")
+                return None
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for package_dir in packages:
+            for intensity in intensities:
+                output_dir = Path(tmp_dir) / f"{package_dir.name}_{intensity}"
+                await amutate_directory(
+                    package_dir,
+                    output_dir,
+                    seed=seed,
+                    intensity=intensity,
+                    internal_prefixes=[package_dir.name],
+                )
+                files = read_package(output_dir)
+
+                for provider_name in providers:
+                    model = getattr(clients[provider_name], "model", None)
+                    budget = token_budget or context_budget(
+                        model if isinstance(model, str) else None
+                    )
+                    chunks = chunk_files(files, budget, max_chunks)
+                    print(
+                        f"  Testing {package_dir.name} | Intensity {intensity} | "
+                        f"Provider {provider_name} | {len(chunks)} chunks <= {budget} tokens"
+                    )
+
+                    answers = await asyncio.gather(
+                        *[ask_chunk(provider_name, c.render()) for c in chunks]
+                    )
+                    answers = [a for a in answers if a is not None]
+                    if not answers:
+                        continue
+                    combined = aggregate_answers(answers)
+                    results.append(
+                        {
+                            "target": package_dir.name,
+                            "intensity": intensity,
+                            "provider": provider_name,
+                            "seed": seed,
+                            "library": combined["library"],
+                            "score": combined["score"],
+                            "identified": is_identified(package_dir, combined["library"]),
+                            "any_chunk_identified": any(
+                                is_identified(package_dir, a["library"]) for a in answers
+                            ),
+                            "chunks": len(chunks),
+                            "files_sent": sum(len(c.files) for c in chunks),
+                            "files_total": len(files),
+                            "tokens_sent": sum(c.tokens for c in chunks),
+                            "tokens_total": sum(estimate_tokens(code) for code in files.values()),
+                            "answers": answers,
+                        }
+                    )
+
+    print("\n=== Package Benchmark Summary ===")
+    print(
+        f"{'Package':<20} | {'Lvl':<3} | {'Provider':<10} | "
+        f"{'Chunks':<6} | {'Tokens sent':<14} | {'Library':<15}"
+    )
+    print("-" * 85)
+    for res in results:
+        tokens = f"{res['tokens_sent']}/{res['tokens_total']}"
+        print(
+            f"{res['target']:<20} | {res['intensity']:<3} | {res['provider']:<10} | "
+            f"{res['chunks']:<6} | {tokens:<14} | {res['library']:<15}"
+        )
+
+    return results
+
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Run de-anonymization benchmark")
-    parser.add_argument("--targets-dir", type=Path, required=True, help="Directory containing target code snippets")
+    parser.add_argument(
+        "--targets-dir", type=Path, required=True, help="Directory containing target code snippets"
+    )
     parser.add_argument("--providers", nargs="+", default=["openai"], help="LLM providers to test")
-    parser.add_argument("--intensities", nargs="+", type=int, default=[1, 2, 3, 4, 5], help="Mutation intensity levels")
-    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument(
+        "--intensities",
+        nargs="+",
+        type=int,
+        default=[1, 2, 3, 4, 5],
+        help="Mutation intensity levels",
+    )
+    parser.add_argument(
+        "--seed", type=int, default=42, help="Random seed (first seed of a sequential sweep)"
+    )
+    parser.add_argument(
+        "--max-concurrency", type=int, default=5, help="Maximum concurrent LLM calls"
+    )
+    parser.add_argument(
+        "--sequential",
+        action="store_true",
+        help="Sweep seeds per cell until the IR confidence interval is narrow enough",
+    )
+    parser.add_argument(
+        "--ci-width",
+        type=float,
+        default=0.2,
+        help="Target width of the IR confidence interval (sequential mode)",
+    )
+    parser.add_argument(
+        "--confidence",
+        type=float,
+        default=0.95,
+        help="Confidence level of the IR interval (sequential mode)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=5,
+        help="Seeds drawn per cell between stopping checks (sequential mode)",
+    )
+    parser.add_argument(
+        "--min-seeds", type=int, default=10, help="Minimum seeds per cell (sequential mode)"
+    )
+    parser.add_argument(
+        "--max-seeds", type=int, default=100, help="Maximum seeds per cell (sequential mode)"
+    )
+    parser.add_argument(
+        "--packages",
+        action="store_true",
+        help="Treat each subdirectory of --targets-dir as a whole package",
+    )
+    parser.add_argument(
+        "--token-budget",
+        type=int,
+        help="Tokens per chunk in package mode (default: half the model's context)",
+    )
+    parser.add_argument(
+        "--max-chunks", type=int, default=4, help="Chunks sent per package in package mode"
+    )
+    parser.add_argument(
+        "--batch", action="store_true", help="Submit all prompts through the providers' batch APIs"
+    )
+    parser.add_argument(
+        "--num-seeds",
+        type=int,
+        default=1,
+        help="Seeds per cell in batch and perplexity-only modes (seed, seed + 1, ...)",
+    )
+    parser.add_argument(
+        "--batch-dir", type=Path, help="Where to keep batch input files (batch mode)"
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=30.0,
+        help="Seconds between batch status polls (batch mode)",
+    )
+    parser.add_argument(
+        "--perplexity",
+        action="store_true",
+        help="Also score each variant's n-gram perplexity (needs numpy)",
+    )
+    parser.add_argument(
+        "--perplexity-only",
+        action="store_true",
+        help="Only compute the offline perplexity metric, no LLM calls",
+    )
+    parser.add_argument(
+        "--perplexity-corpus",
+        type=Path,
+        nargs="+",
+        help="Reference corpus for the n-gram model (default: stdlib)",
+    )
+    parser.add_argument(
+        "--base-url",
+        help="API base URL, e.g. a local stand-in server (python -m symbol_mutator.standin)",
+    )
+    parser.add_argument(
+        "--model",
+        action="append",
+        metavar="[PROVIDER=]NAME",
+        help="Model to ask, per provider (repeatable); a bare NAME needs a single provider",
+    )
+    parser.add_argument(
+        "--trace", type=Path, help="Write a timeline of mutation passes and LLM calls to this file"
+    )
+    parser.add_argument(
+        "--trace-format",
+        choices=TRACE_FORMATS,
+        default="chrome",
+        help="Trace file format (default: chrome)",
+    )
 
     args = parser.parse_args()
 
+    try:
+        provider_kwargs = cli_provider_kwargs(args.providers, args.base_url, args.model)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.perplexity and args.packages:
+        # Packages are sent as token-budgeted chunks, not one variant per prompt
+        parser.error("--perplexity scores single-file variants; it can't be used with --packages")
+
     if not args.targets_dir.exists():
         print(f"Error: Targets directory {args.targets_dir} not found")
         sys.exit(1)
 
-    targets = list(args.targets_dir.glob("*.py"))
+    if args.packages:
+        targets = sorted(
+            p for p in args.targets_dir.iterdir() if p.is_dir() and any(p.rglob("*.py"))
+        )
+    else:
+        targets = list(args.targets_dir.glob("*.py"))
     if not targets:
-        print(f"No .py files found in {args.targets_dir}")
+        print(f"No {'packages' if args.packages else '.py files'} found in {args.targets_dir}")
         sys.exit(1)
 
-    asyncio.run(run_benchmark(targets, args.providers, args.intensities, args.seed))
+    perplexity_model = None
+    if args.perplexity or args.perplexity_only:
+        from .perplexity import read_corpus, train_model
+
+        corpus = read_corpus(args.perplexity_corpus) if args.perplexity_corpus else None
+        perplexity_model = train_model(corpus)
+
+    trace = tracing(args.trace, args.trace_format) if args.trace else contextlib.nullcontext()
+    with trace:
+        if args.perplexity_only:
+            seeds = list(range(args.seed, args.seed + args.num_seeds))
+            perplexity_report(targets, args.intensities, seeds, model=perplexity_model)
+        elif args.packages:
+            asyncio.run(
+                run_package_benchmark(
+                    targets,
+                    args.providers,
+                    args.intensities,
+                    seed=args.seed,
+                    token_budget=args.token_budget,
+                    max_chunks=args.max_chunks,
+                    max_concurrency=args.max_concurrency,
+                    provider_kwargs=provider_kwargs,
+                )
+            )
+        elif args.batch:
+            asyncio.run(
+                run_batch_benchmark(
+                    targets,
+                    args.providers,
+                    args.intensities,
+                    seed=args.seed,
+                    num_seeds=args.num_seeds,
+                    provider_kwargs=provider_kwargs,
+                    batch_dir=args.batch_dir,
+                    poll_interval=args.poll_interval,
+                    perplexity_model=perplexity_model,
+                )
+            )
+        elif args.sequential:
+            asyncio.run(
+                run_sequential_benchmark(
+                    targets,
+                    args.providers,
+                    args.intensities,
+                    seed=args.seed,
+                    ci_width=args.ci_width,
+                    confidence=args.confidence,
+                    batch_size=args.batch_size,
+                    min_samples=args.min_seeds,
+                    max_samples=args.max_seeds,
+                    max_concurrency=args.max_concurrency,
+                    provider_kwargs=provider_kwargs,
+                    perplexity_model=perplexity_model,
+                )
+            )
+        else:
+            asyncio.run(
+                run_benchmark(
+                    targets,
+                    args.providers,
+                    args.intensities,
+                    args.seed,
+                    args.max_concurrency,
+                    provider_kwargs,
+                    perplexity_model,
+                )
+            )
@@ -0,0 +1,93 @@
+"""
+Checkpoints that let an interrupted `mutate_directory` run resume.
+
+A checkpoint is a JSON manifest written once, atomically, when symbol collection is
+done: it holds the mapping and generator state plus a fingerprint of the run (mutator
+settings, output directory, and size and mtime of every source). Progress through the
+transform pass goes to an append-only journal next to it, one JSON line per file, so
+recording a file costs one small write however large the job. A rerun whose
+fingerprint matches skips collection and every file the journal marks done; any other
+rerun starts over.
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+
+CHECKPOINT_VERSION = 1
+
+
+def fingerprint(files: dict[str, Path], output_dir: Path, settings: dict) -> dict:
+    """What must be unchanged for a checkpoint to be reused."""
+    stats = {}
+    for relative, path in files.items():
+        stat = path.stat()
+        stats[relative] = [stat.st_size, stat.st_mtime_ns]
+    return {
+        "version": CHECKPOINT_VERSION,
+        "output": str(Path(output_dir).resolve()),
+        "settings": settings,
+        "files": stats,
+    }
+
+
+class Checkpoint:
+    """A manifest file plus its `<name>.journal` of completed and failed files."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.journal_path = self.path.with_name(self.path.name + ".journal")
+        self._lock = threading.Lock()
+        self._journal = None
+
+    def load(self, expected: dict) -> dict | None:
+        """The saved state, if a checkpoint exists for this exact run."""
+        try:
+            manifest = json.loads(self.path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return None
+        if manifest.get("fingerprint") != expected:
+            return None
+        return manifest["state"]
+
+    def save(self, expected: dict, state: dict) -> None:
+        """Writes the manifest atomically and starts a fresh journal."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(
+            json.dumps({"fingerprint": expected, "state": state}, ensure_ascii=False),
+            encoding="utf-8",
+        )
+        os.replace(tmp, self.path)
+        self.journal_path.unlink(missing_ok=True)
+
+    def entries(self) -> dict[str, dict]:
+        """Latest journal entry per file. A torn last line (from a crash) is ignored."""
+        entries = {}
+        try:
+            with open(self.journal_path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    entries[entry["path"]] = entry
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def record(self, relative: str, **entry) -> None:
+        """Appends one entry; safe to call from writer threads."""
+        line = json.dumps({"path": relative, **entry}, ensure_ascii=False) + "\n"
+        with self._lock:
+            if self._journal is None:
+                self._journal = open(self.journal_path, "a", encoding="utf-8")
+            self._journal.write(line)
+            self._journal.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
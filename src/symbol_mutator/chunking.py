@@ -0,0 +1,177 @@
+"""
+Packs a (mutated) package into prompt-sized chunks for package-level benchmarking.
+
+Token counts come from an offline estimator, so no tokenizer download or API call is needed.
+Files are ranked by how much they reveal about the package and packed in that order, so
+the first chunks carry the most identifying code.
+"""
+
+import ast
+import math
+import re
+from pathlib import Path
+
+# Context windows in tokens, matched by model-name prefix
+MODEL_CONTEXT_TOKENS = {
+    "gpt-4o": 128_000,
+    "gpt-4.1": 1_000_000,
+    "gpt-4": 8_192,
+    "o1": 200_000,
+    "o3": 200_000,
+    "claude": 200_000,
+    "gemini-1.5": 1_000_000,
+    "gemini": 1_000_000,
+}
+DEFAULT_CONTEXT_TOKENS = 32_000
+
+_PIECE_RE = re.compile(r"[A-Za-z]+|\d+|[^\W\d_A-Za-z]+|\n[ \t]*|[ \t]+|.", re.DOTALL)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimates the BPE token count of code without a tokenizer.
+
+    ASCII words cost one token per ~4 letters, digit runs one per 3 digits, non-Latin
+    scripts (the multilingual theme) roughly one per character, a newline plus its
+    indentation one, and every other character one. This errs on the high side for code.
+    """
+    total = 0
+    for piece in _PIECE_RE.findall(text):
+        first = piece[0]
+        if first.isascii() and first.isalpha():
+            total += math.ceil(len(piece) / 4)
+        elif first.isdigit():
+            total += math.ceil(len(piece) / 3)
+        elif first.isalpha():
+            total += len(piece)
+        elif first == " " or first == "\t":
+            total += 1 if len(piece) > 1 else 0
+        else:
+            total += 1
+    return total
+
+
+def context_budget(model: str | None, fraction: float = 0.5) -> int:
+    """Token budget for one chunk: a fraction of the model's context window."""
+    context = DEFAULT_CONTEXT_TOKENS
+    if model:
+        for prefix, tokens in sorted(MODEL_CONTEXT_TOKENS.items(), key=lambda kv: -len(kv[0])):
+            if model.startswith(prefix):
+                context = tokens
+                break
+    return int(context * fraction)
+
+
+def identity_score(rel_path: Path, code: str) -> float:
+    """
+    How much a file says about which package it belongs to.
+
+    Public top-level API (classes weigh double) and the package's own `__init__.py`
+    rank highest; tests, examples and private modules rank lowest.
+    """
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return 0.0
+
+    score = 0.0
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef):
+            score += 2.0 + 0.25 * sum(
+                isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef)) for n in node.body
+            )
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            score += 0.5 if node.name.startswith("_") else 1.0
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            score += 0.1
+
+    if rel_path.name == "__init__.py":
+        score = score * 1.5 + 5.0
+    parts = {p.lower() for p in rel_path.parts[:-1]}
+    if parts & {"tests", "test", "examples", "docs", "benchmarks"} or rel_path.name.startswith(
+        "test_"
+    ):
+        score *= 0.2
+    elif rel_path.name.startswith("_") and rel_path.name != "__init__.py":
+        score *= 0.6
+    return score
+
+
+class Chunk:
+    """A group of files that fits in one prompt."""
+
+    def __init__(self):
+        self.files: list[tuple[str, str]] = []
+        self.tokens = 0
+
+    def add(self, rel_path: str, code: str, tokens: int) -> None:
+        self.files.append((rel_path, code))
+        self.tokens += tokens
+
+    def render(self) -> str:
+        return "\n\n".join(f"# ---- {path} ----\n{code}" for path, code in self.files)
+
+
+def _file_header_tokens(rel_path: str) -> int:
+    return estimate_tokens(f"# ---- {rel_path} ----\n") + 2
+
+
+def _split_lines(code: str, budget: int) -> list[str]:
+    """Splits an oversized file at line boundaries into pieces under the budget."""
+    pieces, current, tokens = [], [], 0
+    for line in code.splitlines(keepends=True):
+        line_tokens = estimate_tokens(line)
+        if current and tokens + line_tokens > budget:
+            pieces.append("".join(current))
+            current, tokens = [], 0
+        current.append(line)
+        tokens += line_tokens
+    if current:
+        pieces.append("".join(current))
+    return pieces
+
+
+def chunk_files(
+    files: dict[str, str], token_budget: int, max_chunks: int | None = None
+) -> list[Chunk]:
+    """
+    Packs files (relative path -> code) into chunks of at most `token_budget` tokens.
+
+    Files are visited in descending identity order and placed in the first chunk with room
+    (first-fit decreasing), so chunk 0 holds the most identifying code. Files bigger than
+    the budget are split at line boundaries. With `max_chunks`, only the leading chunks
+    are kept.
+    """
+    ranked = sorted(files.items(), key=lambda kv: (-identity_score(Path(kv[0]), kv[1]), kv[0]))
+
+    chunks: list[Chunk] = []
+    for rel_path, code in ranked:
+        tokens = estimate_tokens(code) + _file_header_tokens(rel_path)
+        if tokens > token_budget:
+            header = _file_header_tokens(f"{rel_path} (part 999/999)")
+            pieces = _split_lines(code, max(1, token_budget - header))
+            parts = [
+                (f"{rel_path} (part {i + 1}/{len(pieces)})", piece)
+                for i, piece in enumerate(pieces)
+            ]
+        else:
+            parts = [(rel_path, code)]
+
+        for name, piece in parts:
+            piece_tokens = estimate_tokens(piece) + _file_header_tokens(name)
+            target = next((c for c in chunks if c.tokens + piece_tokens <= token_budget), None)
+            if target is None:
+                target = Chunk()
+                chunks.append(target)
+            target.add(name, piece, piece_tokens)
+
+    return chunks[:max_chunks] if max_chunks else chunks
+
+
+def read_package(root: Path) -> dict[str, str]:
+    """Reads every Python file under root, keyed by path relative to root."""
+    root = Path(root)
+    return {
+        str(path.relative_to(root)): path.read_text(encoding="utf-8")
+        for path in sorted(root.rglob("*.py"))
+    }
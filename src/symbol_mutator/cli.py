@@ -1,26 +1,38 @@
 import argparse
+import json
 import sys
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from .core import Mutator
+# Subcommands import their modules after parsing arguments: libcst alone dominates start-up,
+# so --help and usage errors must not pull in core.
+if TYPE_CHECKING:
+    from .core import Mutator
 
 
-def main():
-    parser = argparse.ArgumentParser(description="Deterministically obfuscate a Python codebase.")
-    parser.add_argument("--target", type=Path, required=True, help="Path to the library to mutate")
-    parser.add_argument(
-        "--output", type=Path, required=True, help="Directory to save the mutated library"
-    )
+def _theme(value: str) -> str:
+    from .themes import get_theme
+
+    try:
+        get_theme(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+    return value
+
+
+def _add_mutator_args(parser: argparse.ArgumentParser) -> None:
     parser.add_argument(
         "--seed", type=int, default=42, help="Random seed for deterministic renaming"
     )
     parser.add_argument(
         "--theme",
-        choices=["gibberish", "fantasy", "multilingual"],
+        type=_theme,
         default="gibberish",
-        help="Naming theme",
+        help="Naming theme: gibberish, fantasy, multilingual or an installed plugin theme",
+    )
+    parser.add_argument(
+        "--intensity", type=int, default=1, help="Obfuscation intensity level (1-5)"
     )
-    parser.add_argument("--intensity", type=int, default=1, help="Obfuscation intensity level (1-4)")
     parser.add_argument(
         "--internal-prefix",
         action="append",
@@ -30,13 +42,11 @@ def main():
         "--strip-comments", action="store_true", help="Remove all comments and docstrings"
     )
 
-    args = parser.parse_args()
 
-    if not args.target.exists():
-        print(f"Error: Target path {args.target} does not exist.")
-        sys.exit(1)
+def _build_mutator(args: argparse.Namespace) -> "Mutator":
+    from .core import Mutator
 
-    mutator = Mutator(
+    return Mutator(
         seed=args.seed,
         theme=args.theme,
         internal_prefixes=args.internal_prefix,
@@ -44,6 +54,435 @@ def main():
         intensity=args.intensity,
     )
 
+
+def _shard(value: str) -> tuple[int, int]:
+    try:
+        shard, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected INDEX/COUNT, got {value!r}") from None
+    if not 0 <= shard < count:
+        raise argparse.ArgumentTypeError(f"shard index must be in [0, {count})")
+    return shard, count
+
+
+def _add_shard_arg(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--shard",
+        type=_shard,
+        default=(0, 1),
+        metavar="INDEX/COUNT",
+        help="Only handle this shard's files, e.g. 0/4 (default: all files)",
+    )
+
+
+def verify_command(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="symbol-mutator verify",
+        description="Run a package's test suite against its mutated copy and diff the outcomes.",
+    )
+    parser.add_argument("--target", type=Path, required=True, help="Package directory to mutate")
+    parser.add_argument(
+        "--tests", type=Path, required=True, help="Directory with the package's tests"
+    )
+    parser.add_argument("--workers", type=int, help="Parallel test shards (default: CPU count)")
+    parser.add_argument("--timeout", type=float, help="Timeout in seconds per shard")
+    parser.add_argument(
+        "--pytest-arg", action="append", default=[], help="Extra argument passed to pytest"
+    )
+    _add_mutator_args(parser)
+    args = parser.parse_args(argv)
+
+    for path in (args.target, args.tests):
+        if not path.is_dir():
+            print(f"Error: {path} is not a directory.")
+            return 1
+
+    from .verify import verify_package
+
+    report = verify_package(
+        args.target,
+        args.tests,
+        mutator=_build_mutator(args),
+        workers=args.workers,
+        pytest_args=args.pytest_arg,
+        timeout=args.timeout,
+    )
+    print(report.format())
+    return 0 if report.ok else 1
+
+
+def check_command(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="symbol-mutator check",
+        description="Statically check that mutated code is alpha-equivalent to the original.",
+    )
+    parser.add_argument("--original", type=Path, required=True, help="Unmutated directory")
+    parser.add_argument("--mutated", type=Path, required=True, help="Mutated directory")
+    parser.add_argument(
+        "--mapping",
+        type=Path,
+        required=True,
+        help="Mapping file written with --dump-mapping when mutating",
+    )
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    for path in (args.original, args.mutated):
+        if not path.is_dir():
+            print(f"Error: {path} is not a directory.")
+            return 1
+
+    from .core import load_mapping
+    from .equivalence import check_directory
+
+    manifest = load_mapping(args.mapping)
+    report = check_directory(
+        args.original,
+        args.mutated,
+        manifest["mapping"],
+        intensity=manifest.get("intensity", 1),
+        strip_comments=manifest.get("strip_comments", False),
+        workers=args.workers,
+    )
+    print(report.format())
+    return 0 if report.ok else 1
+
+
+def docs_command(argv: list[str]) -> int:
+    from .docsync import SCOPES, sync_docs
+
+    parser = argparse.ArgumentParser(
+        prog="symbol-mutator docs",
+        description="Rewrite Markdown/RST documentation to match a symbol mapping.",
+    )
+    parser.add_argument(
+        "--target", type=Path, required=True, help="Documentation file or directory"
+    )
+    parser.add_argument(
+        "--output", type=Path, help="Where to write rewritten docs (default: in place)"
+    )
+    parser.add_argument(
+        "--mapping",
+        type=Path,
+        required=True,
+        help="Mapping file written with --dump-mapping when mutating",
+    )
+    parser.add_argument(
+        "--scope",
+        choices=SCOPES,
+        default="code",
+        help="Rewrite only code spans and blocks (default) or all text",
+    )
+    args = parser.parse_args(argv)
+
+    if not args.target.exists():
+        print(f"Error: Target path {args.target} does not exist.")
+        return 1
+
+    from .core import load_mapping
+
+    written = sync_docs(args.target, args.output, load_mapping(args.mapping)["mapping"], args.scope)
+    print(f"Rewrote {len(written)} documentation files.")
+    return 0
+
+
+def unmutate_command(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="symbol-mutator unmutate",
+        description="Map mutated identifiers back to the originals in code or text.",
+    )
+    parser.add_argument(
+        "--mapping",
+        type=Path,
+        required=True,
+        help="Mapping file written with --dump-mapping when mutating",
+    )
+    parser.add_argument(
+        "--target", type=Path, help="File or directory to restore (default: read stdin)"
+    )
+    parser.add_argument(
+        "--output", type=Path, help="Where to write restored files (default: in place)"
+    )
+    args = parser.parse_args(argv)
+
+    if args.target is not None and not args.target.exists():
+        print(f"Error: Target path {args.target} does not exist.")
+        return 1
+
+    from .core import load_mapping
+    from .unmutate import Unmutator, unmutate_path
+
+    mapping = load_mapping(args.mapping)["mapping"]
+    if args.target is None:
+        sys.stdout.write(Unmutator(mapping).unmutate(sys.stdin.read()))
+        return 0
+    written = unmutate_path(args.target, args.output, mapping)
+    print(f"Restored {len(written)} files.")
+    return 0
+
+
+def history_command(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="symbol-mutator history",
+        description="Mutate every Python file in every commit of a git repository.",
+    )
+    parser.add_argument("--repo", type=Path, required=True, help="Repository to rewrite")
+    parser.add_argument("--output", type=Path, help="New repository for the rewritten history")
+    parser.add_argument(
+        "--stream",
+        type=Path,
+        help="Write the git fast-import stream here (import it into a clone of --repo)",
+    )
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument(
+        "--dump-mapping", type=Path, help="Write the symbol mapping to this JSON file"
+    )
+    _add_mutator_args(parser)
+    args = parser.parse_args(argv)
+
+    if not (args.repo / ".git").exists() and not (args.repo / "HEAD").exists():
+        print(f"Error: {args.repo} is not a git repository.")
+        return 1
+    if args.output is None and args.stream is None:
+        print("Error: pass --output and/or --stream.")
+        return 1
+
+    from .history import rewrite_history
+
+    mutator = _build_mutator(args)
+    report = rewrite_history(
+        args.repo,
+        output=args.output,
+        stream_path=args.stream,
+        mutator=mutator,
+        workers=args.workers,
+    )
+    print(report.format())
+    if args.dump_mapping:
+        mutator.save_mapping(args.dump_mapping)
+    return 0
+
+
+def collect_command(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="symbol-mutator collect",
+        description="Sharded mutation, phase 1: write the symbols a shard defines.",
+    )
+    parser.add_argument("--target", type=Path, required=True, help="Library directory")
+    parser.add_argument("--output", type=Path, required=True, help="Symbol set file to write")
+    _add_shard_arg(parser)
+    _add_mutator_args(parser)
+    args = parser.parse_args(argv)
+
+    if not args.target.is_dir():
+        print(f"Error: {args.target} is not a directory.")
+        return 1
+
+    from .shard import collect_shard, save_symbols
+
+    symbols = collect_shard(args.target, _build_mutator(args), *args.shard)
+    save_symbols(symbols, args.output)
+    print(f"Collected {len(symbols['files'])} files into {args.output}")
+    return 0
+
+
+def merge_command(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="symbol-mutator merge",
+        description="Sharded mutation, phase 2: merge symbol sets into one mapping.",
+    )
+    parser.add_argument("symbols", type=Path, nargs="+", help="Symbol set files from collect")
+    parser.add_argument("--output", type=Path, required=True, help="Mapping file to write")
+    args = parser.parse_args(argv)
+
+    from .shard import load_symbols, merge_symbols
+
+    try:
+        mutator = merge_symbols([load_symbols(path) for path in args.symbols])
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+    mutator.save_mapping(args.output)
+    print(f"Merged {len(args.symbols)} symbol sets: mapped {len(mutator.mapping)} symbols.")
+    return 0
+
+
+def transform_command(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="symbol-mutator transform",
+        description="Sharded mutation, phase 3: rename a shard's files with a merged mapping.",
+    )
+    parser.add_argument("--target", type=Path, required=True, help="Library directory")
+    parser.add_argument("--output", type=Path, required=True, help="Output directory")
+    parser.add_argument("--mapping", type=Path, required=True, help="Mapping file from merge")
+    _add_shard_arg(parser)
+    args = parser.parse_args(argv)
+
+    if not args.target.is_dir():
+        print(f"Error: {args.target} is not a directory.")
+        return 1
+
+    from .core import Mutator, load_mapping
+    from .shard import transform_shard
+
+    mutator = Mutator.from_manifest(load_mapping(args.mapping))
+    written = transform_shard(args.target, args.output, mutator, *args.shard)
+    print(f"Transformed {len(written)} files.")
+    return 0
+
+
+def serve_command(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="symbol-mutator serve",
+        description="Answer JSON mutation requests from a long-lived process.",
+    )
+    transport = parser.add_mutually_exclusive_group(required=True)
+    transport.add_argument(
+        "--stdio",
+        action="store_true",
+        help="Read requests from stdin and write responses to stdout",
+    )
+    transport.add_argument(
+        "--http",
+        metavar="[HOST:]PORT",
+        help="Serve requests over HTTP, with metrics at /metrics (host defaults to 127.0.0.1)",
+    )
+    parser.add_argument("--workers", type=int, help="Request worker threads")
+    parser.add_argument(
+        "--max-sessions",
+        type=int,
+        help="Sessions kept in memory; the least recently used is evicted beyond this",
+    )
+    parser.add_argument(
+        "--snapshot-dir",
+        type=Path,
+        help="Save evicted sessions here, and every session on shutdown, to reload later",
+    )
+    parser.add_argument(
+        "--allow-files",
+        action="store_true",
+        help="Let HTTP requests read and write server files via 'path' and 'output'",
+    )
+    _add_mutator_args(parser)
+    args = parser.parse_args(argv)
+
+    from .service import MutationService, serve_http
+
+    service = MutationService(
+        defaults={
+            "seed": args.seed,
+            "theme": args.theme,
+            "internal_prefixes": args.internal_prefix,
+            "strip_comments": args.strip_comments,
+            "intensity": args.intensity,
+        },
+        workers=args.workers,
+        max_sessions=args.max_sessions,
+        snapshot_dir=args.snapshot_dir,
+    )
+    if args.http:
+        host, _, port = args.http.rpartition(":")
+        if not port.isdigit():
+            parser.error(f"--http expects [HOST:]PORT, got {args.http!r}")
+        print(f"Serving on http://{host or '127.0.0.1'}:{port}", file=sys.stderr, flush=True)
+        serve_http(service, host or "127.0.0.1", int(port), allow_files=args.allow_files)
+        return 0
+    service.serve(sys.stdin, sys.stdout)
+    return 0
+
+
+COMMANDS = {
+    "verify": verify_command,
+    "check": check_command,
+    "docs": docs_command,
+    "unmutate": unmutate_command,
+    "history": history_command,
+    "serve": serve_command,
+    "collect": collect_command,
+    "merge": merge_command,
+    "transform": transform_command,
+}
+
+
+def main(argv: list[str] | None = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in COMMANDS:
+        return COMMANDS[argv[0]](argv[1:])
+
+    parser = argparse.ArgumentParser(
+        description="Deterministically obfuscate a Python codebase.",
+        epilog=f"Subcommands: {', '.join(COMMANDS)} (run 'symbol-mutator <command> --help').",
+    )
+    parser.add_argument("--target", type=Path, required=True, help="Path to the library to mutate")
+    parser.add_argument(
+        "--output", type=Path, required=True, help="Directory to save the mutated library"
+    )
+    parser.add_argument(
+        "--dump-mapping", type=Path, help="Write the symbol mapping to this JSON file"
+    )
+    parser.add_argument(
+        "--mirror",
+        action="store_true",
+        help="Reproduce the whole tree: mutate .py/.pyi files, link or copy everything else",
+    )
+    parser.add_argument(
+        "--link-mode",
+        choices=["auto", "hardlink", "reflink", "copy"],
+        default="auto",
+        help="How --mirror copies untouched files (default: reflink, else in-kernel copy)",
+    )
+    parser.add_argument(
+        "--sync-docs",
+        action="store_true",
+        help="Also rewrite the code in Markdown/RST docs to the new names",
+    )
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="Overlap file reads and writes with transformation (for slow filesystems)",
+    )
+    parser.add_argument(
+        "--keep-going",
+        action="store_true",
+        help="Skip files that fail to parse or write instead of stopping at the first one",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        type=Path,
+        help="Checkpoint file: rerunning the same command resumes where it stopped",
+    )
+    parser.add_argument("--report", type=Path, help="Write the per-file report to this JSON file")
+    parser.add_argument(
+        "--trace", type=Path, help="Write a timeline of parsing, passes and I/O to this file"
+    )
+    parser.add_argument(
+        "--trace-format",
+        choices=["chrome", "otlp"],
+        default="chrome",
+        help="Trace file format: Chrome Trace Event JSON (Perfetto) or OTLP JSON",
+    )
+    _add_mutator_args(parser)
+
+    args = parser.parse_args(argv)
+
+    if not args.target.exists():
+        print(f"Error: Target path {args.target} does not exist.")
+        return 1
+
+    if args.trace:
+        from .tracing import tracing
+
+        with tracing(args.trace, args.trace_format):
+            status = _mutate(args)
+        print(f"Written trace to {args.trace}")
+        return status
+    return _mutate(args)
+
+
+def _mutate(args: argparse.Namespace) -> int:
+    mutator = _build_mutator(args)
+    ok = True
+
     if args.target.is_file():
         # Single file case
         print(f"Mutating single file: {args.target}")
@@ -61,10 +500,35 @@ def main():
         print(f"Mutating directory: {args.target}")
         from .core import mutate_directory
 
-        mutate_directory(args.target, args.output, mutator=mutator)
+        report = mutate_directory(
+            args.target,
+            args.output,
+            mutator=mutator,
+            pipeline=args.pipeline,
+            mirror=args.mirror,
+            link_mode=args.link_mode,
+            errors="skip" if args.keep_going else "raise",
+            checkpoint=args.checkpoint,
+        )
 
+        print(report.format())
+        ok = report.ok
         print(f"Mutation complete. Mapped {len(mutator.mapping)} symbols.")
+        if args.report:
+            args.report.write_text(json.dumps(report.to_dict(), indent=2), encoding="utf-8")
+
+        if args.sync_docs:
+            from .docsync import sync_docs
+
+            written = sync_docs(args.target, args.output, mutator.mapping)
+            print(f"Rewrote {len(written)} documentation files.")
+
+    if args.dump_mapping:
+        mutator.save_mapping(args.dump_mapping)
+        print(f"Written mapping to {args.dump_mapping}")
+
+    return 0 if ok else 1
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
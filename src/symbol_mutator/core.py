@@ -1,203 +1,173 @@
-import hashlib
+import asyncio
+import functools
+import io
+import json
+import queue
 import random
+import re
+import threading
+import tokenize
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 
 import libcst as cst
 from libcst.metadata import MetadataWrapper, ParentNodeProvider
 
+from .mirror import LINK_MODES, copy_file, walk_tree
+from .themes import get_theme
+from .tracing import span
+
+# Blocklist common built-in methods to prevent accidental renaming of dict/list/str/set/file methods
+PROTECTED_METHODS = frozenset(
+    {
+        "add",
+        "append",
+        "as_integer_ratio",
+        "bit_count",
+        "bit_length",
+        "capitalize",
+        "casefold",
+        "center",
+        "clear",
+        "conjugate",
+        "copy",
+        "count",
+        "denominator",
+        "difference",
+        "difference_update",
+        "discard",
+        "encode",
+        "endswith",
+        "expandtabs",
+        "extend",
+        "find",
+        "format",
+        "format_map",
+        "from_bytes",
+        "fromhex",
+        "fromkeys",
+        "get",
+        "hex",
+        "imag",
+        "index",
+        "insert",
+        "intersection",
+        "intersection_update",
+        "is_integer",
+        "isalnum",
+        "isalpha",
+        "isascii",
+        "isdecimal",
+        "isdigit",
+        "isdisjoint",
+        "isidentifier",
+        "islower",
+        "isnumeric",
+        "isprintable",
+        "isspace",
+        "issubset",
+        "issuperset",
+        "istitle",
+        "isupper",
+        "items",
+        "join",
+        "keys",
+        "ljust",
+        "lower",
+        "lstrip",
+        "maketrans",
+        "numerator",
+        "partition",
+        "pop",
+        "popitem",
+        "real",
+        "remove",
+        "removeprefix",
+        "removesuffix",
+        "replace",
+        "reverse",
+        "rfind",
+        "rindex",
+        "rjust",
+        "rpartition",
+        "rsplit",
+        "rstrip",
+        "setdefault",
+        "sort",
+        "split",
+        "splitlines",
+        "startswith",
+        "strip",
+        "swapcase",
+        "symmetric_difference",
+        "symmetric_difference_update",
+        "title",
+        "to_bytes",
+        "translate",
+        "union",
+        "update",
+        "upper",
+        "values",
+        "zfill",
+        # File / IO methods
+        "read",
+        "write",
+        "close",
+        "open",
+        "flush",
+        "seek",
+        "tell",
+        "readline",
+        "readlines",
+        "writelines",
+        # Context manager
+        "__enter__",
+        "__exit__",
+        # Common argument names that might interact with external libraries via kwargs
+        "name",
+        "params",
+        "extra",
+        "kwargs",
+        "kwarg",
+        "args",
+        "self",
+        "cls",
+        "target",
+        "source",
+        "callback",
+        "ctx",
+        "environ",
+        "start_response",
+        "exc_info",
+    }
+)
+
+METADATA_NAMES = frozenset({"__version__", "__author__", "__email__", "__license__"})
+
 
 class NameGenerator:
     """
-    Generates deterministic names based on a seed.
-    Supports themes: 'gibberish' (default), 'fantasy', 'multilingual'.
+    Generates deterministic names based on a seed, in the style of a theme: 'gibberish'
+    (default), 'fantasy', 'multilingual' or any registered one (see `themes`).
     """
 
     def __init__(self, seed: int, theme: str = "gibberish"):
         self.rng = random.Random(seed)
         self.theme = theme
+        self.style = get_theme(theme)
         self.generated: set[str] = set()
 
-        # Fantasy Theme Vocabulary
-        # Fantasy Theme Vocabulary
-        self.fantasy_prefixes = [
-            "Crystal",
-            "Shadow",
-            "Thunder",
-            "Void",
-            "Iron",
-            "Mist",
-            "Star",
-            "Blood",
-            "Frost",
-            "Flame",
-            "Obsidian",
-            "Azure",
-            "Crimson",
-            "Verdant",
-            "Golden",
-            "Silver",
-            "Ebon",
-            "Ivory",
-            "Arcane",
-            "Spirit",
-            "Soul",
-            "Mind",
-            "Heart",
-            "Bone",
-            "Ash",
-            "Ember",
-            "Storm",
-            "Rain",
-            "Wind",
-            "Sea",
-        ]
-        self.fantasy_suffixes = [
-            "Blade",
-            "Shield",
-            "Weaver",
-            "Walker",
-            "Caller",
-            "Binder",
-            "Warden",
-            "Seeker",
-            "Breaker",
-            "Singer",
-            "Dancer",
-            "Stalker",
-            "Hunter",
-            "Mage",
-            "Knight",
-            "Lord",
-            "King",
-            "Queen",
-            "Prince",
-            "Sage",
-            "Guard",
-            "Watcher",
-            "Keeper",
-            "Bringer",
-            "Slayer",
-            "Eater",
-            "Drinker",
-            "Forged",
-            "Born",
-            "Kin",
-        ]
-        self.fantasy_verbs = [
-            "invoke",
-            "summon",
-            "banish",
-            "enchant",
-            "forge",
-            "shatter",
-            "weave",
-            "scry",
-            "transmute",
-            "bind",
-            "call",
-            "cast",
-            "channel",
-            "conjure",
-            "craft",
-            "create",
-            "curse",
-            "bless",
-            "empower",
-            "imbue",
-            "infuse",
-            "invoke",
-            "kindle",
-            "mending",
-            "purify",
-            "restore",
-            "ward",
-            "seal",
-            "open",
-            "close",
-        ]
-        # Multilingual vocabulary (Mix of scripts to break tokenization)
-        self.ml_prefixes = [
-            "معالج",  # Processor (Arabic)
-            "بيانات",  # Data (Arabic)
-            "система",  # System (Cyrillic)
-            "ключ",  # Key (Cyrillic)
-            "код",  # Code (Cyrillic)
-            "функция",  # Function (Cyrillic)
-            "архив",  # Archive (Cyrillic)
-            "главный",  # Main (Cyrillic)
-            "новый",  # New (Cyrillic)
-            "первый",  # First (Cyrillic)
-            "тест",  # Test (Cyrillic)
-            "задача",  # Task (Cyrillic)
-            "логика",  # Logic (Cyrillic)
-            "метод",  # Method (Cyrillic)
-            "ядро",  # Core (Cyrillic)
-            "узел",  # Node (Cyrillic)
-            "сеть",  # Network (Cyrillic)
-            "память",  # Memory (Cyrillic)
-            "поток",  # Flow (Cyrillic)
-        ]
-        self.ml_suffixes = [
-            "объект",  # Object (Cyrillic)
-            "класс",  # Class (Cyrillic)
-            "результат",  # Result (Cyrillic)
-            "ошибка",  # Error (Cyrillic)
-            "вход",  # Input (Cyrillic)
-            "выход",  # Output (Cyrillic)
-            "проверка",  # Verify (Cyrillic)
-            "индекс",  # Index (Cyrillic)
-            "значение",  # Value (Cyrillic)
-            "тип",  # Type (Cyrillic)
-            "имя",  # Name (Cyrillic)
-            "файл",  # File (Cyrillic)
-            "путь",  # Path (Cyrillic)
-            "база",  # Base (Cyrillic)
-        ]
-
     def generate(self, original_name: str, kind: str = "obj") -> str:
         """
         Generates a new name for the given original name.
         'kind' can be 'class', 'function', or 'constant' to guide casing.
         """
-        while True:
-            if self.theme == "fantasy":
-                new_name = self._generate_fantasy(original_name, kind)
-            elif self.theme == "multilingual":
-                new_name = self._generate_multilingual(original_name, kind)
-            else:
-                new_name = self._generate_gibberish(original_name)
-
-            if new_name not in self.generated and new_name != original_name:
-                self.generated.add(new_name)
-                return new_name
-
-    def _generate_gibberish(self, original_name: str) -> str:
-        # Create a hash of the name + salt to pick letters
-        h = hashlib.md5(original_name.encode() + str(self.rng.random()).encode()).hexdigest()
-        prefix = "c_" if original_name[0].isupper() else "f_"
-        suffix = h[:6]
-        return f"{prefix}{suffix}"
-
-    def _generate_fantasy(self, original_name: str, kind: str) -> str:
-        if kind == "class":
-            return (
-                f"{self.rng.choice(self.fantasy_prefixes)}{self.rng.choice(self.fantasy_suffixes)}"
-            )
-        elif kind == "function":
-            verb = self.rng.choice(self.fantasy_verbs)
-            noun = self.rng.choice(self.fantasy_suffixes).lower()
-            return f"{verb}_{noun}"
-            return (
-                self.rng.choice(self.fantasy_prefixes).lower()
-                + "_"
-                + self.rng.choice(self.fantasy_prefixes).lower()
-            )
+        return self.style.generate(self.rng, original_name, kind, self.generated)
 
-    def _generate_multilingual(self, original_name: str, kind: str) -> str:
-        # Mix Arabic and Cyrillic to break English-centric tokenizers
-        prefix = self.rng.choice(self.ml_prefixes)
-        suffix = self.rng.choice(self.ml_suffixes)
-        return f"{prefix}_{suffix}"
+    def generate_batch(self, names: list[str], kinds: list[str]) -> list[str]:
+        """New names for many originals at once, as calling generate for each would give."""
+        return self.style.generate_batch(self.rng, names, kinds, self.generated)
 
 
 class SymbolCollector(cst.CSTVisitor):
@@ -262,129 +232,7 @@ class SymbolCollector(cst.CSTVisitor):
         if name.startswith("__") and name.endswith("__"):
             return
 
-        # Blocklist common built-in methods to prevent accidental renaming of dict/list/str/set/file methods
-        protected = {
-            "add",
-            "append",
-            "as_integer_ratio",
-            "bit_count",
-            "bit_length",
-            "capitalize",
-            "casefold",
-            "center",
-            "clear",
-            "conjugate",
-            "copy",
-            "count",
-            "denominator",
-            "difference",
-            "difference_update",
-            "discard",
-            "encode",
-            "endswith",
-            "expandtabs",
-            "extend",
-            "find",
-            "format",
-            "format_map",
-            "from_bytes",
-            "fromhex",
-            "fromkeys",
-            "get",
-            "hex",
-            "imag",
-            "index",
-            "insert",
-            "intersection",
-            "intersection_update",
-            "is_integer",
-            "isalnum",
-            "isalpha",
-            "isascii",
-            "isdecimal",
-            "isdigit",
-            "isdisjoint",
-            "isidentifier",
-            "islower",
-            "isnumeric",
-            "isprintable",
-            "isspace",
-            "issubset",
-            "issuperset",
-            "istitle",
-            "isupper",
-            "items",
-            "join",
-            "keys",
-            "ljust",
-            "lower",
-            "lstrip",
-            "maketrans",
-            "numerator",
-            "partition",
-            "pop",
-            "popitem",
-            "real",
-            "remove",
-            "removeprefix",
-            "removesuffix",
-            "replace",
-            "reverse",
-            "rfind",
-            "rindex",
-            "rjust",
-            "rpartition",
-            "rsplit",
-            "rstrip",
-            "setdefault",
-            "sort",
-            "split",
-            "splitlines",
-            "startswith",
-            "strip",
-            "swapcase",
-            "symmetric_difference",
-            "symmetric_difference_update",
-            "title",
-            "to_bytes",
-            "translate",
-            "union",
-            "update",
-            "upper",
-            "values",
-            "zfill",
-            # File / IO methods
-            "read",
-            "write",
-            "close",
-            "open",
-            "flush",
-            "seek",
-            "tell",
-            "readline",
-            "readlines",
-            "writelines",
-            # Context manager
-            "__enter__",
-            "__exit__",
-            # Common argument names that might interact with external libraries via kwargs
-            "name",
-            "params",
-            "extra",
-            "kwargs",
-            "kwarg",
-            "args",
-            "self",
-            "cls",
-            "target",
-            "source",
-            "callback",
-            "ctx",
-            "environ",
-            "start_response",
-            "exc_info",
-        }
-        if name in protected:
+        if name in PROTECTED_METHODS:
             return
 
         self.defined_functions.add(name)
@@ -447,9 +295,8 @@ class MetadataScrubber(cst.CSTTransformer):
     """
 
     def leave_Assign(self, original_node: cst.Assign, updated_node: cst.Assign) -> cst.Assign | cst.RemovalSentinel:
-        protected = {"__version__", "__author__", "__email__", "__license__"}
         for target in updated_node.targets:
-            if isinstance(target.target, cst.Name) and target.target.value in protected:
+            if isinstance(target.target, cst.Name) and target.target.value in METADATA_NAMES:
                 return cst.RemovalSentinel.REMOVE
         return updated_node
 
@@ -480,7 +327,13 @@ class IfElseInverter(cst.CSTTransformer):
     def leave_If(self, original_node: cst.If, updated_node: cst.If) -> cst.If:
         if updated_node.orelse and isinstance(updated_node.orelse, cst.Else):
             # Only invert if there is an 'else' block
-            new_test = cst.UnaryOperation(operator=cst.Not(), expression=updated_node.test)
+            test = updated_node.test
+            if not test.lpar and isinstance(
+                test, (cst.BooleanOperation, cst.IfExp, cst.Lambda, cst.NamedExpr)
+            ):
+                # `not` binds tighter than these: `not a or b` would mean `(not a) or b`
+                test = test.with_changes(lpar=[cst.LeftParen()], rpar=[cst.RightParen()])
+            new_test = cst.UnaryOperation(operator=cst.Not(), expression=test)
             new_body = updated_node.orelse.body
             new_orelse = cst.Else(body=updated_node.body)
             return updated_node.with_changes(test=new_test, body=new_body, orelse=new_orelse)
@@ -501,13 +354,23 @@ class StatementReorderer(cst.CSTTransformer):
     Very basic heuristic: only swap SimpleStatementLine with no shared names.
     """
 
+    def __init__(self):
+        # The segments of a huge file share one instance; its module body gets one swap
+        self.module_swapped = False
+
     def leave_IndentedBlock(
         self, original_node: cst.IndentedBlock, updated_node: cst.IndentedBlock
     ) -> cst.IndentedBlock:
         return self._reorder_body(updated_node)
 
     def leave_Module(self, original_node: cst.Module, updated_node: cst.Module) -> cst.Module:
-        return self._reorder_body(updated_node)
+        if self.module_swapped:
+            return updated_node
+        reordered = self._reorder_body(updated_node)
+        self.module_swapped = any(
+            a is not b for a, b in zip(reordered.body, updated_node.body, strict=True)
+        )
+        return reordered
 
     def _reorder_body(self, node):
         new_body = list(node.body)
@@ -530,10 +393,36 @@ class StatementReorderer(cst.CSTTransformer):
         return node.with_changes(body=new_body)
 
 
+@functools.lru_cache(maxsize=4096)
+def _parse_string_expression(text: str) -> cst.BaseExpression | None:
+    """
+    Parses the body of a string annotation. Cached by content: typed packages repeat
+    the same few forward references thousands of times, and CST nodes are immutable,
+    so one parse can be shared by every file and every mapping.
+    """
+    try:
+        return cst.parse_expression(text)
+    except Exception:
+        return None
+
+
+def _string_body(node: cst.SimpleString) -> str | None:
+    """The raw text between the quotes, or None for bytes and f-strings."""
+    prefix = node.prefix.lower()
+    if "b" in prefix or "f" in prefix:
+        return None
+    return node.value[len(node.prefix) + len(node.quote) : -len(node.quote)]
+
+
 class SymbolRenamer(cst.CSTTransformer):
     """
     Second pass: Renames definitions and usages.
     Validates against the 'mapping' dictionary.
+
+    Also renames inside strings that hold code: string annotations (forward references),
+    `TypeVar` bounds and constraints, the type argument of `cast`, and `__all__` entries.
+    Strings that are data within an annotation, `Literal` values and `Annotated`
+    metadata, are left alone.
     """
 
     def __init__(self, mapping: dict[str, str], internal_prefixes: list[str]):
@@ -544,6 +433,13 @@ class SymbolRenamer(cst.CSTTransformer):
         # Standard built-ins that we should treat as external if used as bases for attribute access
         self.external_names.update(["sys", "os", "json", "math", "re", "typing", "t"])
 
+        self._annotation_depth = 0
+        # Inside Literal values or Annotated metadata, whose strings are data, not types
+        self._data_depth = 0
+        self._data_elements: set[int] = set()
+        # Renamed string values; external_names only grows, so its size pins down its state
+        self._string_cache: dict[tuple[str, int], str] = {}
+
     def _is_internal_module(self, module_node: cst.BaseExpression | None) -> bool:
         if not module_node:
             return False  # "from . import x" -> relative=1 works, module=None.
@@ -621,7 +517,138 @@ class SymbolRenamer(cst.CSTTransformer):
             return updated_node.with_changes(name=cst.Name(self.mapping[original_node.name.value]))
         return updated_node
 
+    def _rename_string_expression(self, node: cst.SimpleString) -> cst.SimpleString:
+        """Renames the expression held in a string, e.g. "list[Node]"."""
+        key = (node.value, len(self.external_names))
+        if key not in self._string_cache:
+            body = _string_body(node)
+            renamed = node.value
+            expression = _parse_string_expression(body.strip()) if body else None
+            if expression is not None:
+                # The string holds a type wherever it came from (annotation, cast, TypeVar),
+                # so visit it as one; the cached result is then the same for every caller.
+                self._annotation_depth += 1
+                try:
+                    expression = expression.visit(self)
+                finally:
+                    self._annotation_depth -= 1
+                new_text = cst.Module([]).code_for_node(expression)
+                lead = body[: len(body) - len(body.lstrip())]
+                trail = body[len(body.rstrip()) :]
+                renamed = f"{node.prefix}{node.quote}{lead}{new_text}{trail}{node.quote}"
+            self._string_cache[key] = renamed
+        renamed = self._string_cache[key]
+        return node if renamed == node.value else node.with_changes(value=renamed)
+
+    def _rename_string_name(self, node: cst.BaseExpression) -> cst.BaseExpression:
+        """Renames a string that holds a single name, e.g. an `__all__` entry."""
+        if isinstance(node, cst.SimpleString):
+            body = _string_body(node)
+            if body in self.mapping:
+                return node.with_changes(
+                    value=f"{node.prefix}{node.quote}{self.mapping[body]}{node.quote}"
+                )
+        return node
+
+    def _rename_all_entries(self, value: cst.BaseExpression) -> cst.BaseExpression:
+        if isinstance(value, (cst.List, cst.Tuple, cst.Set)):
+            return value.with_changes(
+                elements=[
+                    element.with_changes(value=self._rename_string_name(element.value))
+                    for element in value.elements
+                ]
+            )
+        return value
+
+    def visit_Annotation(self, node: cst.Annotation) -> None:
+        self._annotation_depth += 1
+
+    def leave_Annotation(
+        self, original_node: cst.Annotation, updated_node: cst.Annotation
+    ) -> cst.Annotation:
+        self._annotation_depth -= 1
+        return updated_node
+
+    def visit_Subscript(self, node: cst.Subscript) -> None:
+        if not self._annotation_depth:
+            return
+        value = node.value
+        name = (
+            value.attr.value if isinstance(value, cst.Attribute) else getattr(value, "value", None)
+        )
+        if name == "Literal":
+            self._data_elements.update(id(element) for element in node.slice)
+        elif name == "Annotated":
+            # Annotated[T, metadata...]: only T is a type
+            self._data_elements.update(id(element) for element in node.slice[1:])
+
+    def visit_SubscriptElement(self, node: cst.SubscriptElement) -> None:
+        if id(node) in self._data_elements:
+            self._data_depth += 1
+
+    def leave_SubscriptElement(
+        self, original_node: cst.SubscriptElement, updated_node: cst.SubscriptElement
+    ) -> cst.SubscriptElement:
+        if id(original_node) in self._data_elements:
+            self._data_elements.discard(id(original_node))
+            self._data_depth -= 1
+        return updated_node
+
+    def leave_SimpleString(
+        self, original_node: cst.SimpleString, updated_node: cst.SimpleString
+    ) -> cst.SimpleString:
+        # Forward references, including nested ones like list["Node"]
+        if self._annotation_depth and not self._data_depth:
+            return self._rename_string_expression(updated_node)
+        return updated_node
+
+    def leave_Assign(self, original_node: cst.Assign, updated_node: cst.Assign) -> cst.Assign:
+        if any(
+            isinstance(t.target, cst.Name) and t.target.value == "__all__"
+            for t in original_node.targets
+        ):
+            return updated_node.with_changes(value=self._rename_all_entries(updated_node.value))
+        return updated_node
+
+    def leave_AugAssign(
+        self, original_node: cst.AugAssign, updated_node: cst.AugAssign
+    ) -> cst.AugAssign:
+        if isinstance(original_node.target, cst.Name) and original_node.target.value == "__all__":
+            return updated_node.with_changes(value=self._rename_all_entries(updated_node.value))
+        return updated_node
+
     def leave_Call(self, original_node: cst.Call, updated_node: cst.Call) -> cst.Call:
+        func = original_node.func
+        func_name = func.value if isinstance(func, cst.Name) else None
+        if isinstance(func, cst.Attribute):
+            func_name = func.attr.value
+            if isinstance(func.value, cst.Name) and func.value.value == "__all__":
+                # __all__.append("name") / __all__.extend([...])
+                args = [
+                    arg.with_changes(
+                        value=self._rename_all_entries(self._rename_string_name(arg.value))
+                    )
+                    for arg in updated_node.args
+                ]
+                return updated_node.with_changes(args=args)
+
+        if func_name == "TypeVar":
+            # TypeVar("T", "A", "B", bound="C"): everything but the name is a type
+            args = []
+            for i, arg in enumerate(updated_node.args):
+                is_type = (arg.keyword is None and i > 0) or (
+                    arg.keyword is not None and arg.keyword.value == "bound"
+                )
+                if is_type and isinstance(arg.value, cst.SimpleString):
+                    arg = arg.with_changes(value=self._rename_string_expression(arg.value))
+                args.append(arg)
+            updated_node = updated_node.with_changes(args=args)
+        elif func_name == "cast" and updated_node.args:
+            first = updated_node.args[0]
+            if first.keyword is None and isinstance(first.value, cst.SimpleString):
+                args = [first.with_changes(value=self._rename_string_expression(first.value))]
+                updated_node = updated_node.with_changes(args=args + list(updated_node.args[1:]))
+
         # Handle func() calls
         if isinstance(updated_node.func, cst.Name) and updated_node.func.value in self.mapping:
             return updated_node.with_changes(func=cst.Name(self.mapping[updated_node.func.value]))
@@ -732,6 +759,180 @@ class SymbolRenamer(cst.CSTTransformer):
         return updated_node.with_changes(names=new_names)
 
 
+# Maximal runs of identifier characters. Every name SymbolRenamer can change (a Name, or a
+# name inside an annotation string or an __all__ entry) is one whole run, so code none of
+# whose runs starts a mapped name comes out of the renamer unchanged.
+_WORD_RE = re.compile(r"[0-9A-Z_a-z\u0080-\U0010ffff]+")
+
+# Files above SEGMENT_THRESHOLD characters are split into segments of about a quarter of it
+SEGMENT_THRESHOLD = 1 << 20
+
+_NEWLINE_RE = re.compile(r"\r\n|\n|\r")
+# First tokens of top-level statements that are never SimpleStatementLines
+_COMPOUND_STARTS = frozenset({"def", "class", "if", "for", "while", "try", "with", "async", "@"})
+_CLAUSES = frozenset({"else", "elif", "except", "finally"})
+
+
+def split_segments(
+    source_code: str, threshold: int | None = SEGMENT_THRESHOLD
+) -> tuple[list[str], cst.PartialParserConfig | None]:
+    """
+    Splits a source longer than threshold at top-level statement boundaries. Returns
+    the segments, whose concatenation is the source, and the parser config that makes
+    each segment parse with the whole file's indentation and newline.
+
+    Only boundaries every pass is blind to are used: never between two simple statement
+    lines (StatementReorderer swaps those), never before a statement that starts with a
+    string (CommentStripper may drop it), never between a decorator and its definition
+    or inside an if/try chain, and never after indented or whitespace-only lines that
+    libcst could attach to the previous block. Sources that can't be tokenized are
+    left whole.
+    """
+    if threshold is None or len(source_code) <= threshold:
+        return [source_code], None
+    lines = io.StringIO(source_code, newline="").readlines()
+    try:
+        statements, indent = _top_level_statements(lines)
+    except (tokenize.TokenError, SyntaxError):
+        return [source_code], None
+
+    offsets = [0]
+    for line in lines:
+        offsets.append(offsets[-1] + len(line))
+    size = max(1, threshold // 4)
+    cuts = [0]
+    previous = None
+    for start, first, kind, compound in statements:
+        is_clause = first in _CLAUSES or (previous is not None and previous[1] == "@")
+        if is_clause:
+            previous = (previous[0] or compound, first)
+            continue
+        if (
+            previous is not None
+            and (previous[0] or compound)
+            and kind != tokenize.STRING
+            and offsets[start - 1] - offsets[cuts[-1]] >= size
+            and _detached(lines, start)
+        ):
+            cuts.append(start - 1)
+        previous = (compound, first)
+
+    if len(cuts) == 1:
+        return [source_code], None
+    bounds = [offsets[c] for c in cuts] + [len(source_code)]
+    segments = [source_code[a:b] for a, b in zip(bounds, bounds[1:], strict=False)]
+    newline = _NEWLINE_RE.search(source_code)
+    config = cst.PartialParserConfig(
+        default_indent=indent, default_newline=newline.group() if newline else "\n"
+    )
+    return segments, config
+
+
+def _top_level_statements(lines: list[str]) -> tuple[list[tuple[int, str, int, bool]], str]:
+    """(first line, first token, its type, compound?) per top-level logical line, and the
+    file's first indentation."""
+    statements = []
+    indent = "    "
+    found_indent = False
+    depth = 0
+    at_start = True
+    top = False
+    last = ""
+    for token in tokenize.generate_tokens(iter(lines).__next__):
+        if token.type == tokenize.INDENT:
+            if not found_indent:
+                indent, found_indent = token.string, True
+            depth += 1
+        elif token.type == tokenize.DEDENT:
+            depth -= 1
+        elif token.type == tokenize.NEWLINE:
+            if top and last == ":":
+                statements[-1] = statements[-1][:3] + (True,)
+            at_start = True
+        elif token.type in (tokenize.NL, tokenize.COMMENT, tokenize.ENDMARKER):
+            continue
+        else:
+            if at_start:
+                at_start = False
+                top = depth == 0
+                if top:
+                    compound = token.string in _COMPOUND_STARTS
+                    statements.append((token.start[0], token.string, token.type, compound))
+            last = token.string
+    return statements, indent
+
+
+def _detached(lines: list[str], start: int) -> bool:
+    """Whether the blank and comment lines just above line `start` all sit at column 0."""
+    for line in reversed(lines[: start - 1]):
+        stripped = line.strip()
+        if stripped and not stripped.startswith("#"):
+            return True
+        if line[0] not in "#\r\n":
+            return False
+    return True
+
+
+def scan_symbols(
+    source_code: str,
+    internal_prefixes: list[str] | None = None,
+    segment_threshold: int | None = SEGMENT_THRESHOLD,
+) -> SymbolCollector:
+    """Parses code and returns the collector holding the symbols it defines."""
+    segments, config = split_segments(source_code, segment_threshold)
+    if len(segments) == 1:
+        with span("parse", "parse", size=len(source_code)):
+            module = cst.parse_module(source_code)
+        return scan_module(module, internal_prefixes)
+    # One collector visits every segment, so it ends up as if it had seen the whole file
+    collector = SymbolCollector(internal_prefixes)
+    for segment in segments:
+        with span("parse", "parse", size=len(segment)):
+            module = cst.parse_module(segment, config)
+        with span("SymbolCollector", "pass"):
+            cst.MetadataWrapper(module).visit(collector)
+    return collector
+
+
+def scan_module(module: cst.Module, internal_prefixes: list[str] | None = None) -> SymbolCollector:
+    """Like scan_symbols, for an already parsed module (which is left untouched)."""
+    with span("SymbolCollector", "pass"):
+        wrapper = cst.MetadataWrapper(module)
+        collector = SymbolCollector(internal_prefixes)
+        wrapper.visit(collector)
+    return collector
+
+
+def registration_order(collector: SymbolCollector, intensity: int) -> Iterator[tuple[str, str]]:
+    """
+    The (name, kind) pairs a Mutator registers for a collector, in registration order.
+    Names are generated from one RNG, so replaying these pairs file by file in the same
+    file order reproduces a mapping exactly.
+    """
+    for cls_name in sorted(collector.defined_classes):
+        yield cls_name, "class"
+
+    for func_name in sorted(collector.defined_functions):
+        yield func_name, "function"
+
+    for mod_name in sorted(collector.defined_modules):
+        # For modules, if they look like "pkg.subpkg", we might want to rename just "pkg"?
+        # Or the whole string?
+        # Current logic: Simple exact match.
+        # If "flask" is collected, we map "flask" -> "c_xyz".
+        yield mod_name, "variable"
+
+    if intensity >= 5:
+        for param_name in sorted(collector.defined_params):
+            yield param_name, "variable"
+
+        for local_name in sorted(collector.defined_locals):
+            yield local_name, "variable"
+
+        for attr_name in sorted(collector.defined_attributes):
+            yield attr_name, "variable"
+
+
 class Mutator:
     def __init__(
         self,
@@ -740,70 +941,215 @@ class Mutator:
         internal_prefixes: list[str] = None,
         strip_comments: bool = False,
         intensity: int = 1,
+        segment_threshold: int | None = SEGMENT_THRESHOLD,
     ):
         # Override theme if intensity >= 3
         effective_theme = "multilingual" if intensity >= 3 else theme
+        self.seed = seed
+        self.theme = theme
         self.generator = NameGenerator(seed, effective_theme)
         self.mapping: dict[str, str] = {}
         self.internal_prefixes = internal_prefixes or []
         self.strip_comments = strip_comments or intensity >= 2
         self.intensity = intensity
+        # Files larger than this (in characters) are parsed segment by segment
+        self.segment_threshold = segment_threshold
+        # Base of the per-file whitespace RNGs, drawn once all symbols are registered
+        self.whitespace_seed: int | None = None
+        self._words: tuple[dict[str, str] | None, int, set[str]] = (None, 0, set())
+        # Keeps amutate_source calls in the order they were made, per event loop
+        self._async_lock: tuple[asyncio.AbstractEventLoop, asyncio.Lock] | None = None
+
+    @classmethod
+    def from_manifest(cls, manifest: dict) -> "Mutator":
+        """Rebuilds a transform-ready Mutator from a manifest written by save_mapping."""
+        mutator = cls(
+            seed=manifest.get("seed", 0),
+            theme=manifest.get("theme", "gibberish"),
+            internal_prefixes=manifest.get("internal_prefixes"),
+            strip_comments=manifest.get("strip_comments", False),
+            intensity=manifest.get("intensity", 1),
+        )
+        mutator.mapping = dict(manifest["mapping"])
+        mutator.whitespace_seed = manifest.get("whitespace_seed")
+        return mutator
 
     def collect_definitions(self, source_code: str) -> None:
         """Pass 1: Parse code and register new symbols."""
-        wrapper = cst.MetadataWrapper(cst.parse_module(source_code))
-        collector = SymbolCollector(self.internal_prefixes)
-        wrapper.visit(collector)
-
-        # Generate mappings for new symbols
-        for cls_name in sorted(collector.defined_classes):
-            if cls_name not in self.mapping:
-                self.mapping[cls_name] = self.generator.generate(cls_name, kind="class")
-
-        for func_name in sorted(collector.defined_functions):
-            if func_name not in self.mapping:
-                self.mapping[func_name] = self.generator.generate(func_name, kind="function")
-
-        for mod_name in sorted(collector.defined_modules):
-            # For modules, if they look like "pkg.subpkg", we might want to rename just "pkg"?
-            # Or the whole string?
-            # Current logic: Simple exact match.
-            # If "flask" is collected, we map "flask" -> "c_xyz".
-            if mod_name not in self.mapping:
-                self.mapping[mod_name] = self.generator.generate(mod_name, kind="variable")
-
-        if self.intensity >= 5:
-            for param_name in sorted(collector.defined_params):
-                if param_name not in self.mapping:
-                    self.mapping[param_name] = self.generator.generate(param_name, kind="variable")
+        self.register_symbols(
+            scan_symbols(source_code, self.internal_prefixes, self.segment_threshold)
+        )
 
-            for local_name in sorted(collector.defined_locals):
-                if local_name not in self.mapping:
-                    self.mapping[local_name] = self.generator.generate(local_name, kind="variable")
+    def register_symbols(self, collector: "SymbolCollector") -> None:
+        """
+        Generates names for the symbols a collector found. Scanning is independent of the
+        mapping, so it can run in parallel; registering must happen in a fixed order.
+        """
+        self.register_names(registration_order(collector, self.intensity))
+
+    def register_names(self, entries: Iterable[tuple[str, str]]) -> None:
+        """Generates names for (name, kind) pairs, in order, skipping mapped names."""
+        pending: dict[str, str] = {}
+        for name, kind in entries:
+            if name not in self.mapping and name not in pending:
+                pending[name] = kind
+        if pending:
+            names = self.generator.generate_batch(list(pending), list(pending.values()))
+            self.mapping.update(zip(pending, names, strict=True))
+
+    def whitespace_rng(self, name: str) -> random.Random | None:
+        """
+        RNG for the whitespace noise of one file (None below intensity 5). Keyed by the
+        file's relative path, so output doesn't depend on the order files are transformed.
+        """
+        if self.intensity < 5:
+            return None
+        if self.whitespace_seed is None:
+            self.whitespace_seed = self.generator.rng.getrandbits(64)
+        return random.Random(f"{self.whitespace_seed}:{name}")
 
-            for attr_name in sorted(collector.defined_attributes):
-                if attr_name not in self.mapping:
-                    self.mapping[attr_name] = self.generator.generate(attr_name, kind="variable")
+    def transform_code(self, source_code: str, rng: random.Random | None = None) -> str:
+        """
+        Pass 2: Rename symbols based on existing mapping.
 
-    def transform_code(self, source_code: str) -> str:
-        """Pass 2: Rename symbols based on existing mapping."""
+        `rng` overrides the generator's RNG for whitespace perturbation, so a caller
+        transforming files out of order can still get reproducible output.
+        """
+        segments, config = split_segments(source_code, self.segment_threshold)
+        if len(segments) > 1:
+            return self._transform_segments(segments, config, rng)
+        hits = self._mapped_occurrences(source_code)
+        if not hits and self.intensity < 5 and not self._prepare_passes():
+            # Nothing to rename and no other pass: the source is the output, unparsed
+            return source_code
         # Note: We re-parse here. In a stricter implementation we might cache the tree.
-        tree = cst.parse_module(source_code)
+        with span("parse", "parse", size=len(source_code)):
+            tree = cst.parse_module(source_code)
+        return self._render(self.prepare(tree), rng, hits)
+
+    def prepare(self, tree: cst.Module) -> cst.Module:
+        """The passes before renaming that don't depend on the seed, so can be shared."""
+        for transformer in self._prepare_passes():
+            with span(type(transformer).__name__, "pass"):
+                tree = tree.visit(transformer)
+        return tree
+
+    def render(self, tree: cst.Module, rng: random.Random | None = None) -> str:
+        """Whitespace noise and renaming of a prepared tree."""
+        return self._render(tree, rng, None)
+
+    def _render(self, tree: cst.Module, rng: random.Random | None, hits: int | None) -> str:
+        for transformer in self._render_passes(rng):
+            with span(type(transformer).__name__, "pass"):
+                if isinstance(transformer, SymbolRenamer):
+                    tree = self._rename(tree, transformer, hits)
+                else:
+                    tree = tree.visit(transformer)
+        with span("codegen", "codegen"):
+            return tree.code
+
+    def _mapped_words(self) -> set[str]:
+        """First word of every mapped name (module names can be dotted)."""
+        # The mapping only grows or is replaced, so its identity and size pin down its keys.
+        # The dict itself is kept: a replaced mapping's id() can be reused by a new one.
+        mapping, size, words = self._words
+        if mapping is not self.mapping or size != len(self.mapping):
+            words = {name.split(".", 1)[0] for name in self.mapping}
+            self._words = (self.mapping, len(self.mapping), words)
+        return words
+
+    def _mapped_occurrences(self, code: str) -> int:
+        """Occurrences of mapped words in code, a bound on the statements renaming changes."""
+        words = self._mapped_words()
+        return sum(1 for word in _WORD_RE.findall(code) if word in words)
+
+    def _rename(self, tree: cst.Module, renamer: "SymbolRenamer", hits: int | None) -> cst.Module:
+        """
+        Applies the renamer to the parts of tree that can change. `hits` counts mapped
+        words in the source (None if unknown): with none the tree is returned as is, and
+        when at most half the top-level statements can hold one, statements without a
+        mapped word are skipped, since generating a statement's code is several times
+        cheaper than renaming it. Imports are always visited, as they tell the renamer
+        which names are external.
+        """
+        if hits == 0:
+            return tree
+        if hits is None or hits * 2 > len(tree.body):
+            return tree.visit(renamer)
+        words = self._mapped_words()
+        body = []
+        for statement in tree.body:
+            found = set(_WORD_RE.findall(tree.code_for_node(statement)))
+            if words.isdisjoint(found) and "import" not in found:
+                body.append(statement)
+            else:
+                body.append(statement.visit(renamer))
+        return tree.with_changes(body=body)
 
+    def _prepare_passes(self) -> list[cst.CSTTransformer]:
+        passes = []
         if self.strip_comments:
-            tree = tree.visit(CommentStripper())
+            passes.append(CommentStripper())
 
         if self.intensity >= 4:
-            tree = tree.visit(IfElseInverter())
-            tree = tree.visit(StatementReorderer())
+            passes.append(IfElseInverter())
+            passes.append(StatementReorderer())
+
+        if self.intensity >= 5:
+            passes.append(MetadataScrubber())
+        return passes
 
+    def _render_passes(self, rng: random.Random | None) -> list[cst.CSTTransformer]:
+        passes = []
         if self.intensity >= 5:
-            tree = tree.visit(MetadataScrubber())
-            tree = tree.visit(WhitespacePerturber(self.generator.rng))
+            passes.append(WhitespacePerturber(rng or self.generator.rng))
 
-        transformer = SymbolRenamer(self.mapping, self.internal_prefixes)
-        new_tree = tree.visit(transformer)
-        return new_tree.code
+        passes.append(SymbolRenamer(self.mapping, self.internal_prefixes))
+        return passes
+
+    def _transform_segments(
+        self, segments: list[str], config: cst.PartialParserConfig, rng: random.Random | None
+    ) -> str:
+        """
+        Transforms a huge file one segment at a time. Every segment goes through the same
+        pass instances, so stateful passes (imports seen by the renamer, the module-level
+        swap, the whitespace RNG) see the file as a whole; only one segment's tree is
+        alive at a time.
+        """
+        passes = self._prepare_passes() + self._render_passes(rng)
+        out = []
+        for segment in segments:
+            with span("parse", "parse", size=len(segment)):
+                tree = cst.parse_module(segment, config)
+            # Imports are still visited, as they tell the renamer which names are external
+            renames = "import" in segment or self._mapped_occurrences(segment)
+            for transformer in passes:
+                if isinstance(transformer, SymbolRenamer) and not renames:
+                    continue
+                with span(type(transformer).__name__, "pass"):
+                    tree = tree.visit(transformer)
+            with span("codegen", "codegen"):
+                out.append(tree.code)
+        return "".join(out)
+
+    def settings(self) -> dict:
+        """The constructor arguments that determine the output."""
+        return {
+            "seed": self.seed,
+            "theme": self.theme,
+            "intensity": self.intensity,
+            "internal_prefixes": self.internal_prefixes,
+            "strip_comments": self.strip_comments,
+        }
+
+    def save_mapping(self, path: Path) -> None:
+        """Writes the mapping, plus the settings that shaped the output, as JSON."""
+        manifest = {
+            **self.settings(),
+            "whitespace_seed": self.whitespace_seed,
+            "mapping": self.mapping,
+        }
+        Path(path).write_text(json.dumps(manifest, indent=2, ensure_ascii=False), "utf-8")
 
     def mutate_source(self, source_code: str) -> str:
         """
@@ -814,10 +1160,254 @@ class Mutator:
         self.collect_definitions(source_code)
         return self.transform_code(source_code)
 
+    async def amutate_source(self, source_code: str, executor: Executor | None = None) -> str:
+        """
+        mutate_source as a coroutine: the work runs on `executor` (the loop's default
+        thread pool if None; a ProcessPoolExecutor sidesteps the GIL), so the event loop
+        stays responsive. Output and the mutator's state afterwards are the same as
+        mutate_source's.
+
+        The job runs on a copy of the mutator that is merged back when it finishes, so a
+        cancelled call leaves the mutator as it was. Calls on one mutator run one at a
+        time, in the order they were made, which also bounds its jobs in the executor;
+        use one mutator per independent source to run them in parallel. In a process
+        pool, themes registered in code only exist in forked workers.
+        """
+        loop = asyncio.get_running_loop()
+        if self._async_lock is None or self._async_lock[0] is not loop:
+            self._async_lock = (loop, asyncio.Lock())
+        async with self._async_lock[1]:
+            code, state = await _offload(executor, _mutate_snapshot, _snapshot(self), source_code)
+            _restore_state(self, state)
+            return code
+
+    @classmethod
+    def mutate_ladder(
+        cls, source_code: str, intensities=(1, 2, 3, 4, 5), **mutator_kwargs
+    ) -> dict[int, str]:
+        """
+        Mutates one source at several intensities, returning {intensity: code}. Each
+        output is identical to `Mutator(intensity=i, **mutator_kwargs).mutate_source`.
+
+        The source is parsed and scanned once. Levels are cumulative, so each pass runs
+        once on the tree of the level below and the intermediate trees are shared
+        (libcst trees are immutable). Mappings are shared too: names come from one RNG
+        per theme, so levels 1-2 share a mapping, 3-4 share the multilingual one, and
+        level 5 extends it with parameters, locals and attributes.
+        """
+        if "intensity" in mutator_kwargs:
+            raise TypeError("Pass the levels as `intensities`, not `intensity`.")
+        strip_comments = mutator_kwargs.pop("strip_comments", False)
+        module = cst.parse_module(source_code)
+        collector = scan_module(module, mutator_kwargs.get("internal_prefixes"))
+
+        mutators: dict[str, Mutator] = {}  # by effective theme
+        mappings: dict[tuple[str, bool], dict[str, str]] = {}
+        trees: dict[tuple[bool, int], cst.Module] = {(False, 0): module}
+        outputs = {}
+        # Ascending, so a theme's base names are drawn before level 5 extends them
+        for level in sorted(set(intensities)):
+            mutator = cls(**mutator_kwargs, strip_comments=strip_comments, intensity=level)
+            mutator = mutators.setdefault(mutator.generator.theme, mutator)
+            key = (mutator.generator.theme, level >= 5)
+            if key not in mappings:
+                mutator.register_names(registration_order(collector, level))
+                mappings[key] = dict(mutator.mapping)
+
+            strip = strip_comments or level >= 2
+            if (strip, 0) not in trees:
+                trees[strip, 0] = module.visit(CommentStripper())
+            depth = 2 if level >= 5 else 1 if level >= 4 else 0
+            if depth >= 1 and (strip, 1) not in trees:
+                restructured = trees[strip, 0].visit(IfElseInverter())
+                trees[strip, 1] = restructured.visit(StatementReorderer())
+            if depth == 2 and (strip, 2) not in trees:
+                trees[strip, 2] = (
+                    trees[strip, 1]
+                    .visit(MetadataScrubber())
+                    .visit(WhitespacePerturber(mutator.generator.rng))
+                )
+
+            renamer = SymbolRenamer(mappings[key], mutator.internal_prefixes)
+            outputs[level] = trees[strip, depth].visit(renamer).code
+        return outputs
+
+
+def load_mapping(path: Path) -> dict:
+    """Reads a manifest written by Mutator.save_mapping."""
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+ERROR_MODES = ("raise", "skip")
+
+
+class FileFailure:
+    """A file left out of the output: the phase that failed ("collect", "transform" or
+    "write") and the error."""
+
+    def __init__(self, path: str, phase: str, error: str):
+        self.path = path
+        self.phase = phase
+        self.error = error
+
+    def to_dict(self) -> dict:
+        return {"path": self.path, "phase": self.phase, "error": self.error}
+
+
+class MutationReport:
+    """What mutate_directory did with each Python file."""
+
+    def __init__(self):
+        self.mutated: list[str] = []
+        # Already written by an earlier run, according to the checkpoint
+        self.resumed: list[str] = []
+        self.failures: list[FileFailure] = []
+
+    @property
+    def ok(self) -> bool:
+        return not self.failures
+
+    def to_dict(self) -> dict:
+        return {
+            "mutated": self.mutated,
+            "resumed": self.resumed,
+            "failures": [failure.to_dict() for failure in self.failures],
+        }
+
+    def format(self) -> str:
+        line = f"Mutated {len(self.mutated)} files"
+        if self.resumed:
+            line += f" ({len(self.resumed)} more were already done)"
+        if not self.failures:
+            return line + "."
+        lines = [f"{line}; {len(self.failures)} failed:"]
+        lines += [f"  {f.path} ({f.phase}): {f.error}" for f in self.failures]
+        return "\n".join(lines)
+
+
+def _checkpoint_state(mutator: Mutator, failures: list[FileFailure]) -> dict:
+    """Everything pass 2 needs from pass 1, including the generator's exact position."""
+    version, internal, gauss = mutator.generator.rng.getstate()
+    return {
+        "mapping": mutator.mapping,
+        "generated": sorted(mutator.generator.generated),
+        "rng": [version, list(internal), gauss],
+        "whitespace_seed": mutator.whitespace_seed,
+        "failures": [failure.to_dict() for failure in failures],
+    }
+
+
+def _restore_state(mutator: Mutator, state: dict) -> list[FileFailure]:
+    version, internal, gauss = state["rng"]
+    mutator.mapping = dict(state["mapping"])
+    mutator.generator.generated = set(state["generated"])
+    mutator.generator.rng.setstate((version, tuple(internal), gauss))
+    mutator.whitespace_seed = state["whitespace_seed"]
+    return [FileFailure(**failure) for failure in state["failures"]]
+
+
+def _snapshot(mutator: Mutator) -> dict:
+    """A picklable copy of the mutator, for jobs run in an executor."""
+    return {
+        "settings": mutator.settings(),
+        "segment_threshold": mutator.segment_threshold,
+        "state": _checkpoint_state(mutator, []),
+    }
+
+
+def _from_snapshot(snapshot: dict) -> Mutator:
+    mutator = Mutator(**snapshot["settings"], segment_threshold=snapshot["segment_threshold"])
+    _restore_state(mutator, snapshot["state"])
+    return mutator
+
+
+def _mutate_snapshot(snapshot: dict, source_code: str) -> tuple[str, dict]:
+    mutator = _from_snapshot(snapshot)
+    code = mutator.mutate_source(source_code)
+    return code, _checkpoint_state(mutator, [])
+
+
+async def _offload(executor: Executor | None, fn, *args):
+    """
+    Runs fn(*args) on executor. If the caller is cancelled, a job that hasn't started
+    is dropped; one already running can't be interrupted and finishes unobserved.
+    """
+    return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+
+
+def _read_text(path: Path) -> str:
+    with span("read", "io", path=str(path)):
+        return path.read_text(encoding="utf-8")
+
+
+def _read_each(files: list[Path]) -> Iterator[tuple[Path, str | None, Exception | None]]:
+    """Yields (path, source, None), or (path, None, error) for a file that can't be read."""
+    for path in files:
+        try:
+            yield path, _read_text(path), None
+        except Exception as e:
+            yield path, None, e
+
+
+def _read_ahead(
+    files: list[Path], depth: int
+) -> Iterator[tuple[Path, str | None, Exception | None]]:
+    """
+    Like _read_each, while a reader thread keeps up to `depth` files loaded ahead of
+    the consumer.
+    """
+    buffer: queue.Queue = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+    done = object()
+
+    def reader() -> None:
+        for path in files:
+            if stop.is_set():
+                return
+            try:
+                item = (path, _read_text(path), None)
+            except Exception as e:
+                item = (path, None, e)
+            buffer.put(item)
+        buffer.put(done)
+
+    thread = threading.Thread(target=reader, name="symbol-mutator-reader", daemon=True)
+    thread.start()
+    try:
+        while True:
+            with span("wait.reader", "wait"):
+                item = buffer.get()
+            if item is done:
+                break
+            yield item
+    finally:
+        # Unblock the reader if the consumer stopped early
+        stop.set()
+        while thread.is_alive():
+            try:
+                buffer.get(timeout=0.05)
+            except queue.Empty:
+                pass
+
+
+def _write_text(path: Path, text: str) -> None:
+    with span("write", "io", path=str(path)), open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
 
 def mutate_directory(
-    input_dir: Path, output_dir: Path, mutator: Mutator | None = None, **mutator_kwargs
-) -> None:
+    input_dir: Path,
+    output_dir: Path,
+    mutator: Mutator | None = None,
+    pipeline: bool = False,
+    prefetch: int = 16,
+    write_workers: int = 4,
+    mirror: bool = False,
+    link_mode: str = "auto",
+    errors: str = "raise",
+    checkpoint: Path | None = None,
+    **mutator_kwargs,
+) -> MutationReport:
     """
     Recursively helps mutate a directory of Python files.
 
@@ -825,7 +1415,28 @@ def mutate_directory(
         input_dir: Path to the directory to mutate.
         output_dir: Directory to save the mutated files.
         mutator: Optional pre-configured Mutator instance.
+        pipeline: Overlap I/O with transformation: a reader thread prefetches up to
+            `prefetch` sources and a pool of `write_workers` threads writes results,
+            while transforms still run one at a time in file order (so output is
+            identical to the sequential mode). Pays off on high-latency filesystems.
+        prefetch: Number of sources read ahead in pipeline mode.
+        write_workers: Number of writer threads in pipeline mode.
+        mirror: Reproduce the whole input tree rather than just its .py files. `.pyi`
+            stubs are mutated with the shared mapping; every other file is linked or
+            copied without passing through Python (see `mirror.copy_file`).
+            `__pycache__` directories are skipped.
+        link_mode: How mirrored files are copied: "auto", "hardlink", "reflink" or "copy".
+        errors: "raise" stops at the first file that can't be read, parsed or written;
+            "skip" leaves it out of the output, records it in the returned report and
+            carries on. Symbols of a file that fails to parse are not collected.
+        checkpoint: Manifest path (see `checkpoint.Checkpoint`). The mapping is saved
+            there after collection and each written file is journaled, so rerunning
+            the same job after a crash or interruption skips collection and the files
+            already done. Output is identical to an uninterrupted run.
         **mutator_kwargs: Arguments to pass to Mutator constructor if mutator is not provided.
+
+    Returns:
+        A MutationReport listing the files mutated, resumed and failed.
     """
     if mutator is None:
         mutator = Mutator(**mutator_kwargs)
@@ -835,26 +1446,301 @@ def mutate_directory(
 
     if not input_path.exists():
         raise FileNotFoundError(f"Input directory {input_path} does not exist.")
+    if link_mode not in LINK_MODES:
+        raise ValueError(f"link_mode must be one of {LINK_MODES}, got {link_mode!r}")
+    if errors not in ERROR_MODES:
+        raise ValueError(f"errors must be one of {ERROR_MODES}, got {errors!r}")
+
+    if mirror:
+        directories, all_files = walk_tree(input_path)
+        python_files = sorted(
+            f for f in all_files if f.suffix in (".py", ".pyi") and not f.is_symlink()
+        )
+        sources = set(python_files)
+        other_files = [f for f in all_files if f not in sources]
+    else:
+        directories = []
+        python_files = sorted(input_path.rglob("*.py"))
+        other_files = []
+
+    # Create the output tree once, not per file
+    out_dirs = {output_path / d.relative_to(input_path) for d in directories}
+    out_dirs.update((output_path / f.relative_to(input_path)).parent for f in python_files)
+    out_dirs.add(output_path)
+    for directory in sorted(out_dirs):
+        directory.mkdir(parents=True, exist_ok=True)
+
+    # Untouched files don't depend on the mapping, so they are copied alongside both passes
+    copier = ThreadPoolExecutor(max_workers=max(1, write_workers)) if other_files else None
+    copies = [
+        copier.submit(copy_file, f, output_path / f.relative_to(input_path), link_mode)
+        for f in other_files
+    ]
+    try:
+        with span("mutate_directory", files=len(python_files), pipeline=pipeline):
+            report = _mutate_files(
+                mutator,
+                python_files,
+                input_path,
+                output_path,
+                pipeline,
+                prefetch,
+                write_workers,
+                errors,
+                checkpoint,
+            )
+    finally:
+        if copier is not None:
+            copier.shutdown()
+    for future in copies:
+        future.result()
+    return report
+
+
+def _mutate_files(
+    mutator: Mutator,
+    python_files: list[Path],
+    input_path: Path,
+    output_path: Path,
+    pipeline: bool,
+    prefetch: int,
+    write_workers: int,
+    errors: str,
+    checkpoint_path: Path | None,
+) -> MutationReport:
+    from .checkpoint import Checkpoint, fingerprint
+
+    report = MutationReport()
+    relative = {path: path.relative_to(input_path).as_posix() for path in python_files}
+
+    def fail(path: Path, phase: str, error: Exception) -> None:
+        if errors == "raise":
+            raise error
+        message = f"{type(error).__name__}: {error}"
+        report.failures.append(FileFailure(relative[path], phase, message))
+
+    def read(files: list[Path]):
+        return _read_ahead(files, prefetch) if pipeline else _read_each(files)
+
+    checkpoint = expected = state = None
+    if checkpoint_path is not None:
+        checkpoint = Checkpoint(checkpoint_path)
+        expected = fingerprint(
+            {relative[path]: path for path in python_files}, output_path, mutator.settings()
+        )
+        state = checkpoint.load(expected)
+
+    try:
+        if state is None:
+            # Pass 1: Collect
+            for src_file, code, error in read(python_files):
+                try:
+                    if error is not None:
+                        raise error
+                    with span("collect", "file", path=relative[src_file]):
+                        mutator.collect_definitions(code)
+                except Exception as e:
+                    fail(src_file, "collect", e)
+            if checkpoint is not None:
+                checkpoint.save(expected, _checkpoint_state(mutator, report.failures))
+        else:
+            report.failures = _restore_state(mutator, state)
+
+        skipped = {failure.path for failure in report.failures}
+        done = set()
+        if checkpoint is not None:
+            for path, entry in checkpoint.entries().items():
+                if entry.get("status") == "done" and (output_path / path).exists():
+                    done.add(path)
+        report.resumed = [relative[f] for f in python_files if relative[f] in done]
+        pending = [f for f in python_files if relative[f] not in skipped | done]
+
+        def journal(path: Path, error: BaseException | None, phase: str = "write") -> None:
+            # Called by writer threads as soon as a file is written, so an interrupted run
+            # loses at most the files still in flight
+            if checkpoint is None:
+                return
+            if error is None:
+                checkpoint.record(relative[path], status="done")
+            else:
+                checkpoint.record(relative[path], status="failed", phase=phase)
 
-    python_files = list(input_path.rglob("*.py"))
-
-    # Pass 1: Collect
-    for src_file in python_files:
-        with open(src_file, encoding="utf-8") as f:
-            code = f.read()
-        mutator.collect_definitions(code)
-
-    # Pass 2: Transform
-    for src_file in python_files:
-        rel_path = src_file.relative_to(input_path)
-        dest_file = output_path / rel_path
-
-        dest_file.parent.mkdir(parents=True, exist_ok=True)
-
-        with open(src_file, encoding="utf-8") as f:
-            code = f.read()
-
-        mutated_code = mutator.transform_code(code)
+        def finished(path: Path, error: Exception | None, phase: str = "write") -> None:
+            if error is None:
+                report.mutated.append(relative[path])
+            else:
+                fail(path, phase, error)
+
+        # Pass 2: Transform, handing results to the writers in pipeline mode
+        in_flight = threading.BoundedSemaphore(max(1, prefetch))
+        writes = []
+        writers = ThreadPoolExecutor(max_workers=max(1, write_workers)) if pipeline else None
+        try:
+            for src_file, code, error in read(pending):
+                rel = relative[src_file]
+                try:
+                    if error is not None:
+                        raise error
+                    with span("transform", "file", path=rel):
+                        mutated_code = mutator.transform_code(code, rng=mutator.whitespace_rng(rel))
+                except Exception as e:
+                    journal(src_file, e, "transform")
+                    finished(src_file, e, "transform")
+                    continue
+                dest_file = output_path / rel
+                if writers is None:
+                    try:
+                        _write_text(dest_file, mutated_code)
+                    except Exception as e:
+                        journal(src_file, e)
+                        finished(src_file, e)
+                    else:
+                        journal(src_file, None)
+                        finished(src_file, None)
+                    continue
+                # Bound the finished-but-unwritten output held in memory
+                with span("wait.writers", "wait"):
+                    in_flight.acquire()
+                future = writers.submit(_write_text, dest_file, mutated_code)
+                future.add_done_callback(
+                    lambda f, path=src_file: (journal(path, f.exception()), in_flight.release())
+                )
+                writes.append((src_file, future))
+        finally:
+            if writers is not None:
+                writers.shutdown()
+        for src_file, future in writes:
+            finished(src_file, future.exception())
+    finally:
+        if checkpoint is not None:
+            checkpoint.close()
+    return report
+
+
+def _scan_file(
+    path: Path, internal_prefixes: list[str], segment_threshold: int | None, intensity: int
+) -> list[tuple[str, str]]:
+    """Pass 1 of one file, up to registration: the (name, kind) pairs to register."""
+    collector = scan_symbols(_read_text(path), internal_prefixes, segment_threshold)
+    return list(registration_order(collector, intensity))
+
+
+def _transform_file(
+    mutator: Mutator | dict, src: Path, dest: Path, rng: random.Random | None
+) -> tuple[str, Exception] | None:
+    """Pass 2 of one file. Returns None, or the phase that failed and its error."""
+    if isinstance(mutator, dict):
+        mutator = _from_snapshot(mutator)
+    try:
+        code = mutator.transform_code(_read_text(src), rng=rng)
+    except Exception as e:
+        return "transform", e
+    try:
+        _write_text(dest, code)
+    except Exception as e:
+        return "write", e
+    return None
+
+
+async def amutate_directory(
+    input_dir: Path,
+    output_dir: Path,
+    mutator: Mutator | None = None,
+    executor: Executor | None = None,
+    max_pending: int = 16,
+    errors: str = "raise",
+    **mutator_kwargs,
+) -> MutationReport:
+    """
+    mutate_directory as a coroutine, for the .py files of a tree. Files are read, scanned,
+    transformed and written by jobs on `executor` (the loop's default thread pool if
+    None), at most `max_pending` at a time, so a large tree neither stalls the event loop
+    nor floods the executor's queue. Registering names is the one serial step and still
+    happens in file order, so the output, mapping and report are the same as
+    mutate_directory's.
+
+    With a ProcessPoolExecutor each transform job is sent a copy of the mapping. If the
+    coroutine is cancelled, jobs that haven't started are dropped and running ones finish
+    in the background. For mirroring or checkpoints, run mutate_directory with
+    asyncio.to_thread.
+    """
+    if mutator is None:
+        mutator = Mutator(**mutator_kwargs)
+    if errors not in ERROR_MODES:
+        raise ValueError(f"errors must be one of {ERROR_MODES}, got {errors!r}")
+    input_path = Path(input_dir)
+    output_path = Path(output_dir)
+    if not input_path.exists():
+        raise FileNotFoundError(f"Input directory {input_path} does not exist.")
 
-        with open(dest_file, "w", encoding="utf-8") as f:
-            f.write(mutated_code)
+    python_files = await asyncio.to_thread(_list_sources, input_path, output_path)
+    relative = {path: path.relative_to(input_path).as_posix() for path in python_files}
+    report = MutationReport()
+
+    def fail(path: Path, phase: str, error: Exception) -> None:
+        if errors == "raise":
+            raise error
+        message = f"{type(error).__name__}: {error}"
+        report.failures.append(FileFailure(relative[path], phase, message))
+
+    pending = asyncio.Semaphore(max(1, max_pending))
+
+    async def job(fn, *args):
+        try:
+            return await _offload(executor, fn, *args)
+        finally:
+            pending.release()
+
+    async def run_all(jobs: list[tuple]) -> list:
+        """Results (or exceptions) of the jobs, in order, with at most max_pending queued."""
+        tasks = []
+        try:
+            for fn, *args in jobs:
+                await pending.acquire()
+                tasks.append(asyncio.ensure_future(job(fn, *args)))
+            return await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    with span("amutate_directory", files=len(python_files)):
+        # Pass 1: Collect
+        prefixes, threshold = mutator.internal_prefixes, mutator.segment_threshold
+        scans = await run_all(
+            [(_scan_file, f, prefixes, threshold, mutator.intensity) for f in python_files]
+        )
+        for src_file, entries in zip(python_files, scans, strict=True):
+            if isinstance(entries, Exception):
+                fail(src_file, "collect", entries)
+            else:
+                mutator.register_names(entries)
+
+        # Pass 2: Transform. Whitespace RNGs are drawn here, before the jobs share the mutator
+        skipped = {failure.path for failure in report.failures}
+        files = [f for f in python_files if relative[f] not in skipped]
+        rngs = [mutator.whitespace_rng(relative[f]) for f in files]
+        payload = _snapshot(mutator) if isinstance(executor, ProcessPoolExecutor) else mutator
+        results = await run_all(
+            [
+                (_transform_file, payload, f, output_path / relative[f], rng)
+                for f, rng in zip(files, rngs, strict=True)
+            ]
+        )
+        for src_file, result in zip(files, results, strict=True):
+            if isinstance(result, Exception):
+                fail(src_file, "transform", result)
+            elif result is not None:
+                fail(src_file, *result)
+            else:
+                report.mutated.append(relative[src_file])
+    return report
+
+
+def _list_sources(input_path: Path, output_path: Path) -> list[Path]:
+    """The .py files under input_path, with their output directories created."""
+    python_files = sorted(input_path.rglob("*.py"))
+    out_dirs = {(output_path / f.relative_to(input_path)).parent for f in python_files}
+    out_dirs.add(output_path)
+    for directory in sorted(out_dirs):
+        directory.mkdir(parents=True, exist_ok=True)
+    return python_files
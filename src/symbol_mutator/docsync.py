@@ -0,0 +1,195 @@
+"""
+Rewrites documentation to match a symbol mapping.
+
+Every mapping key is an identifier, so matching at identifier boundaries reduces to
+looking up each maximal identifier token of the text: one regex scan per file, with a
+hash lookup per token, is the automaton (this is what Aho-Corasick with word-boundary
+constraints degenerates to). Cost is linear in the document and independent of the
+mapping size. Dotted keys are handled part by part, the way the renamer rewrites
+dotted names in code.
+
+By default only code is rewritten: Markdown code spans and fenced blocks, RST inline
+literals, interpreted text (roles), literal blocks, code directives and doctest blocks.
+Prose is left alone, since at high intensities parameters and locals named like
+ordinary words ("data", "path") are mapped too.
+"""
+
+import re
+from pathlib import Path
+
+MARKDOWN_SUFFIXES = frozenset({".md", ".markdown"})
+RST_SUFFIXES = frozenset({".rst"})
+DOC_SUFFIXES = MARKDOWN_SUFFIXES | RST_SUFFIXES
+
+SCOPES = ("code", "all")
+
+_IDENTIFIER_RE = re.compile(r"[^\W\d]\w*")
+
+_MD_FENCE_RE = re.compile(r"^ {0,3}(`{3,}|~{3,})")
+_MD_SPAN_RE = re.compile(r"(?<!`)(?P<ticks>`+)(?!`)(.+?)(?<!`)(?P=ticks)(?!`)")
+
+# Inline literals, or interpreted text with an optional role (but not `hyperlinks`_)
+_RST_SPAN_RE = re.compile(r"``(.+?)``|(?<!`):?(?:[\w.+-]+:)*`([^`]+)`(?![`_])")
+_RST_CODE_DIRECTIVE_RE = re.compile(
+    r"^(\s*)\.\.\s+(code-block|code|sourcecode|doctest|testcode|testoutput|ipython)::"
+)
+
+
+def _indent(line: str) -> int:
+    return len(line) - len(line.lstrip())
+
+
+class DocRewriter:
+    """Applies a mapping to Markdown, reStructuredText or plain text in a single pass."""
+
+    def __init__(self, mapping: dict[str, str], scope: str = "code"):
+        if scope not in SCOPES:
+            raise ValueError(f"scope must be one of {SCOPES}, got {scope!r}")
+        self.mapping = {k: v for k, v in mapping.items() if "." not in k}
+        self.scope = scope
+
+    def _replace(self, match: re.Match) -> str:
+        name = match.group()
+        return self.mapping.get(name, name)
+
+    def rewrite_text(self, text: str) -> str:
+        """Renames every mapped identifier in text, regardless of context."""
+        return _IDENTIFIER_RE.sub(self._replace, text)
+
+    def _rewrite_spans(self, line: str, pattern: re.Pattern) -> str:
+        """Rewrites the code group of every span match (the last group that matched)."""
+
+        def replace(match: re.Match) -> str:
+            group = match.lastindex
+            start, end = match.span(group)
+            offset = match.start()
+            whole = match.group()
+            return (
+                whole[: start - offset]
+                + self.rewrite_text(match.group(group))
+                + whole[end - offset :]
+            )
+
+        return pattern.sub(replace, line)
+
+    def rewrite_markdown(self, text: str) -> str:
+        if self.scope == "all":
+            return self.rewrite_text(text)
+        out = []
+        fence = None
+        for line in text.splitlines(keepends=True):
+            if fence is not None:
+                closing = _MD_FENCE_RE.match(line)
+                if (
+                    closing
+                    and closing.group(1)[0] == fence[0]
+                    and len(closing.group(1)) >= len(fence)
+                    and not line[closing.end() :].strip()
+                ):
+                    fence = None
+                    out.append(line)
+                else:
+                    out.append(self.rewrite_text(line))
+                continue
+            opening = _MD_FENCE_RE.match(line)
+            if opening and not (opening.group(1)[0] == "`" and "`" in line[opening.end() :]):
+                fence = opening.group(1)
+                out.append(line)
+                continue
+            out.append(self._rewrite_spans(line, _MD_SPAN_RE))
+        return "".join(out)
+
+    def rewrite_rst(self, text: str) -> str:
+        if self.scope == "all":
+            return self.rewrite_text(text)
+        out = []
+        literal_indent = None  # indentation of the line that opened a literal block
+        in_doctest = False
+        for line in text.splitlines(keepends=True):
+            stripped = line.strip()
+
+            if literal_indent is not None:
+                if not stripped:
+                    out.append(line)
+                    continue
+                if _indent(line) > literal_indent:
+                    out.append(self.rewrite_text(line))
+                    continue
+                literal_indent = None
+
+            if in_doctest:
+                if stripped:
+                    out.append(self.rewrite_text(line))
+                    continue
+                in_doctest = False
+
+            if stripped.startswith(">>>"):
+                in_doctest = True
+                out.append(self.rewrite_text(line))
+                continue
+
+            directive = _RST_CODE_DIRECTIVE_RE.match(line)
+            if directive:
+                literal_indent = _indent(line)
+                out.append(line)
+                continue
+
+            out.append(self._rewrite_spans(line, _RST_SPAN_RE))
+            if stripped.endswith("::") and not stripped.startswith(".."):
+                literal_indent = _indent(line)
+        return "".join(out)
+
+    def rewrite(self, text: str, path: Path | str) -> str:
+        """Rewrites text according to the markup its file suffix implies."""
+        suffix = Path(path).suffix.lower()
+        if suffix in MARKDOWN_SUFFIXES:
+            return self.rewrite_markdown(text)
+        if suffix in RST_SUFFIXES:
+            return self.rewrite_rst(text)
+        return self.rewrite_text(text)
+
+
+def find_docs(root: Path) -> list[Path]:
+    """Markdown and RST files under root (or root itself if it is a file)."""
+    root = Path(root)
+    if root.is_file():
+        return [root]
+    return sorted(
+        p
+        for p in root.rglob("*")
+        if p.suffix.lower() in DOC_SUFFIXES and p.is_file() and "__pycache__" not in p.parts
+    )
+
+
+def sync_docs(
+    input_dir: Path,
+    output_dir: Path | None,
+    mapping: dict[str, str],
+    scope: str = "code",
+) -> list[Path]:
+    """
+    Rewrites every Markdown/RST file under input_dir into the same relative path under
+    output_dir (in place when output_dir is None). Returns the files written.
+    """
+    rewriter = DocRewriter(mapping, scope=scope)
+    input_dir = Path(input_dir)
+    written = []
+    for doc in find_docs(input_dir):
+        text = doc.read_text(encoding="utf-8")
+        if output_dir is None:
+            dest = doc
+        elif input_dir.is_file():
+            dest = Path(output_dir)
+        else:
+            dest = Path(output_dir) / doc.relative_to(input_dir)
+        new_text = rewriter.rewrite(text, doc)
+        if dest == doc and new_text == text:
+            continue
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        if dest != doc:
+            # A mirrored doc may be a hardlink or symlink to its source; writing through it
+            # would rewrite the input, so replace the link with a fresh file instead.
+            dest.unlink(missing_ok=True)
+        dest.write_text(new_text, encoding="utf-8")
+        written.append(dest)
+    return written
@@ -0,0 +1,543 @@
+"""
+Static alpha-equivalence check between original and mutated source.
+
+Both files are parsed with ``ast``. The mutated tree is mapped back to the original
+spelling through the inverse of ``Mutator.mapping``, and both trees are normalized
+for the transforms the intensity is allowed to apply: string statements are dropped
+when comments are stripped, metadata assignments at intensity 5, and ``if``/``else``
+pairs are brought to a canonical polarity at intensity 4+. Top-level functions and
+classes are then compared by structural hash. A mismatch is only accepted if it is
+the single adjacent swap of independent simple statements per block that
+``StatementReorderer`` may make.
+
+Renaming back can hide a rename that breaks name resolution (e.g. a use renamed
+while its import was kept), so each file is also checked for names that resolve in
+the original but not in the mutated code.
+"""
+
+import ast
+import builtins
+import hashlib
+import os
+import symtable
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from .core import METADATA_NAMES
+
+# Names every module can resolve without binding them
+_IMPLICIT_NAMES = frozenset(dir(builtins)) | {
+    "__name__",
+    "__file__",
+    "__doc__",
+    "__spec__",
+    "__loader__",
+    "__package__",
+    "__path__",
+    "__builtins__",
+    "__annotations__",
+    "__dict__",
+    "__module__",
+    "__qualname__",
+    "__class__",
+}
+
+_BLOCK_FIELDS = ("body", "orelse", "finalbody")
+
+
+class Divergence:
+    """One difference between an original file and its mutated copy."""
+
+    def __init__(self, path: str, symbol: str, reason: str):
+        self.path = path
+        self.symbol = symbol
+        self.reason = reason
+
+    def __repr__(self) -> str:
+        return f"Divergence({self.path!r}, {self.symbol!r}, {self.reason!r})"
+
+    def __str__(self) -> str:
+        return f"{self.path}::{self.symbol}: {self.reason}"
+
+
+class EquivalenceReport:
+    """Divergences found across a directory."""
+
+    def __init__(self, files_checked: int, divergences: list[Divergence]):
+        self.files_checked = files_checked
+        self.divergences = divergences
+
+    @property
+    def ok(self) -> bool:
+        return not self.divergences
+
+    def format(self) -> str:
+        lines = [f"Checked {self.files_checked} files: {len(self.divergences)} divergences"]
+        lines.extend(f"  {d}" for d in self.divergences)
+        return "\n".join(lines)
+
+
+class _InverseRenamer(ast.NodeTransformer):
+    """
+    Maps every identifier of the mutated tree back to its original spelling.
+
+    Strings are only mapped back where SymbolRenamer renames them: `__all__` entries and
+    types, i.e. annotations and cast/TypeVar arguments minus Literal values and Annotated
+    metadata. Type strings are reprinted with ``ast.unparse``, so the original tree must
+    go through an instance with an empty mapping too.
+    """
+
+    def __init__(self, inverse: dict[str, str]):
+        self.inverse = inverse
+        self._in_type = False
+
+    def _name(self, name: str | None) -> str | None:
+        if name is None:
+            return None
+        if name in self.inverse:
+            return self.inverse[name]
+        if "." in name:
+            return ".".join(self.inverse.get(part, part) for part in name.split("."))
+        return name
+
+    def _visit_as(self, node: ast.AST, in_type: bool) -> ast.AST:
+        saved, self._in_type = self._in_type, in_type
+        try:
+            return self.visit(node)
+        finally:
+            self._in_type = saved
+
+    def _child_in_type(self, parent: ast.AST, field: str, child: ast.AST) -> bool:
+        if field in ("annotation", "returns"):
+            return True
+        if isinstance(parent, ast.Call):
+            func = parent.func
+            name = func.attr if isinstance(func, ast.Attribute) else getattr(func, "id", None)
+            if name == "cast":
+                return child is parent.args[0] and _is_str(child) if parent.args else False
+            if name == "TypeVar":
+                # TypeVar("T", "A", "B", bound="C"): everything but the name is a type
+                if isinstance(child, ast.keyword):
+                    return child.arg == "bound" and _is_str(child.value)
+                return any(child is arg for arg in parent.args[1:]) and _is_str(child)
+        return self._in_type
+
+    def _rename_all_entries(self, value: ast.AST, bare: bool = False) -> None:
+        if isinstance(value, (ast.List, ast.Tuple, ast.Set)):
+            entries = value.elts
+        else:
+            entries = [value] if bare else []
+        for entry in entries:
+            if _is_str(entry):
+                entry.value = self.inverse.get(entry.value, entry.value)
+
+    def visit_Constant(self, node: ast.Constant) -> ast.AST:
+        if self._in_type and isinstance(node.value, str):
+            try:
+                expression = ast.parse(node.value.strip(), mode="eval").body
+            except SyntaxError:
+                return node
+            node.value = ast.unparse(self._visit_as(expression, True))
+        return node
+
+    def visit_Subscript(self, node: ast.Subscript) -> ast.AST:
+        value = node.value
+        name = value.attr if isinstance(value, ast.Attribute) else getattr(value, "id", None)
+        if self._in_type and name == "Literal":
+            node.value = self.visit(value)
+            node.slice = self._visit_as(node.slice, False)
+            return node
+        if self._in_type and name == "Annotated" and isinstance(node.slice, ast.Tuple):
+            # Annotated[T, metadata...]: only T is a type
+            node.value = self.visit(value)
+            first, *metadata = node.slice.elts
+            node.slice.elts = [self.visit(first)] + [self._visit_as(m, False) for m in metadata]
+            return node
+        return self.generic_visit(node)
+
+    def visit_Assign(self, node: ast.Assign) -> ast.AST:
+        self.generic_visit(node)
+        if any(isinstance(t, ast.Name) and t.id == "__all__" for t in node.targets):
+            self._rename_all_entries(node.value)
+        return node
+
+    def visit_AugAssign(self, node: ast.AugAssign) -> ast.AST:
+        self.generic_visit(node)
+        if isinstance(node.target, ast.Name) and node.target.id == "__all__":
+            self._rename_all_entries(node.value)
+        return node
+
+    def visit_Call(self, node: ast.Call) -> ast.AST:
+        self.generic_visit(node)
+        func = node.func
+        if isinstance(func, ast.Attribute) and getattr(func.value, "id", None) == "__all__":
+            # __all__.append("name") / __all__.extend([...])
+            for arg in node.args:
+                self._rename_all_entries(arg, bare=True)
+        return node
+
+    def generic_visit(self, node: ast.AST) -> ast.AST:
+        for field in ("id", "name", "attr", "arg", "module", "asname", "rest"):
+            value = getattr(node, field, None)
+            if isinstance(value, str):
+                setattr(node, field, self._name(value))
+        if isinstance(node, (ast.Global, ast.Nonlocal)):
+            node.names = [self._name(name) for name in node.names]
+        for field, value in ast.iter_fields(node):
+            if isinstance(value, list):
+                value[:] = [
+                    self._visit_as(item, self._child_in_type(node, field, item))
+                    if isinstance(item, ast.AST)
+                    else item
+                    for item in value
+                ]
+            elif isinstance(value, ast.AST):
+                setattr(node, field, self._visit_as(value, self._child_in_type(node, field, value)))
+        return node
+
+
+def _is_str(node: ast.AST) -> bool:
+    return isinstance(node, ast.Constant) and isinstance(node.value, str)
+
+
+class _Normalizer(ast.NodeTransformer):
+    """Undoes the effect of the intensity's non-renaming transforms on both trees."""
+
+    def __init__(self, strip_strings: bool, scrub_metadata: bool, canonical_if: bool):
+        self.strip_strings = strip_strings
+        self.scrub_metadata = scrub_metadata
+        self.canonical_if = canonical_if
+
+    def generic_visit(self, node: ast.AST) -> ast.AST:
+        super().generic_visit(node)
+        for field in _BLOCK_FIELDS:
+            block = getattr(node, field, None)
+            if isinstance(block, list) and block and isinstance(block[0], ast.stmt):
+                kept = [stmt for stmt in block if not self._dropped(stmt, block)]
+                # libcst renders a block emptied by the strippers as `pass`
+                setattr(node, field, kept or [ast.Pass()])
+        return node
+
+    def _dropped(self, stmt: ast.stmt, block: list[ast.stmt]) -> bool:
+        if self.strip_strings and isinstance(stmt, ast.Expr):
+            value = stmt.value
+            if isinstance(value, ast.Constant) and isinstance(value.value, (str, bytes)):
+                # CommentStripper only removes a string that is alone on its line
+                return sum(s.lineno == stmt.lineno for s in block) == 1
+        if self.scrub_metadata and isinstance(stmt, ast.Assign):
+            return any(isinstance(t, ast.Name) and t.id in METADATA_NAMES for t in stmt.targets)
+        return False
+
+    def visit_If(self, node: ast.If) -> ast.AST:
+        self.generic_visit(node)
+        if self.canonical_if:
+            # if not a: y else: x  ==  if a: x else: y
+            while (
+                node.orelse
+                and isinstance(node.test, ast.UnaryOp)
+                and isinstance(node.test.op, ast.Not)
+            ):
+                node.test = node.test.operand
+                node.body, node.orelse = node.orelse, node.body
+        return node
+
+
+def structural_hash(node: ast.AST) -> str:
+    """Hash of a node's shape and identifiers, ignoring positions."""
+    return hashlib.blake2b(
+        ast.dump(node, annotate_fields=False).encode("utf-8"), digest_size=16
+    ).hexdigest()
+
+
+def _identifiers(node: ast.AST) -> set[str]:
+    names = set()
+    for child in ast.walk(node):
+        for field in ("id", "attr", "arg", "name", "asname"):
+            value = getattr(child, field, None)
+            if isinstance(value, str):
+                names.add(value)
+    return names
+
+
+def _units(block: list[ast.stmt]) -> list[list[ast.stmt]]:
+    """Groups a block into source lines: `a = 1; b = 2` is one unit, as in libcst."""
+    units: list[list[ast.stmt]] = []
+    for stmt in block:
+        if (
+            units
+            and _is_simple(stmt)
+            and _is_simple(units[-1][-1])
+            and getattr(units[-1][-1], "lineno", None) == getattr(stmt, "lineno", -1)
+        ):
+            units[-1].append(stmt)
+        else:
+            units.append([stmt])
+    return units
+
+
+def _is_simple(stmt: ast.stmt) -> bool:
+    return not isinstance(
+        stmt,
+        (
+            ast.FunctionDef,
+            ast.AsyncFunctionDef,
+            ast.ClassDef,
+            ast.If,
+            ast.For,
+            ast.AsyncFor,
+            ast.While,
+            ast.With,
+            ast.AsyncWith,
+            ast.Try,
+            ast.Match,
+        )
+        + ((ast.TryStar,) if hasattr(ast, "TryStar") else ()),
+    )
+
+
+def _same_units(a: list[ast.stmt], b: list[ast.stmt], allow_swap: bool) -> bool:
+    return len(a) == len(b) and all(
+        _equivalent(x, y, allow_swap) for x, y in zip(a, b, strict=True)
+    )
+
+
+def _blocks_equivalent(a: list[ast.stmt], b: list[ast.stmt], allow_swap: bool) -> bool:
+    ua, ub = _units(a), _units(b)
+    if len(ua) != len(ub):
+        return False
+    swapped = not allow_swap
+    i = 0
+    while i < len(ua):
+        if _same_units(ua[i], ub[i], allow_swap):
+            i += 1
+            continue
+        if (
+            swapped
+            or i + 1 >= len(ua)
+            or not all(_is_simple(s) for s in ua[i] + ua[i + 1])
+            or not _same_units(ua[i], ub[i + 1], allow_swap)
+            or not _same_units(ua[i + 1], ub[i], allow_swap)
+        ):
+            return False
+        first = set().union(*(_identifiers(s) for s in ua[i]))
+        second = set().union(*(_identifiers(s) for s in ua[i + 1]))
+        if first & second:
+            # Swapping statements that share names can change behaviour
+            return False
+        swapped = True
+        i += 2
+    return True
+
+
+def _equivalent(a: ast.AST, b: ast.AST, allow_swap: bool) -> bool:
+    """Structural equality that tolerates one independent statement swap per block."""
+    if type(a) is not type(b):
+        return False
+    for field, value_a in ast.iter_fields(a):
+        value_b = getattr(b, field, None)
+        if isinstance(value_a, list):
+            if not isinstance(value_b, list):
+                return False
+            if field in _BLOCK_FIELDS and value_a and isinstance(value_a[0], ast.stmt):
+                if not _blocks_equivalent(value_a, value_b, allow_swap):
+                    return False
+            elif len(value_a) != len(value_b) or not all(
+                _equivalent(x, y, allow_swap) if isinstance(x, ast.AST) else x == y
+                for x, y in zip(value_a, value_b, strict=True)
+            ):
+                return False
+        elif isinstance(value_a, ast.AST):
+            if not _equivalent(value_a, value_b, allow_swap):
+                return False
+        elif value_a != value_b:
+            return False
+    return True
+
+
+def _unit_name(node: ast.stmt, index: int) -> str:
+    if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+        return node.name
+    return f"<module statement {index + 1}>"
+
+
+def unresolved_names(source: str) -> set[str]:
+    """
+    Names a module reads but never binds in any scope that could supply them.
+
+    Returns an empty set for modules with star imports, where resolution is unknowable.
+    """
+    tree = ast.parse(source)
+    if any(
+        isinstance(node, ast.ImportFrom) and any(a.name == "*" for a in node.names)
+        for node in ast.walk(tree)
+    ):
+        return set()
+    table = symtable.symtable(source, "<module>", "exec")
+
+    module_bound = set(_bound(table))
+    stack = list(table.get_children())
+    while stack:
+        child = stack.pop()
+        module_bound.update(
+            s.get_name() for s in child.get_symbols() if s.is_declared_global() and s.is_assigned()
+        )
+        stack.extend(child.get_children())
+
+    missing: set[str] = set()
+    _scan(table, module_bound, set(), missing)
+    return missing
+
+
+def _bound(table: symtable.SymbolTable) -> set[str]:
+    return {
+        s.get_name()
+        for s in table.get_symbols()
+        if s.is_assigned() or s.is_imported() or s.is_parameter() or s.is_namespace()
+    }
+
+
+def _scan(
+    table: symtable.SymbolTable, module_bound: set[str], enclosing: set[str], missing: set[str]
+) -> None:
+    bound = _bound(table)
+    for symbol in table.get_symbols():
+        name = symbol.get_name()
+        if not symbol.is_referenced() or name in bound:
+            continue
+        if name in enclosing or name in module_bound or name in _IMPLICIT_NAMES:
+            continue
+        missing.add(name)
+    # Class bodies are not visible to the functions nested in them
+    visible = enclosing | bound if table.get_type() == "function" else enclosing
+    for child in table.get_children():
+        _scan(child, module_bound, visible, missing)
+
+
+def check_source(
+    original: str,
+    mutated: str,
+    inverse: dict[str, str],
+    intensity: int = 1,
+    strip_comments: bool = False,
+    path: str = "<string>",
+) -> list[Divergence]:
+    """
+    Compares one original/mutated pair. `inverse` maps mutated names back to original
+    ones (the inverse of `Mutator.mapping`).
+    """
+    try:
+        original_tree = ast.parse(original)
+    except SyntaxError:
+        # The mutator cannot have produced anything for it either
+        return []
+    try:
+        mutated_tree = ast.parse(mutated)
+    except SyntaxError as e:
+        return [Divergence(path, "<module>", f"mutated code does not parse: {e.msg}")]
+
+    divergences = []
+    renamed_missing = {
+        name for name in unresolved_names(mutated) if inverse.get(name, name) != name
+    }
+    for name in sorted(renamed_missing - unresolved_names(original)):
+        divergences.append(
+            Divergence(path, name, f"renamed from {inverse[name]!r} but never bound")
+        )
+
+    normalizer = _Normalizer(
+        strip_strings=strip_comments or intensity >= 2,
+        scrub_metadata=intensity >= 5,
+        canonical_if=intensity >= 4,
+    )
+    original_tree = normalizer.visit(_InverseRenamer({}).visit(original_tree))
+    mutated_tree = normalizer.visit(_InverseRenamer(inverse).visit(mutated_tree))
+    if structural_hash(original_tree) == structural_hash(mutated_tree):
+        return divergences
+
+    allow_swap = intensity >= 4
+    if _equivalent(original_tree, mutated_tree, allow_swap):
+        return divergences
+
+    # Localize the difference to top-level definitions
+    a, b = _units(original_tree.body), _units(mutated_tree.body)
+    if len(a) != len(b):
+        divergences.append(Divergence(path, "<module>", "top-level statements differ"))
+        return divergences
+    localized = []
+    i = 0
+    while i < len(a):
+        if _same_units(a[i], b[i], allow_swap):
+            i += 1
+        elif i + 1 < len(a) and _blocks_equivalent(a[i] + a[i + 1], b[i] + b[i + 1], allow_swap):
+            i += 2
+        else:
+            localized.append(Divergence(path, _unit_name(a[i][0], i), "structure differs"))
+            i += 1
+    # Every unit matches on its own, so more than one swap reordered the module
+    divergences.extend(
+        localized or [Divergence(path, "<module>", "top-level statements reordered")]
+    )
+    return divergences
+
+
+_worker_settings: dict = {}
+
+
+def _init_worker(inverse: dict[str, str], intensity: int, strip_comments: bool) -> None:
+    _worker_settings.update(inverse=inverse, intensity=intensity, strip_comments=strip_comments)
+
+
+def _check_pair(job: tuple[str, str, str]) -> list[Divergence]:
+    rel_path, original_file, mutated_file = job
+    if not Path(mutated_file).exists():
+        return [Divergence(rel_path, "<module>", "mutated file is missing")]
+    return check_source(
+        Path(original_file).read_text(encoding="utf-8"),
+        Path(mutated_file).read_text(encoding="utf-8"),
+        _worker_settings["inverse"],
+        _worker_settings["intensity"],
+        _worker_settings["strip_comments"],
+        path=rel_path,
+    )
+
+
+def check_directory(
+    original_dir: Path,
+    mutated_dir: Path,
+    mapping: dict[str, str],
+    intensity: int = 1,
+    strip_comments: bool = False,
+    workers: int | None = None,
+) -> EquivalenceReport:
+    """
+    Checks every Python file under original_dir against its counterpart in mutated_dir.
+
+    Files are spread over a process pool; the inverse mapping is shipped to each worker
+    once rather than with every file.
+    """
+    original_dir = Path(original_dir)
+    mutated_dir = Path(mutated_dir)
+    inverse = {new: old for old, new in mapping.items()}
+    jobs = [
+        (
+            str(path.relative_to(original_dir)),
+            str(path),
+            str(mutated_dir / path.relative_to(original_dir)),
+        )
+        for path in sorted(original_dir.rglob("*.py"))
+    ]
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or len(jobs) < 2:
+        _init_worker(inverse, intensity, strip_comments)
+        results = [_check_pair(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(inverse, intensity, strip_comments),
+        ) as pool:
+            chunksize = max(1, len(jobs) // (workers * 4))
+            results = list(pool.map(_check_pair, jobs, chunksize=chunksize))
+
+    return EquivalenceReport(len(jobs), [d for found in results for d in found])
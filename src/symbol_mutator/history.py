@@ -0,0 +1,275 @@
+"""
+Rewrites a git repository's whole history with one global mapping.
+
+Working from a `git fast-export --no-data` stream keeps this proportional to the number
+of distinct Python blobs rather than commits x files: the stream names blobs by SHA, so
+each distinct `.py` blob is read once (`git cat-file --batch`), scanned once and
+mutated once in a process pool, and every commit that references it gets the same
+mutated blob. Other blobs are passed through by SHA, which is why the rewritten stream
+is imported into a clone that already holds them; the original objects are pruned
+afterwards.
+"""
+
+import os
+import random
+import re
+import shutil
+import subprocess
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import BinaryIO
+
+from .core import Mutator, scan_symbols
+
+_MODIFY_RE = re.compile(rb"^M (100644|100755) ([0-9a-f]{40}|[0-9a-f]{64}) (.+)$")
+_MARK_RE = re.compile(rb"^mark :(\d+)$")
+
+
+class HistoryReport:
+    """What a history rewrite touched."""
+
+    def __init__(self):
+        self.commits = 0
+        self.blobs = 0
+        self.mutated = 0
+        self.failed: list[str] = []
+
+    def format(self) -> str:
+        line = (
+            f"Rewrote {self.commits} commits: {self.mutated} of {self.blobs} distinct "
+            f"Python blobs mutated"
+        )
+        if self.failed:
+            line += f", {len(self.failed)} left unchanged (not parseable)"
+        return line
+
+
+def _is_python_path(raw_path: bytes) -> bool:
+    return raw_path.rstrip(b'"').endswith(b".py")
+
+
+def _git(repo: Path, *args: str, **kwargs) -> subprocess.CompletedProcess:
+    return subprocess.run(["git", "-C", str(repo), *args], check=True, **kwargs)
+
+
+def _iter_lines(stream: BinaryIO):
+    """Yields (line, payload): payload is the raw body after a `data <n>` line."""
+    while line := stream.readline():
+        payload = None
+        if line.startswith(b"data "):
+            payload = stream.read(int(line[5:]))
+        yield line, payload
+
+
+def scan_stream(stream: BinaryIO) -> tuple[set[str], int, int]:
+    """Distinct Python blob SHAs, the highest mark and the commit count of an export."""
+    shas: set[str] = set()
+    max_mark = commits = 0
+    for line, _ in _iter_lines(stream):
+        if line.startswith(b"commit "):
+            commits += 1
+        elif mark := _MARK_RE.match(line.rstrip(b"\n")):
+            max_mark = max(max_mark, int(mark.group(1)))
+        elif modify := _MODIFY_RE.match(line.rstrip(b"\n")):
+            if _is_python_path(modify.group(3)):
+                shas.add(modify.group(2).decode())
+    return shas, max_mark, commits
+
+
+def read_blobs(repo: Path, shas: list[str]) -> dict[str, bytes]:
+    """Reads blob contents through a single `git cat-file --batch` process."""
+    contents = {}
+    with subprocess.Popen(
+        ["git", "-C", str(repo), "cat-file", "--batch"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+    ) as proc:
+        for sha in shas:
+            proc.stdin.write(sha.encode() + b"\n")
+            proc.stdin.flush()
+            header = proc.stdout.readline().split()
+            if len(header) < 3 or header[1] != b"blob":
+                continue
+            contents[sha] = proc.stdout.read(int(header[2]))
+            proc.stdout.read(1)
+        proc.stdin.close()
+    return contents
+
+
+def write_stream(
+    stream_in: BinaryIO, stream_out: BinaryIO, replacements: dict[str, bytes], first_mark: int
+) -> None:
+    """
+    Copies an export to a fast-import stream, emitting each replacement blob once up front
+    and pointing every `M` line for a replaced SHA at its mark.
+    """
+    marks = {}
+    for offset, (sha, data) in enumerate(sorted(replacements.items())):
+        marks[sha.encode()] = f":{first_mark + offset}".encode()
+        stream_out.write(b"blob\nmark " + marks[sha.encode()] + b"\n")
+        stream_out.write(b"data %d\n" % len(data) + data + b"\n")
+
+    for line, payload in _iter_lines(stream_in):
+        modify = _MODIFY_RE.match(line.rstrip(b"\n"))
+        if modify and modify.group(2) in marks:
+            mode, sha, path = modify.groups()
+            line = b"M " + mode + b" " + marks[sha] + b" " + path + b"\n"
+        stream_out.write(line)
+        if payload is not None:
+            stream_out.write(payload)
+
+
+_worker: dict = {}
+
+
+def _init_worker(
+    mapping: dict[str, str],
+    internal_prefixes: list[str],
+    strip_comments: bool,
+    intensity: int,
+    base: int,
+) -> None:
+    mutator = Mutator(
+        seed=0,
+        internal_prefixes=internal_prefixes,
+        strip_comments=strip_comments,
+        intensity=intensity,
+    )
+    mutator.mapping = mapping
+    _worker.update(mutator=mutator, base=base)
+
+
+def _scan_blob(job: tuple[str, bytes, list[str]]):
+    sha, data, internal_prefixes = job
+    try:
+        return sha, scan_symbols(data.decode("utf-8"), internal_prefixes)
+    except Exception:
+        return sha, None
+
+
+def _mutate_blob(job: tuple[str, bytes]) -> tuple[str, bytes | None]:
+    sha, data = job
+    try:
+        # Whitespace noise seeded per blob, so results don't depend on scheduling
+        rng = random.Random(f"{_worker['base']}:{sha}")
+        return sha, _worker["mutator"].transform_code(data.decode("utf-8"), rng=rng).encode()
+    except Exception:
+        return sha, None
+
+
+def mutate_blobs(
+    blobs: dict[str, bytes], mutator: Mutator, workers: int | None = None
+) -> tuple[dict[str, bytes], list[str]]:
+    """
+    Scans and mutates each blob once. Returns (mutated blobs by SHA, SHAs that failed to
+    parse). Symbols are registered in SHA order, so the mapping is reproducible.
+    """
+    workers = workers or os.cpu_count() or 1
+    ordered = sorted(blobs)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        jobs = [(sha, blobs[sha], mutator.internal_prefixes) for sha in ordered]
+        scanned = dict(pool.map(_scan_blob, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+    failed = [sha for sha in ordered if scanned[sha] is None]
+    for sha in ordered:
+        if scanned[sha] is not None:
+            mutator.register_symbols(scanned[sha])
+
+    base = mutator.generator.rng.getrandbits(64)
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(
+            mutator.mapping,
+            mutator.internal_prefixes,
+            mutator.strip_comments,
+            mutator.intensity,
+            base,
+        ),
+    ) as pool:
+        jobs = [(sha, blobs[sha]) for sha in ordered if scanned[sha] is not None]
+        results = pool.map(_mutate_blob, jobs, chunksize=max(1, len(jobs) // (workers * 4)))
+        mutated = {}
+        for sha, data in results:
+            if data is None:
+                failed.append(sha)
+            else:
+                mutated[sha] = data
+    return mutated, sorted(failed)
+
+
+def rewrite_history(
+    repo: Path,
+    output: Path | None = None,
+    stream_path: Path | None = None,
+    mutator: Mutator | None = None,
+    workers: int | None = None,
+    **mutator_kwargs,
+) -> HistoryReport:
+    """
+    Mutates every Python file in every commit of `repo`.
+
+    With `output`, a new repository is created there holding only the rewritten history.
+    With `stream_path`, the fast-import stream is written there instead; it refers to
+    unchanged blobs by SHA, so import it into a clone of `repo`.
+    """
+    if output is None and stream_path is None:
+        raise ValueError("Pass an output repository path, a stream path, or both.")
+    if mutator is None:
+        mutator = Mutator(**mutator_kwargs)
+    repo = Path(repo)
+    report = HistoryReport()
+
+    with tempfile.TemporaryDirectory(prefix="symbol-mutator-history-") as tmp:
+        export = Path(tmp) / "export.stream"
+        with open(export, "wb") as f:
+            _git(
+                repo,
+                "fast-export",
+                "--all",
+                "--no-data",
+                "--signed-tags=strip",
+                "--tag-of-filtered-object=rewrite",
+                "--reencode=yes",
+                stdout=f,
+            )
+        with open(export, "rb") as f:
+            shas, max_mark, report.commits = scan_stream(f)
+
+        blobs = read_blobs(repo, sorted(shas))
+        report.blobs = len(blobs)
+        mutated, report.failed = mutate_blobs(blobs, mutator, workers)
+        report.mutated = len(mutated)
+
+        rewritten = Path(stream_path) if stream_path else Path(tmp) / "import.stream"
+        with open(export, "rb") as f_in, open(rewritten, "wb") as f_out:
+            write_stream(f_in, f_out, mutated, max_mark + 1)
+
+        if output is not None:
+            _import(repo, Path(output), rewritten)
+    return report
+
+
+def _import(repo: Path, output: Path, stream: Path) -> None:
+    if output.exists() and any(output.iterdir()):
+        raise FileExistsError(f"Output directory {output} is not empty.")
+    subprocess.run(
+        ["git", "clone", "--quiet", "--no-checkout", str(repo.resolve()), str(output)],
+        check=True,
+    )
+    try:
+        _git(output, "remote", "remove", "origin")
+        with open(stream, "rb") as f:
+            _git(output, "fast-import", "--quiet", "--force", stdin=f)
+        # Drop every object only the original history referenced
+        _git(output, "reflog", "expire", "--expire=now", "--all")
+        _git(output, "gc", "--quiet", "--prune=now")
+        head = subprocess.run(
+            ["git", "-C", str(output), "rev-parse", "--verify", "--quiet", "HEAD"],
+            capture_output=True,
+        )
+        if head.returncode == 0:
+            _git(output, "reset", "--quiet", "--hard")
+    except Exception:
+        shutil.rmtree(output, ignore_errors=True)
+        raise
@@ -1,6 +1,12 @@
+import inspect
+import json
 import os
+import tempfile
+import time
 from abc import ABC, abstractmethod
-from typing import Optional
+from collections.abc import Callable
+from pathlib import Path
+
 
 class LLMProvider(ABC):
     @abstractmethod
@@ -11,12 +17,59 @@ class LLMProvider(ABC):
     async def ask_async(self, prompt: str, json_mode: bool = False) -> str:
         pass
 
+    def ask_batch(
+        self,
+        prompts: dict[str, str],
+        json_mode: bool = False,
+        input_path: Path | None = None,
+        poll_interval: float = 30.0,
+        timeout: float | None = None,
+    ) -> dict[str, str]:
+        """
+        Answers many prompts in one submission, keyed by custom id.
+        Ids whose request failed are missing from the result.
+        Providers without a batch endpoint fall back to one call per prompt.
+        """
+        results = {}
+        for custom_id, prompt in prompts.items():
+            try:
+                results[custom_id] = self.ask(prompt, json_mode=json_mode)
+            except Exception as e:
+                print(f"      Batch request {custom_id} failed: {e}")
+        return results
+
+
+def _write_batch_input(lines, input_path: Path | None, tmp_dir: str | None = None) -> Path:
+    path = Path(input_path) if input_path else Path(tmp_dir) / "batch_input.jsonl"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        for line in lines:
+            f.write(json.dumps(line) + "\n")
+    return path
+
+
+def _wait_for(fetch: Callable, done: Callable, poll_interval: float, timeout: float | None):
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    while True:
+        obj = fetch()
+        if done(obj):
+            return obj
+        if deadline is not None and time.monotonic() > deadline:
+            raise TimeoutError(f"Batch {obj.id} did not finish within {timeout}s")
+        time.sleep(poll_interval)
+
+
 class OpenAIProvider(LLMProvider):
-    def __init__(self, api_key: Optional[str] = None, model: str = "gpt-4o"):
-        from openai import OpenAI, AsyncOpenAI
+    def __init__(
+        self, api_key: str | None = None, model: str = "gpt-4o", base_url: str | None = None
+    ):
+        from openai import AsyncOpenAI, OpenAI
+
         self.api_key = api_key or os.environ.get("OPENAI_API_KEY")
-        self.client = OpenAI(api_key=self.api_key)
-        self.async_client = AsyncOpenAI(api_key=self.api_key)
+        # base_url points the client at a compatible server, e.g. the local stand-in
+        self.base_url = base_url or os.environ.get("OPENAI_BASE_URL")
+        self.client = OpenAI(api_key=self.api_key, base_url=self.base_url)
+        self.async_client = AsyncOpenAI(api_key=self.api_key, base_url=self.base_url)
         self.model = model
 
     def ask(self, prompt: str, json_mode: bool = False) -> str:
@@ -24,7 +77,7 @@ class OpenAIProvider(LLMProvider):
         response = self.client.chat.completions.create(
             model=self.model,
             messages=[{"role": "user", "content": prompt}],
-            response_format=response_format
+            response_format=response_format,
         )
         return response.choices[0].message.content
 
@@ -33,37 +86,133 @@ class OpenAIProvider(LLMProvider):
         response = await self.async_client.chat.completions.create(
             model=self.model,
             messages=[{"role": "user", "content": prompt}],
-            response_format=response_format
+            response_format=response_format,
         )
         return response.choices[0].message.content
 
+    def ask_batch(
+        self,
+        prompts: dict[str, str],
+        json_mode: bool = False,
+        input_path: Path | None = None,
+        poll_interval: float = 30.0,
+        timeout: float | None = None,
+    ) -> dict[str, str]:
+        lines = []
+        for custom_id, prompt in prompts.items():
+            body = {"model": self.model, "messages": [{"role": "user", "content": prompt}]}
+            if json_mode:
+                body["response_format"] = {"type": "json_object"}
+            lines.append(
+                {
+                    "custom_id": custom_id,
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": body,
+                }
+            )
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = _write_batch_input(lines, input_path, tmp_dir)
+            with open(path, "rb") as f:
+                input_file = self.client.files.create(file=f, purpose="batch")
+
+        batch = self.client.batches.create(
+            input_file_id=input_file.id, endpoint="/v1/chat/completions", completion_window="24h"
+        )
+        batch = _wait_for(
+            lambda: self.client.batches.retrieve(batch.id),
+            lambda b: b.status in {"completed", "failed", "expired", "cancelled"},
+            poll_interval,
+            timeout,
+        )
+        if batch.status != "completed":
+            raise RuntimeError(f"Batch {batch.id} ended with status {batch.status}")
+
+        results = {}
+        if batch.output_file_id:
+            for line in self.client.files.content(batch.output_file_id).text.splitlines():
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                response = record.get("response") or {}
+                if response.get("status_code") == 200:
+                    results[record["custom_id"]] = response["body"]["choices"][0]["message"][
+                        "content"
+                    ]
+        return results
+
+
 class AnthropicProvider(LLMProvider):
-    def __init__(self, api_key: Optional[str] = None, model: str = "claude-3-5-sonnet-20240620"):
+    def __init__(
+        self,
+        api_key: str | None = None,
+        model: str = "claude-3-5-sonnet-20240620",
+        base_url: str | None = None,
+    ):
         from anthropic import Anthropic, AsyncAnthropic
+
         self.api_key = api_key or os.environ.get("ANTHROPIC_API_KEY")
-        self.client = Anthropic(api_key=self.api_key)
-        self.async_client = AsyncAnthropic(api_key=self.api_key)
+        self.base_url = base_url or os.environ.get("ANTHROPIC_BASE_URL")
+        self.client = Anthropic(api_key=self.api_key, base_url=self.base_url)
+        self.async_client = AsyncAnthropic(api_key=self.api_key, base_url=self.base_url)
         self.model = model
 
     def ask(self, prompt: str, json_mode: bool = False) -> str:
         message = self.client.messages.create(
-            model=self.model,
-            max_tokens=1000,
-            messages=[{"role": "user", "content": prompt}]
+            model=self.model, max_tokens=1000, messages=[{"role": "user", "content": prompt}]
         )
         return message.content[0].text
 
     async def ask_async(self, prompt: str, json_mode: bool = False) -> str:
         message = await self.async_client.messages.create(
-            model=self.model,
-            max_tokens=1000,
-            messages=[{"role": "user", "content": prompt}]
+            model=self.model, max_tokens=1000, messages=[{"role": "user", "content": prompt}]
         )
         return message.content[0].text
 
+    def ask_batch(
+        self,
+        prompts: dict[str, str],
+        json_mode: bool = False,
+        input_path: Path | None = None,
+        poll_interval: float = 30.0,
+        timeout: float | None = None,
+    ) -> dict[str, str]:
+        # Custom ids must match ^[a-zA-Z0-9_-]{1,64}$ for the Message Batches API
+        requests = [
+            {
+                "custom_id": custom_id,
+                "params": {
+                    "model": self.model,
+                    "max_tokens": 1000,
+                    "messages": [{"role": "user", "content": prompt}],
+                },
+            }
+            for custom_id, prompt in prompts.items()
+        ]
+        if input_path:
+            # The API takes the requests inline; the file keeps a record of what was submitted
+            _write_batch_input(requests, input_path)
+
+        batch = self.client.messages.batches.create(requests=requests)
+        batch = _wait_for(
+            lambda: self.client.messages.batches.retrieve(batch.id),
+            lambda b: b.processing_status == "ended",
+            poll_interval,
+            timeout,
+        )
+
+        results = {}
+        for entry in self.client.messages.batches.results(batch.id):
+            if entry.result.type == "succeeded":
+                results[entry.custom_id] = entry.result.message.content[0].text
+        return results
+
+
 class GeminiProvider(LLMProvider):
-    def __init__(self, api_key: Optional[str] = None, model: str = "gemini-1.5-pro"):
+    def __init__(self, api_key: str | None = None, model: str = "gemini-1.5-pro"):
         import google.generativeai as genai
+
         genai.configure(api_key=api_key or os.environ.get("GOOGLE_API_KEY"))
         self.model = genai.GenerativeModel(model)
 
@@ -75,29 +224,46 @@ class GeminiProvider(LLMProvider):
         response = await self.model.generate_content_async(prompt)
         return response.text
 
+
 class MockProvider(LLMProvider):
     def __init__(self, **kwargs):
         pass
 
     def ask(self, prompt: str, json_mode: bool = False) -> str:
         if json_mode:
-            return '{"library": "Unknown", "confidence_score": 0.0, "reasoning": "Mock identification"}'
+            return (
+                '{"library": "Unknown", "confidence_score": 0.0, '
+                '"reasoning": "Mock identification"}'
+            )
         return "This is a mock response identifying the library as 'Unknown'."
 
     async def ask_async(self, prompt: str, json_mode: bool = False) -> str:
         import asyncio
+
         await asyncio.sleep(0.1)
         if json_mode:
-            return '{"library": "Unknown", "confidence_score": 0.0, "reasoning": "Mock identification"}'
+            return (
+                '{"library": "Unknown", "confidence_score": 0.0, '
+                '"reasoning": "Mock identification"}'
+            )
         return "This is a mock response identifying the library as 'Unknown'."
 
+
+PROVIDERS: dict[str, type[LLMProvider]] = {
+    "openai": OpenAIProvider,
+    "anthropic": AnthropicProvider,
+    "gemini": GeminiProvider,
+    "mock": MockProvider,
+}
+
+
 def get_provider(name: str, **kwargs) -> LLMProvider:
-    providers = {
-        "openai": OpenAIProvider,
-        "anthropic": AnthropicProvider,
-        "gemini": GeminiProvider,
-        "mock": MockProvider
-    }
-    if name not in providers:
+    if name not in PROVIDERS:
         raise ValueError(f"Unknown provider: {name}")
-    return providers[name](**kwargs)
+    return PROVIDERS[name](**kwargs)
+
+
+def accepts(name: str, option: str) -> bool:
+    """Whether provider `name` takes the constructor argument `option` (e.g. base_url)."""
+    provider = PROVIDERS.get(name)
+    return provider is not None and option in inspect.signature(provider).parameters
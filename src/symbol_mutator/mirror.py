@@ -0,0 +1,130 @@
+"""
+Copies the files a mutation leaves untouched, so an output tree is complete without a
+second `cp -r`.
+
+Copies avoid pulling bytes through Python where the platform allows: hardlinks share
+the inode, reflinks (FICLONE) share extents on copy-on-write filesystems, and
+``copy_file_range``/``sendfile`` copy inside the kernel (server-side on NFS 4.2).
+Every method falls back to the next one down when the filesystem refuses it.
+"""
+
+import errno
+import os
+import shutil
+from pathlib import Path
+
+LINK_MODES = ("auto", "hardlink", "reflink", "copy")
+
+# Bytecode caches hold the original names and would be stale for mutated sources
+SKIP_DIRS = frozenset({"__pycache__"})
+
+# ioctl request number of FICLONE on Linux
+_FICLONE = 0x40049409
+
+# errnos that mean "this filesystem/kernel can't do that", not a real I/O failure
+_UNSUPPORTED = {
+    errno.EXDEV,
+    errno.EINVAL,
+    errno.ENOSYS,
+    errno.EOPNOTSUPP,
+    errno.ENOTTY,
+    errno.EPERM,
+    errno.EBADF,
+}
+
+
+def walk_tree(root: Path) -> tuple[list[Path], list[Path]]:
+    """
+    Directories and files under root (sorted), skipping bytecode caches. Symlinks to
+    directories are listed with the files, so they are recreated as links rather than
+    followed.
+    """
+    root = Path(root)
+    directories, files = [], []
+    for current, dirnames, filenames in os.walk(root):
+        current = Path(current)
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+        links = [d for d in dirnames if (current / d).is_symlink()]
+        directories.extend(current / d for d in dirnames if d not in links)
+        files.extend(current / f for f in sorted(filenames + links))
+    return directories, files
+
+
+def _reflink(src: Path, dest: Path) -> None:
+    import fcntl
+
+    with open(src, "rb") as s, open(dest, "wb") as d:
+        fcntl.ioctl(d.fileno(), _FICLONE, s.fileno())
+
+
+def _copy_in_kernel(src: Path, dest: Path) -> str:
+    with open(src, "rb") as s, open(dest, "wb") as d:
+        size = os.fstat(s.fileno()).st_size
+        for method in ("copy_file_range", "sendfile"):
+            if not hasattr(os, method):
+                continue
+            try:
+                copied = 0
+                while copied < size:
+                    if method == "copy_file_range":
+                        n = os.copy_file_range(s.fileno(), d.fileno(), size - copied)
+                    else:
+                        n = os.sendfile(d.fileno(), s.fileno(), copied, size - copied)
+                    if n == 0:
+                        break
+                    copied += n
+                if copied == size:
+                    return method
+            except OSError as e:
+                if e.errno not in _UNSUPPORTED:
+                    raise
+            # Start over with the next method
+            s.seek(0)
+            d.seek(0)
+            d.truncate()
+        shutil.copyfileobj(s, d)
+        return "copy"
+
+
+def copy_file(src: Path, dest: Path, link_mode: str = "auto") -> str:
+    """
+    Mirrors one file to dest and returns the method that succeeded.
+
+    `link_mode` picks the first method to try: "hardlink" (output shares the inode, so
+    editing it edits the input), "reflink", or "copy" (in-kernel copy). "auto" tries a
+    reflink and then an in-kernel copy, never a hardlink. Symlinks are recreated as
+    symlinks.
+    """
+    if link_mode not in LINK_MODES:
+        raise ValueError(f"link_mode must be one of {LINK_MODES}, got {link_mode!r}")
+    src, dest = Path(src), Path(dest)
+    if dest.is_dir() and not dest.is_symlink():
+        # Left by a run that mirrored a directory symlink as a directory
+        dest.rmdir()
+    elif dest.is_symlink() or dest.exists():
+        dest.unlink()
+
+    if src.is_symlink():
+        os.symlink(os.readlink(src), dest)
+        return "symlink"
+
+    if link_mode == "hardlink":
+        try:
+            os.link(src, dest)
+            return "hardlink"
+        except OSError as e:
+            if e.errno not in _UNSUPPORTED:
+                raise
+
+    method = None
+    if link_mode in ("auto", "reflink", "hardlink"):
+        try:
+            _reflink(src, dest)
+            method = "reflink"
+        except (OSError, ImportError) as e:
+            if isinstance(e, OSError) and e.errno not in _UNSUPPORTED:
+                raise
+    if method is None:
+        method = _copy_in_kernel(src, dest)
+    shutil.copymode(src, dest)
+    return method
@@ -0,0 +1,200 @@
+"""
+Offline perplexity of Python code under a token n-gram model.
+
+The secondary benchmark metric: code an LLM has memorized should be predictable
+(low perplexity), mutated code should be surprising. Training and scoring are
+vectorized over NumPy count arrays: n-grams are hashed into uint64 keys, counted
+with ``np.unique`` and looked up with ``np.searchsorted``, so the only Python loops
+run over the n-gram order, never over tokens.
+
+Requires NumPy (``pip install symbol-mutator[benchmark]``).
+"""
+
+import io
+import re
+import sysconfig
+import tokenize
+from collections.abc import Iterable
+from pathlib import Path
+
+import numpy as np
+
+UNK = "<unk>"
+BOS = "<s>"
+
+# Odd 64-bit multiplier for the rolling n-gram hash (wraps modulo 2**64)
+_HASH_MULT = np.uint64(0x9E3779B97F4A7C15)
+
+_FALLBACK_RE = re.compile(r"\w+|[^\w\s]|\n")
+
+
+def tokenize_code(source: str) -> list[str]:
+    """
+    Splits Python source into lexical tokens, keeping layout tokens (NEWLINE, INDENT,
+    DEDENT) and dropping comments and non-logical newlines. Code that does not tokenize
+    falls back to a regex split.
+    """
+    skip = {tokenize.ENCODING, tokenize.COMMENT, tokenize.NL, tokenize.ENDMARKER}
+    try:
+        tokens = []
+        for tok in tokenize.generate_tokens(io.StringIO(source).readline):
+            if tok.type in skip:
+                continue
+            if tok.type == tokenize.NEWLINE:
+                tokens.append("<nl>")
+            elif tok.type == tokenize.INDENT:
+                tokens.append("<indent>")
+            elif tok.type == tokenize.DEDENT:
+                tokens.append("<dedent>")
+            else:
+                tokens.append(tok.string)
+        return tokens
+    except (tokenize.TokenError, IndentationError, SyntaxError):
+        return [t if t != "\n" else "<nl>" for t in _FALLBACK_RE.findall(source)]
+
+
+def _hash_ngrams(ids: np.ndarray, n: int) -> np.ndarray:
+    """Rolling hash of every length-n window of ids (one uint64 per window)."""
+    count = len(ids) - n + 1
+    if count <= 0:
+        return np.empty(0, dtype=np.uint64)
+    h = ids[:count].astype(np.uint64)
+    with np.errstate(over="ignore"):
+        for j in range(1, n):
+            h = h * _HASH_MULT + ids[j : j + count].astype(np.uint64)
+    return h
+
+
+def _concat(arrays: list[np.ndarray]) -> np.ndarray:
+    return np.concatenate(arrays) if arrays else np.empty(0, dtype=np.uint64)
+
+
+def _lookup(keys: np.ndarray, counts: np.ndarray, queries: np.ndarray) -> np.ndarray:
+    """Counts for each query key (0 where absent) via binary search on the sorted keys."""
+    if len(keys) == 0:
+        return np.zeros(len(queries), dtype=np.float64)
+    idx = np.searchsorted(keys, queries)
+    idx = np.minimum(idx, len(keys) - 1)
+    return np.where(keys[idx] == queries, counts[idx], 0).astype(np.float64)
+
+
+class NGramModel:
+    """
+    Token n-gram language model with recursive Dirichlet smoothing:
+    p_n(w | ctx) = (c(ctx w) + alpha * p_{n-1}(w | ctx')) / (c(ctx) + alpha),
+    bottoming out in an add-one unigram model. Out-of-vocabulary tokens map to <unk>.
+    """
+
+    def __init__(self, order: int = 3, alpha: float = 2.0):
+        if order < 1:
+            raise ValueError("order must be >= 1")
+        self.order = order
+        self.alpha = alpha
+        self.vocab: dict[str, int] = {UNK: 0, BOS: 1}
+        self.total_tokens = 0
+        self.unigram_counts = np.zeros(2, dtype=np.int64)
+        # Per order n >= 2: sorted n-gram keys/counts and sorted context keys/counts
+        self.ngram_keys: list[np.ndarray] = []
+        self.ngram_counts: list[np.ndarray] = []
+        self.context_keys: list[np.ndarray] = []
+        self.context_counts: list[np.ndarray] = []
+
+    def encode(self, tokens: list[str], grow: bool = False) -> np.ndarray:
+        """Maps tokens to ids, prefixed with order - 1 BOS pads."""
+        if grow:
+            for tok in tokens:
+                if tok not in self.vocab:
+                    self.vocab[tok] = len(self.vocab)
+        ids = [self.vocab.get(tok, 0) for tok in tokens]
+        return np.array([1] * (self.order - 1) + ids, dtype=np.int64)
+
+    def fit(self, sources: Iterable[str]) -> "NGramModel":
+        """Trains on an iterable of source texts (replacing any previous counts)."""
+        docs = [self.encode(tokenize_code(src), grow=True) for src in sources]
+        pad = self.order - 1
+
+        targets = np.concatenate([d[pad:] for d in docs]) if docs else np.empty(0, np.int64)
+        self.total_tokens = len(targets)
+        self.unigram_counts = np.bincount(targets, minlength=len(self.vocab)).astype(np.int64)
+
+        self.ngram_keys, self.ngram_counts = [], []
+        self.context_keys, self.context_counts = [], []
+        for n in range(2, self.order + 1):
+            # Windows that end on a real token; the first pad - (n - 1) windows only cover pads
+            skip = pad - (n - 1)
+            grams = [_hash_ngrams(d, n)[skip:] for d in docs]
+            contexts = [_hash_ngrams(d[:-1], n - 1)[skip:] for d in docs]
+            keys, counts = np.unique(_concat(grams), return_counts=True)
+            ctx_keys, ctx_counts = np.unique(_concat(contexts), return_counts=True)
+            self.ngram_keys.append(keys)
+            self.ngram_counts.append(counts)
+            self.context_keys.append(ctx_keys)
+            self.context_counts.append(ctx_counts)
+        return self
+
+    def token_log_probs(self, source: str) -> np.ndarray:
+        """Natural-log probability of every token of source."""
+        return self.log_probs_of_ids(self.encode(tokenize_code(source)))
+
+    def log_probs_of_ids(self, ids: np.ndarray) -> np.ndarray:
+        """Natural-log probability of every id after the order - 1 leading pads."""
+        pad = self.order - 1
+        targets = ids[pad:]
+        if len(targets) == 0:
+            return np.empty(0, dtype=np.float64)
+
+        vocab_size = len(self.vocab)
+        probs = (self.unigram_counts[targets] + 1.0) / (self.total_tokens + vocab_size)
+        for n in range(2, self.order + 1):
+            start = pad - (n - 1)
+            grams = _hash_ngrams(ids[start:], n)
+            contexts = _hash_ngrams(ids[start:-1], n - 1)
+            c_gram = _lookup(self.ngram_keys[n - 2], self.ngram_counts[n - 2], grams)
+            c_ctx = _lookup(self.context_keys[n - 2], self.context_counts[n - 2], contexts)
+            probs = (c_gram + self.alpha * probs) / (c_ctx + self.alpha)
+        return np.log(probs)
+
+    def perplexity(self, source: str) -> float:
+        log_probs = self.token_log_probs(source)
+        if len(log_probs) == 0:
+            return float("nan")
+        return float(np.exp(-log_probs.mean()))
+
+
+def perplexity(source: str, model: NGramModel) -> float:
+    """Perplexity of source under model."""
+    return model.perplexity(source)
+
+
+def surprise_ratio(original: str, mutated: str, model: NGramModel) -> float:
+    """How much more surprising the mutated code is than the original (> 1 is better)."""
+    return model.perplexity(mutated) / model.perplexity(original)
+
+
+def read_corpus(paths: Iterable[Path], max_files: int | None = None) -> list[str]:
+    """Reads .py files (directories are searched recursively) in a deterministic order."""
+    files: list[Path] = []
+    for path in paths:
+        path = Path(path)
+        files.extend(sorted(path.rglob("*.py")) if path.is_dir() else [path])
+    sources = []
+    for file in files[:max_files] if max_files else files:
+        try:
+            sources.append(file.read_text(encoding="utf-8"))
+        except (UnicodeDecodeError, OSError):
+            continue
+    return sources
+
+
+def default_corpus(max_files: int = 400) -> list[str]:
+    """A slice of the local standard library: generic Python, available offline."""
+    return read_corpus([Path(sysconfig.get_paths()["stdlib"])], max_files=max_files)
+
+
+def train_model(
+    corpus: Iterable[str] | None = None, order: int = 3, alpha: float = 2.0
+) -> NGramModel:
+    """Fits an NGramModel on corpus, or on the default standard-library corpus."""
+    return NGramModel(order=order, alpha=alpha).fit(
+        corpus if corpus is not None else default_corpus()
+    )
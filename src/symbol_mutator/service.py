@@ -0,0 +1,494 @@
+"""
+Long-lived worker mode: newline-delimited JSON requests in, JSON responses out.
+
+Build systems that call the CLI once per target pay interpreter start-up and the libcst
+import every time, and each call starts from an empty mapping. A service process keeps
+one warm Mutator per session, so files mutated by separate requests share one mapping.
+
+Each request is an object with an `op`, an optional `id` echoed in the response and an
+optional `session` (default "default"):
+
+- `open`: (re)create the session; takes `seed`, `theme`, `intensity`,
+  `internal_prefixes` and `strip_comments`.
+- `collect`: register the symbols of `source` (or the file at `path`).
+- `transform`: rename with the current mapping; returns `source`, or writes `output`.
+- `mutate`: `collect` then `transform`.
+- `unmutate`: restore the original names in `source` (code, model output, prose).
+- `mapping`: return the manifest, or write it to `path`.
+- `snapshot`: write the session to the snapshot directory now.
+- `close`: drop the session, and its snapshot.
+
+Responses are `{"id", "ok": true, "result"}` or `{"id", "ok": false, "error"}` and may
+arrive out of order. Requests run on a thread pool, ordered per session: operations
+that change the mapping wait for everything sent to the session before them, and
+read-only requests after them run concurrently with one another.
+
+The same requests can be sent over HTTP (`serve_http`), so one warm process serves many
+tools. With `max_sessions`, the least recently used idle session is evicted when
+another is needed; with a `snapshot_dir` it is written there first, along with the
+generator state, and reloaded on its next request, so eviction and restarts don't
+change the names a session hands out. Request counts and latencies are kept per op
+and exposed in the Prometheus text format.
+"""
+
+import bisect
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import TextIO
+from urllib.parse import quote
+
+from .core import Mutator, _from_snapshot, _snapshot
+from .unmutate import Unmutator
+
+READ_OPS = frozenset({"transform", "unmutate", "mapping", "snapshot"})
+WRITE_OPS = frozenset({"open", "collect", "mutate", "close"})
+MUTATOR_OPTIONS = ("seed", "theme", "intensity", "internal_prefixes", "strip_comments")
+# Request fields naming files on the server, which HTTP clients may only use if allowed
+FILE_FIELDS = ("path", "output")
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class MutationSession:
+    """A warm Mutator plus the seed its per-source whitespace RNGs derive from."""
+
+    def __init__(self, options: dict):
+        unknown = set(options) - set(MUTATOR_OPTIONS)
+        if unknown:
+            raise ValueError(f"Unknown session options: {', '.join(sorted(unknown))}")
+        options = {"seed": 42, **options}
+        self.seed = options["seed"]
+        self.mutator = Mutator(**options)
+        self._unmutator: tuple[int, Unmutator] | None = None
+
+    @classmethod
+    def restore(cls, snapshot: dict) -> "MutationSession":
+        """A session exactly as it was when `snapshot()` was taken."""
+        session = cls(snapshot["settings"])
+        session.mutator = _from_snapshot(snapshot)
+        return session
+
+    def snapshot(self) -> dict:
+        return _snapshot(self.mutator)
+
+    def transform(self, source: str) -> str:
+        # Seeded by content, so concurrent transforms don't race on the shared generator
+        digest = hashlib.blake2b(source.encode("utf-8"), digest_size=8).hexdigest()
+        return self.mutator.transform_code(source, rng=random.Random(f"{self.seed}:{digest}"))
+
+    def unmutate(self, text: str) -> str:
+        # The mapping only grows, so its size tells whether the reverse index is current
+        cached = self._unmutator
+        if cached is None or cached[0] != len(self.mutator.mapping):
+            cached = self._unmutator = (len(self.mutator.mapping), Unmutator(self.mutator.mapping))
+        return cached[1].unmutate(text)
+
+
+class _Chain:
+    """Scheduling state of one session: the last write and the reads issued since."""
+
+    def __init__(self):
+        self.write: Future | None = None
+        self.reads: list[Future] = []
+
+
+class _Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.sum = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.sum += seconds
+
+    def render(self, name: str, labels: str) -> list[str]:
+        lines, total = [], 0
+        for bound, count in zip((*LATENCY_BUCKETS, "+Inf"), self.counts, strict=True):
+            total += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {total}')
+        lines.append(f"{name}_sum{{{labels}}} {self.sum:.6f}")
+        lines.append(f"{name}_count{{{labels}}} {total}")
+        return lines
+
+
+class ServiceMetrics:
+    """Request counts and latency histograms per op, plus session churn."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests: dict[tuple[str, str], int] = {}
+        self.latency: dict[str, _Histogram] = {}
+        self.queued: dict[str, _Histogram] = {}
+        self.evictions = 0
+        self.restores = 0
+
+    def observe(self, op, ok: bool, seconds: float, queued: float) -> None:
+        """Records a request: time spent running it, and waiting for a worker and for
+        the session requests it is ordered after."""
+        op = op if op in READ_OPS | WRITE_OPS else "invalid"
+        with self._lock:
+            key = (op, "ok" if ok else "error")
+            self.requests[key] = self.requests.get(key, 0) + 1
+            self.latency.setdefault(op, _Histogram()).observe(seconds)
+            self.queued.setdefault(op, _Histogram()).observe(queued)
+
+    def render(self, sessions: int) -> str:
+        """The Prometheus text exposition format."""
+        lines = [
+            "# TYPE symbol_mutator_requests_total counter",
+            "# TYPE symbol_mutator_request_duration_seconds histogram",
+            "# TYPE symbol_mutator_request_queued_seconds histogram",
+            "# TYPE symbol_mutator_sessions gauge",
+            "# TYPE symbol_mutator_session_evictions_total counter",
+            "# TYPE symbol_mutator_session_restores_total counter",
+        ]
+        with self._lock:
+            for (op, status), count in sorted(self.requests.items()):
+                labels = f'op="{op}",status="{status}"'
+                lines.append(f"symbol_mutator_requests_total{{{labels}}} {count}")
+            for op, histogram in sorted(self.latency.items()):
+                name = "symbol_mutator_request_duration_seconds"
+                lines += histogram.render(name, f'op="{op}"')
+            for op, histogram in sorted(self.queued.items()):
+                lines += histogram.render("symbol_mutator_request_queued_seconds", f'op="{op}"')
+            lines.append(f"symbol_mutator_sessions {sessions}")
+            lines.append(f"symbol_mutator_session_evictions_total {self.evictions}")
+            lines.append(f"symbol_mutator_session_restores_total {self.restores}")
+        return "\n".join(lines) + "\n"
+
+
+def _source(request: dict) -> str:
+    if "source" in request:
+        return request["source"]
+    if "path" in request:
+        return Path(request["path"]).read_text(encoding="utf-8")
+    raise ValueError("Request needs 'source' or 'path'.")
+
+
+class MutationService:
+    """
+    Dispatches requests to sessions; `defaults` configure sessions not explicitly opened.
+
+    At most `max_sessions` sessions are kept in memory (unbounded if None); evicted ones
+    are written to `snapshot_dir`, if given, and so are all sessions on close().
+    """
+
+    def __init__(
+        self,
+        defaults: dict | None = None,
+        workers: int | None = None,
+        max_sessions: int | None = None,
+        snapshot_dir: Path | None = None,
+    ):
+        if max_sessions is not None and max_sessions < 1:
+            raise ValueError("max_sessions must be at least 1.")
+        self.defaults = dict(defaults or {})
+        # Least recently used first
+        self.sessions: OrderedDict[str, MutationSession] = OrderedDict()
+        self.max_sessions = max_sessions
+        self.snapshot_dir = Path(snapshot_dir) if snapshot_dir is not None else None
+        self.metrics = ServiceMetrics()
+        self._chains: dict[str, _Chain] = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mutator")
+
+    def _session(self, name: str) -> MutationSession:
+        with self._lock:
+            session = self.sessions.get(name)
+            if session is None:
+                session = self._load(name) or MutationSession(self.defaults)
+                self._install(name, session)
+            else:
+                self.sessions.move_to_end(name)
+            return session
+
+    def _install(self, name: str, session: MutationSession) -> None:
+        """Makes session the most recently used and evicts beyond max_sessions. Needs _lock."""
+        self.sessions[name] = session
+        self.sessions.move_to_end(name)
+        if self.max_sessions is None:
+            return
+        excess = len(self.sessions) - self.max_sessions
+        for candidate in list(self.sessions):
+            if excess <= 0:
+                break
+            # A session with requests in flight stays; the limit is exceeded meanwhile
+            if candidate == name or self._busy(candidate):
+                continue
+            evicted = self.sessions.pop(candidate)
+            self._chains.pop(candidate, None)
+            # Saved before the lock is released, so a request for it can't load a stale copy
+            self._save(candidate, evicted)
+            self.metrics.evictions += 1
+            excess -= 1
+
+    def _busy(self, name: str) -> bool:
+        chain = self._chains.get(name)
+        if chain is None:
+            return False
+        return any(not f.done() for f in [*chain.reads, chain.write] if f is not None)
+
+    def _snapshot_path(self, name: str) -> Path:
+        return self.snapshot_dir / f"{quote(name, safe='')}.json"
+
+    def _save(self, name: str, session: MutationSession) -> Path | None:
+        if self.snapshot_dir is None:
+            return None
+        self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+        path = self._snapshot_path(name)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps(session.snapshot(), ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
+        return path
+
+    def _load(self, name: str) -> MutationSession | None:
+        if self.snapshot_dir is None:
+            return None
+        try:
+            snapshot = json.loads(self._snapshot_path(name).read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        self.metrics.restores += 1
+        return MutationSession.restore(snapshot)
+
+    def _discard(self, name: str) -> None:
+        if self.snapshot_dir is not None:
+            self._snapshot_path(name).unlink(missing_ok=True)
+
+    def handle(self, request: dict, submitted: float | None = None) -> dict:
+        """
+        Runs one request synchronously and returns its response. `submitted` is the
+        perf_counter time it was queued, for the metrics.
+        """
+        started = time.perf_counter()
+        try:
+            response = {"id": request.get("id"), "ok": True, "result": self._dispatch(request)}
+        except Exception as e:
+            response = {"id": request.get("id"), "ok": False, "error": f"{type(e).__name__}: {e}"}
+        queued = started - submitted if submitted is not None else 0.0
+        self.metrics.observe(
+            request.get("op"), response["ok"], time.perf_counter() - started, queued
+        )
+        return response
+
+    def _dispatch(self, request: dict):
+        op = request.get("op")
+        name = request.get("session", "default")
+
+        if op == "open":
+            options = {k: request[k] for k in request if k not in ("id", "op", "session")}
+            session = MutationSession({**self.defaults, **options})
+            with self._lock:
+                self._discard(name)
+                self._install(name, session)
+            return {"session": name}
+        if op == "close":
+            with self._lock:
+                self.sessions.pop(name, None)
+                self._discard(name)
+            return {"session": name}
+        session = self._session(name)
+        if op == "collect":
+            session.mutator.collect_definitions(_source(request))
+            return {"symbols": len(session.mutator.mapping)}
+        if op in ("transform", "mutate"):
+            source = _source(request)
+            if op == "mutate":
+                session.mutator.collect_definitions(source)
+            mutated = session.transform(source)
+            if "output" in request:
+                output = Path(request["output"])
+                output.parent.mkdir(parents=True, exist_ok=True)
+                output.write_text(mutated, encoding="utf-8")
+                return {"output": str(output)}
+            return {"source": mutated}
+        if op == "unmutate":
+            return {"source": session.unmutate(_source(request))}
+        if op == "snapshot":
+            if self.snapshot_dir is None:
+                raise ValueError("The service has no snapshot directory.")
+            return {"path": str(self._save(name, session))}
+        if op == "mapping":
+            mutator = session.mutator
+            if "path" in request:
+                mutator.save_mapping(request["path"])
+                return {"path": request["path"], "symbols": len(mutator.mapping)}
+            return {
+                "intensity": mutator.intensity,
+                "strip_comments": mutator.strip_comments,
+                "internal_prefixes": mutator.internal_prefixes,
+                "mapping": dict(mutator.mapping),
+            }
+        raise ValueError(f"Unknown op {op!r}; expected one of {sorted(READ_OPS | WRITE_OPS)}")
+
+    def submit(self, request: dict) -> Future:
+        """Schedules a request on the pool, after the session requests it depends on."""
+        name = request.get("session", "default")
+        with self._lock:
+            chain = self._chains.setdefault(name, _Chain())
+            if request.get("op") in READ_OPS:
+                after = [chain.write] if chain.write else []
+            else:
+                after = ([chain.write] if chain.write else []) + chain.reads
+            # Dependencies were submitted first and the pool is FIFO, so they are already
+            # running or finished by the time this waits on them
+            future = self._pool.submit(self._after, after, request, time.perf_counter())
+            if request.get("op") in READ_OPS:
+                chain.reads = [f for f in chain.reads if not f.done()] + [future]
+            else:
+                chain.write, chain.reads = future, []
+        if request.get("op") == "close":
+            # Outside the lock: the callback runs at once if the close has already finished
+            future.add_done_callback(lambda f: self._forget(name, f))
+        return future
+
+    def _forget(self, name: str, closed: Future) -> None:
+        """Drops a closed session's chain, unless requests were sent to it after the close."""
+        with self._lock:
+            chain = self._chains.get(name)
+            if chain is not None and chain.write is closed and not chain.reads:
+                del self._chains[name]
+
+    def _after(self, after: list[Future], request: dict, submitted: float) -> dict:
+        wait(after)
+        return self.handle(request, submitted)
+
+    def serve(self, stdin: TextIO, stdout: TextIO) -> int:
+        """Answers requests from stdin until EOF. Returns the number of failed requests."""
+        write_lock = threading.Lock()
+        failures = 0
+
+        def respond(response: dict) -> None:
+            nonlocal failures
+            with write_lock:
+                failures += not response["ok"]
+                stdout.write(json.dumps(response, ensure_ascii=False) + "\n")
+                stdout.flush()
+
+        for line in stdin:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError("request must be a JSON object")
+            except ValueError as e:
+                respond({"id": None, "ok": False, "error": f"Invalid request: {e}"})
+                continue
+            self.submit(request).add_done_callback(lambda f: respond(f.result()))
+
+        # Shutting down waits for queued requests, whose callbacks run on the workers
+        self.close()
+        return failures
+
+    def close(self) -> None:
+        """Waits for queued requests, then writes every session to the snapshot directory."""
+        self._pool.shutdown(wait=True)
+        with self._lock:
+            for name, session in self.sessions.items():
+                self._save(name, session)
+
+
+class ServiceHTTPServer(ThreadingHTTPServer):
+    """
+    Serves a MutationService over HTTP: `POST /` with a request object (or `POST /<op>`
+    without its `op`), `GET /metrics` and `GET /health`. Requests naming server files
+    (`path`, `output`) are refused unless `allow_files` is set.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self, address: tuple[str, int], service: MutationService, allow_files: bool = False
+    ):
+        super().__init__(address, ServiceHandler)
+        self.service = service
+        self.allow_files = allow_files
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    # Keep-alive, so a tool sending many snippets reuses its connection
+    protocol_version = "HTTP/1.1"
+    server: ServiceHTTPServer
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_bytes(self, status: int, body: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self._send_bytes(status, body, "application/json")
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0].rstrip("/")
+        service = self.server.service
+        if path == "/metrics":
+            text = service.metrics.render(len(service.sessions))
+            self._send_bytes(200, text.encode(), "text/plain; version=0.0.4")
+        elif path == "/health":
+            self._send_json(200, {"ok": True, "sessions": len(service.sessions)})
+        else:
+            self._send_json(404, {"ok": False, "error": f"Unknown path {self.path}"})
+
+    def do_POST(self):
+        path = self.path.split("?", 1)[0].strip("/")
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            request = json.loads(self.rfile.read(length) if length else b"{}")
+            if not isinstance(request, dict):
+                raise ValueError("request must be a JSON object")
+        except ValueError as e:
+            self._send_json(400, {"id": None, "ok": False, "error": f"Invalid request: {e}"})
+            return
+        if path:
+            request["op"] = path
+        if not self.server.allow_files and any(field in request for field in FILE_FIELDS):
+            error = "Server file access is disabled; send 'source' instead."
+            self._send_json(403, {"id": request.get("id"), "ok": False, "error": error})
+            return
+        response = self.server.service.submit(request).result()
+        self._send_json(200 if response["ok"] else 400, response)
+
+
+def serve_http(
+    service: MutationService,
+    host: str = "127.0.0.1",
+    port: int = 0,
+    allow_files: bool = False,
+    background: bool = False,
+) -> ServiceHTTPServer:
+    """
+    Serves until interrupted, then closes the service (writing its snapshots). With
+    `background`, returns at once with the server running on a daemon thread; call
+    `shutdown()` and `service.close()` when done. Use port 0 for a free port.
+    """
+    server = ServiceHTTPServer((host, port), service, allow_files)
+    if background:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+    return server
@@ -0,0 +1,116 @@
+"""
+Sharded mutation across machines that share nothing but files.
+
+The mapping is a function of the order in which symbols are registered: names come
+from one seeded RNG, and a name is generated the first time a file that defines it is
+registered, files taken in sorted path order. So mutation splits into three phases:
+
+1. `collect_shard`: each shard scans its files and records, per file, the (name, kind)
+   pairs a Mutator would register, dropping names an earlier file of the same shard
+   already introduced (they could never be registered twice).
+2. `merge_symbols`: replays every shard's pairs in global file order, which yields
+   exactly the mapping a single-node run builds, plus the whitespace seed.
+3. `transform_shard`: each shard renames its files with the merged manifest. Whitespace
+   noise is keyed by relative path, so output is identical to `mutate_directory`.
+
+Files are assigned to shards by a hash of their relative path, so a file stays in its
+shard when others are added or removed.
+"""
+
+import hashlib
+import json
+from pathlib import Path, PurePosixPath
+
+from .core import Mutator, registration_order, scan_symbols
+
+SYMBOLS_VERSION = 1
+
+
+def shard_of(relative_path: str, count: int) -> int:
+    """The shard (0 <= shard < count) a file belongs to."""
+    digest = hashlib.blake2b(relative_path.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % count
+
+
+def shard_files(input_dir: Path, shard: int = 0, count: int = 1) -> list[tuple[str, Path]]:
+    """(relative posix path, path) of the shard's .py files, in mutate_directory's order."""
+    if not 0 <= shard < count:
+        raise ValueError(f"Shard {shard} is out of range for {count} shards.")
+    input_dir = Path(input_dir)
+    files = []
+    for path in sorted(input_dir.rglob("*.py")):
+        relative = path.relative_to(input_dir).as_posix()
+        if shard_of(relative, count) == shard:
+            files.append((relative, path))
+    return files
+
+
+def collect_shard(input_dir: Path, mutator: Mutator, shard: int = 0, count: int = 1) -> dict:
+    """Symbol set of one shard. Only the mutator's settings are used, not its mapping."""
+    seen: set[str] = set()
+    files = {}
+    for relative, path in shard_files(input_dir, shard, count):
+        collector = scan_symbols(path.read_text(encoding="utf-8"), mutator.internal_prefixes)
+        entries = []
+        for name, kind in registration_order(collector, mutator.intensity):
+            if name not in seen:
+                seen.add(name)
+                entries.append([name, kind])
+        files[relative] = entries
+    return {
+        "version": SYMBOLS_VERSION,
+        "settings": mutator.settings(),
+        "shard": [shard, count],
+        "files": files,
+    }
+
+
+def merge_symbols(symbol_sets: list[dict]) -> Mutator:
+    """Builds the global mapping from every shard's symbol set."""
+    if not symbol_sets:
+        raise ValueError("No symbol sets to merge.")
+    settings = symbol_sets[0]["settings"]
+    files: dict[str, list] = {}
+    for symbols in symbol_sets:
+        if symbols.get("version") != SYMBOLS_VERSION:
+            raise ValueError(f"Unsupported symbol set version {symbols.get('version')!r}.")
+        if symbols["settings"] != settings:
+            raise ValueError("Symbol sets were collected with different mutator settings.")
+        for relative, entries in symbols["files"].items():
+            if relative in files:
+                raise ValueError(f"{relative} appears in more than one symbol set.")
+            files[relative] = entries
+
+    mutator = Mutator(**settings)
+    for relative in sorted(files, key=lambda r: PurePosixPath(r).parts):
+        mutator.register_names(tuple(entry) for entry in files[relative])
+    if mutator.intensity >= 5:
+        # Drawn at the same point of the RNG stream as in a single-node run
+        mutator.whitespace_seed = mutator.generator.rng.getrandbits(64)
+    return mutator
+
+
+def transform_shard(
+    input_dir: Path, output_dir: Path, mutator: Mutator, shard: int = 0, count: int = 1
+) -> list[Path]:
+    """Renames the shard's files with a merged mapping. Returns the files written."""
+    written = []
+    for relative, path in shard_files(input_dir, shard, count):
+        code = mutator.transform_code(
+            path.read_text(encoding="utf-8"), rng=mutator.whitespace_rng(relative)
+        )
+        dest = Path(output_dir) / relative
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        dest.write_text(code, encoding="utf-8")
+        written.append(dest)
+    return written
+
+
+def save_symbols(symbols: dict, path: Path) -> None:
+    Path(path).write_text(
+        json.dumps(symbols, ensure_ascii=False, separators=(",", ":")), encoding="utf-8"
+    )
+
+
+def load_symbols(path: Path) -> dict:
+    return json.loads(Path(path).read_text(encoding="utf-8"))
@@ -0,0 +1,528 @@
+"""
+Local stand-in for the OpenAI chat-completions and Anthropic messages APIs,
+including their batch endpoints (files + batches, messages/batches).
+
+Lets the benchmark run its real provider clients (connection pooling, JSON mode,
+retries on 429/5xx) against a local server with configurable latency, error rates
+and canned answers. Point a provider at it with ``base_url``:
+
+    python -m symbol_mutator.standin --port 8089 --latency lognormal:0.4:0.6 --rate-limit-rate 0.05
+    OPENAI_API_KEY=x python -m symbol_mutator.benchmark ... --base-url http://127.0.0.1:8089/v1
+"""
+
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from datetime import UTC, datetime, timedelta
+from email import policy
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_ANSWER = (
+    '{"library": "Unknown", "confidence_score": 0.0, "reasoning": "Stand-in identification"}'
+)
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """
+    Parses a latency distribution spec into a sampler returning seconds.
+
+    Supported forms: ``0.2`` (constant), ``uniform:LOW:HIGH``, ``exp:MEAN`` and
+    ``lognormal:MEDIAN:SIGMA`` (heavy-tailed, the closest to real API latencies).
+    """
+    kind, _, rest = spec.partition(":")
+    args = [float(x) for x in rest.split(":")] if rest else []
+    if not rest:
+        value = float(kind)
+        return lambda rng: value
+    if kind == "uniform" and len(args) == 2:
+        low, high = args
+        return lambda rng: rng.uniform(low, high)
+    if kind == "exp" and len(args) == 1:
+        (mean,) = args
+        return lambda rng: rng.expovariate(1 / mean) if mean > 0 else 0.0
+    if kind == "lognormal" and len(args) == 2:
+        median, sigma = args
+        mu = math.log(median)
+        return lambda rng: rng.lognormvariate(mu, sigma)
+    raise ValueError(f"Unknown latency spec: {spec}")
+
+
+class StandinConfig:
+    """Behaviour of the stand-in server. Rates are per-request probabilities."""
+
+    def __init__(
+        self,
+        latency: str = "0",
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        answers: list[str] | None = None,
+        retry_after: float = 0.0,
+        batch_latency: str = "0",
+        seed: int = 0,
+    ):
+        self.latency = parse_latency(latency)
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.answers = answers or [DEFAULT_ANSWER]
+        self.retry_after = retry_after
+        self.batch_latency = parse_latency(batch_latency)
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def draw(self) -> tuple[float, float, str]:
+        """Draws (delay, outcome roll, answer) for one request under the shared lock."""
+        with self.lock:
+            return self.latency(self.rng), self.rng.random(), self.rng.choice(self.answers)
+
+    def draw_batch_delay(self) -> float:
+        with self.lock:
+            return self.batch_latency(self.rng)
+
+
+class StandinServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], config: StandinConfig):
+        super().__init__(address, StandinHandler)
+        self.config = config
+        self.stats = {"requests": 0, "ok": 0, "errors": 0, "rate_limited": 0, "batches": 0}
+        self.stats_lock = threading.Lock()
+        # Batch API state: uploaded/generated files, OpenAI batches, Anthropic message batches
+        self.files: dict[str, dict] = {}
+        self.batches: dict[str, dict] = {}
+        self.message_batches: dict[str, dict] = {}
+        self.state_lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, key: str) -> None:
+        with self.stats_lock:
+            self.stats["requests"] += 1
+            self.stats[key] += 1
+
+    def add_file(self, filename: str, data: bytes, purpose: str) -> dict:
+        file = {
+            "id": f"file-{uuid.uuid4().hex[:24]}",
+            "object": "file",
+            "bytes": len(data),
+            "created_at": int(time.time()),
+            "filename": filename,
+            "purpose": purpose,
+            "status": "processed",
+        }
+        with self.state_lock:
+            self.files[file["id"]] = {"meta": file, "data": data}
+        return file
+
+    def _answer_batch_request(self) -> tuple[bool, str]:
+        """Outcome of one batched request: (succeeded, answer). Batches are not rate limited."""
+        _, roll, answer = self.config.draw()
+        ok = roll >= self.config.error_rate
+        self.count("ok" if ok else "errors")
+        return ok, answer
+
+    def run_openai_batch(self, batch_id: str) -> None:
+        time.sleep(self.config.draw_batch_delay())
+        with self.state_lock:
+            batch = self.batches[batch_id]
+            data = self.files[batch["input_file_id"]]["data"]
+
+        output, errors = [], []
+        for line in data.decode().splitlines():
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            ok, answer = self._answer_batch_request()
+            if ok:
+                body, status = chat_completion(item.get("body", {}), answer), 200
+            else:
+                body, status = _error_body("openai", "server_error", "Injected server error"), 500
+            record = {
+                "id": f"batch_req_{uuid.uuid4().hex[:24]}",
+                "custom_id": item["custom_id"],
+                "response": {
+                    "status_code": status,
+                    "request_id": uuid.uuid4().hex,
+                    "body": body,
+                },
+                "error": None,
+            }
+            (output if ok else errors).append(json.dumps(record))
+
+        output_file = self.add_file(f"{batch_id}_output.jsonl", _jsonl(output), "batch_output")
+        error_file = (
+            self.add_file(f"{batch_id}_error.jsonl", _jsonl(errors), "batch_output")
+            if errors
+            else None
+        )
+        with self.state_lock:
+            batch.update(
+                status="completed",
+                completed_at=int(time.time()),
+                output_file_id=output_file["id"],
+                error_file_id=error_file["id"] if error_file else None,
+                request_counts={
+                    "total": len(output) + len(errors),
+                    "completed": len(output),
+                    "failed": len(errors),
+                },
+            )
+
+    def run_message_batch(self, batch_id: str) -> None:
+        time.sleep(self.config.draw_batch_delay())
+        with self.state_lock:
+            batch = self.message_batches[batch_id]
+
+        results, succeeded = [], 0
+        for item in batch["requests"]:
+            ok, answer = self._answer_batch_request()
+            if ok:
+                succeeded += 1
+                result = {"type": "succeeded", "message": anthropic_message(item["params"], answer)}
+            else:
+                result = {
+                    "type": "errored",
+                    "error": _error_body("anthropic", "api_error", "Injected server error"),
+                }
+            results.append(json.dumps({"custom_id": item["custom_id"], "result": result}))
+
+        with self.state_lock:
+            batch["results"] = _jsonl(results)
+            batch["meta"].update(
+                processing_status="ended",
+                ended_at=_iso_now(),
+                results_url=f"{self.base_url}/v1/messages/batches/{batch_id}/results",
+                request_counts={
+                    "processing": 0,
+                    "succeeded": succeeded,
+                    "errored": len(results) - succeeded,
+                    "canceled": 0,
+                    "expired": 0,
+                },
+            )
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    # Keep-alive, so clients exercise their connection pools
+    protocol_version = "HTTP/1.1"
+    server: StandinServer
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_bytes(
+        self, status: int, body: bytes, content_type: str, headers: dict[str, str] | None = None
+    ) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: int, payload: dict, headers: dict[str, str] | None = None) -> None:
+        self._send_bytes(status, json.dumps(payload).encode(), "application/json", headers)
+
+    def _read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _read_json(self) -> dict:
+        return json.loads(self._read_body() or b"{}")
+
+    def _not_found(self) -> None:
+        self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0].rstrip("/")
+        if path.endswith("/stats"):
+            with self.server.stats_lock:
+                self._send_json(200, dict(self.server.stats))
+        elif match := re.search(r"/messages/batches/([^/]+)/results$", path):
+            with self.server.state_lock:
+                batch = self.server.message_batches.get(match.group(1))
+            if batch is None or "results" not in batch:
+                self._not_found()
+            else:
+                self._send_bytes(200, batch["results"], "application/binary")
+        elif match := re.search(r"/messages/batches/([^/]+)$", path):
+            with self.server.state_lock:
+                batch = self.server.message_batches.get(match.group(1))
+                meta = dict(batch["meta"]) if batch else None
+            if meta is None:
+                self._not_found()
+            else:
+                self._send_json(200, meta)
+        elif match := re.search(r"/batches/([^/]+)$", path):
+            with self.server.state_lock:
+                batch = self.server.batches.get(match.group(1))
+                batch = dict(batch) if batch else None
+            if batch is None:
+                self._not_found()
+            else:
+                self._send_json(200, batch)
+        elif match := re.search(r"/files/([^/]+)/content$", path):
+            with self.server.state_lock:
+                file = self.server.files.get(match.group(1))
+            if file is None:
+                self._not_found()
+            else:
+                self._send_bytes(200, file["data"], "application/octet-stream")
+        else:
+            self._not_found()
+
+    def do_POST(self):
+        path = self.path.split("?", 1)[0].rstrip("/")
+        if path.endswith("/files"):
+            self._upload_file()
+            return
+        if path.endswith("/messages/batches"):
+            self._create_message_batch()
+            return
+        if path.endswith("/batches"):
+            self._create_batch()
+            return
+        if path.endswith("/chat/completions"):
+            api = "openai"
+        elif path.endswith("/messages"):
+            api = "anthropic"
+        else:
+            self._not_found()
+            return
+
+        try:
+            request = self._read_json()
+        except json.JSONDecodeError as e:
+            self._send_json(400, _error_body(api, "invalid_request_error", str(e)))
+            return
+
+        config = self.server.config
+        delay, roll, answer = config.draw()
+        if delay > 0:
+            time.sleep(delay)
+
+        if roll < config.rate_limit_rate:
+            self.server.count("rate_limited")
+            headers = {"Retry-After": str(config.retry_after)}
+            kind = "rate_limit_error" if api == "anthropic" else "rate_limit_exceeded"
+            self._send_json(429, _error_body(api, kind, "Rate limit reached"), headers)
+            return
+        if roll < config.rate_limit_rate + config.error_rate:
+            self.server.count("errors")
+            kind = "api_error" if api == "anthropic" else "server_error"
+            self._send_json(500, _error_body(api, kind, "Injected server error"))
+            return
+
+        self.server.count("ok")
+        if api == "openai":
+            self._send_json(200, chat_completion(request, answer))
+        else:
+            self._send_json(200, anthropic_message(request, answer))
+
+    def _upload_file(self) -> None:
+        content_type = self.headers.get("Content-Type", "")
+        message = BytesParser(policy=policy.default).parsebytes(
+            f"Content-Type: {content_type}\r\n\r\n".encode() + self._read_body()
+        )
+        fields, filename, data = {}, "upload.jsonl", b""
+        for part in message.iter_parts():
+            name = part.get_param("name", header="content-disposition")
+            if name == "file":
+                filename = part.get_filename() or filename
+                data = part.get_payload(decode=True) or b""
+            else:
+                fields[name] = part.get_content().strip()
+        self._send_json(200, self.server.add_file(filename, data, fields.get("purpose", "batch")))
+
+    def _create_batch(self) -> None:
+        request = self._read_json()
+        if request.get("input_file_id") not in self.server.files:
+            self._send_json(400, _error_body("openai", "invalid_request_error", "Unknown file"))
+            return
+        batch = {
+            "id": f"batch_{uuid.uuid4().hex[:24]}",
+            "object": "batch",
+            "endpoint": request.get("endpoint", "/v1/chat/completions"),
+            "errors": None,
+            "input_file_id": request["input_file_id"],
+            "completion_window": request.get("completion_window", "24h"),
+            "status": "in_progress",
+            "output_file_id": None,
+            "error_file_id": None,
+            "created_at": int(time.time()),
+            "in_progress_at": int(time.time()),
+            "completed_at": None,
+            "request_counts": {"total": 0, "completed": 0, "failed": 0},
+            "metadata": request.get("metadata"),
+        }
+        with self.server.state_lock:
+            self.server.batches[batch["id"]] = batch
+        with self.server.stats_lock:
+            self.server.stats["batches"] += 1
+        threading.Thread(
+            target=self.server.run_openai_batch, args=(batch["id"],), daemon=True
+        ).start()
+        self._send_json(200, dict(batch))
+
+    def _create_message_batch(self) -> None:
+        requests = self._read_json().get("requests", [])
+        meta = {
+            "id": f"msgbatch_{uuid.uuid4().hex[:24]}",
+            "type": "message_batch",
+            "processing_status": "in_progress",
+            "request_counts": {
+                "processing": len(requests),
+                "succeeded": 0,
+                "errored": 0,
+                "canceled": 0,
+                "expired": 0,
+            },
+            "created_at": _iso_now(),
+            "expires_at": _iso_now(hours=24),
+            "ended_at": None,
+            "cancel_initiated_at": None,
+            "archived_at": None,
+            "results_url": None,
+        }
+        with self.server.state_lock:
+            self.server.message_batches[meta["id"]] = {"meta": meta, "requests": requests}
+        with self.server.stats_lock:
+            self.server.stats["batches"] += 1
+        threading.Thread(
+            target=self.server.run_message_batch, args=(meta["id"],), daemon=True
+        ).start()
+        self._send_json(200, dict(meta))
+
+
+def _jsonl(lines: list[str]) -> bytes:
+    return "".join(line + "\n" for line in lines).encode()
+
+
+def _iso_now(hours: float = 0) -> str:
+    return (datetime.now(UTC) + timedelta(hours=hours)).isoformat()
+
+
+def _error_body(api: str, kind: str, message: str) -> dict:
+    if api == "anthropic":
+        return {"type": "error", "error": {"type": kind, "message": message}}
+    return {"error": {"message": message, "type": kind, "param": None, "code": kind}}
+
+
+def _prompt_tokens(messages: list[dict]) -> int:
+    text = " ".join(str(m.get("content", "")) for m in messages)
+    return max(1, len(text) // 4)
+
+
+def chat_completion(request: dict, answer: str) -> dict:
+    """Builds a chat.completion response body for an OpenAI-style request."""
+    prompt_tokens = _prompt_tokens(request.get("messages", []))
+    completion_tokens = max(1, len(answer) // 4)
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": request.get("model", "standin"),
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": answer},
+                "logprobs": None,
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+def anthropic_message(request: dict, answer: str) -> dict:
+    """Builds a message response body for an Anthropic-style request."""
+    return {
+        "id": f"msg_{uuid.uuid4().hex[:24]}",
+        "type": "message",
+        "role": "assistant",
+        "model": request.get("model", "standin"),
+        "content": [{"type": "text", "text": answer}],
+        "stop_reason": "end_turn",
+        "stop_sequence": None,
+        "usage": {
+            "input_tokens": _prompt_tokens(request.get("messages", [])),
+            "output_tokens": max(1, len(answer) // 4),
+        },
+    }
+
+
+def start_server(
+    config: StandinConfig | None = None, host: str = "127.0.0.1", port: int = 0
+) -> StandinServer:
+    """Starts a stand-in server on a background thread. Use port 0 for a free port."""
+    server = StandinServer((host, port), config or StandinConfig())
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Serve a local OpenAI/Anthropic-compatible stand-in for load-testing."
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind")
+    parser.add_argument("--port", type=int, default=8089, help="Port to listen on")
+    parser.add_argument(
+        "--latency",
+        default="0",
+        help="Latency distribution: SECONDS, uniform:LOW:HIGH, exp:MEAN or lognormal:MEDIAN:SIGMA",
+    )
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability of a 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Probability of a 429")
+    parser.add_argument(
+        "--retry-after", type=float, default=0.0, help="Retry-After seconds sent with 429s"
+    )
+    parser.add_argument(
+        "--answer",
+        action="append",
+        help="Canned answer text (repeatable; one is picked at random per request)",
+    )
+    parser.add_argument(
+        "--batch-latency",
+        default="0",
+        help="Time until a submitted batch completes, same spec format as --latency",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Seed for latency and error draws")
+    args = parser.parse_args()
+
+    config = StandinConfig(
+        latency=args.latency,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        answers=args.answer,
+        retry_after=args.retry_after,
+        batch_latency=args.batch_latency,
+        seed=args.seed,
+    )
+    server = StandinServer((args.host, args.port), config)
+    print(f"Stand-in listening on {server.base_url} (OpenAI base URL: {server.base_url}/v1)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+"""
+Naming themes: how generated names look.
+
+A theme turns draws from the generator's seeded RNG into candidate names; the base
+class retries collisions, so a theme only implements `candidate`, plus `generate_batch`
+if it can draw for many names at once. Themes are looked up by name in a registry
+filled by `register_theme` or, for installed plugins, by entry points in the
+`symbol_mutator.themes` group naming a Theme subclass or instance:
+
+    [project.entry-points."symbol_mutator.themes"]
+    matrix = "my_package.themes:MatrixTheme"
+
+Whichever way names are produced, one at a time or in a batch, they are the same for
+the same seed and the same sequence of (name, kind) pairs.
+"""
+
+import random
+from collections.abc import Sequence
+
+ENTRY_POINT_GROUP = "symbol_mutator.themes"
+
+# Candidates a vocabulary theme tries before its names get a numeric suffix, so it keeps
+# producing names once the vocabulary is used up instead of retrying forever
+PLAIN_ATTEMPTS = 8
+
+# Vocabularies: built once at import, shared by every generator
+# Fantasy Theme Vocabulary
+FANTASY_PREFIXES = (
+    "Crystal",
+    "Shadow",
+    "Thunder",
+    "Void",
+    "Iron",
+    "Mist",
+    "Star",
+    "Blood",
+    "Frost",
+    "Flame",
+    "Obsidian",
+    "Azure",
+    "Crimson",
+    "Verdant",
+    "Golden",
+    "Silver",
+    "Ebon",
+    "Ivory",
+    "Arcane",
+    "Spirit",
+    "Soul",
+    "Mind",
+    "Heart",
+    "Bone",
+    "Ash",
+    "Ember",
+    "Storm",
+    "Rain",
+    "Wind",
+    "Sea",
+)
+
+FANTASY_SUFFIXES = (
+    "Blade",
+    "Shield",
+    "Weaver",
+    "Walker",
+    "Caller",
+    "Binder",
+    "Warden",
+    "Seeker",
+    "Breaker",
+    "Singer",
+    "Dancer",
+    "Stalker",
+    "Hunter",
+    "Mage",
+    "Knight",
+    "Lord",
+    "King",
+    "Queen",
+    "Prince",
+    "Sage",
+    "Guard",
+    "Watcher",
+    "Keeper",
+    "Bringer",
+    "Slayer",
+    "Eater",
+    "Drinker",
+    "Forged",
+    "Born",
+    "Kin",
+)
+
+FANTASY_VERBS = (
+    "invoke",
+    "summon",
+    "banish",
+    "enchant",
+    "forge",
+    "shatter",
+    "weave",
+    "scry",
+    "transmute",
+    "bind",
+    "call",
+    "cast",
+    "channel",
+    "conjure",
+    "craft",
+    "create",
+    "curse",
+    "bless",
+    "empower",
+    "imbue",
+    "infuse",
+    "invoke",
+    "kindle",
+    "mending",
+    "purify",
+    "restore",
+    "ward",
+    "seal",
+    "open",
+    "close",
+)
+
+# Multilingual vocabulary (Mix of scripts to break tokenization)
+ML_PREFIXES = (
+    "معالج",  # Processor (Arabic)
+    "بيانات",  # Data (Arabic)
+    "система",  # System (Cyrillic)
+    "ключ",  # Key (Cyrillic)
+    "код",  # Code (Cyrillic)
+    "функция",  # Function (Cyrillic)
+    "архив",  # Archive (Cyrillic)
+    "главный",  # Main (Cyrillic)
+    "новый",  # New (Cyrillic)
+    "первый",  # First (Cyrillic)
+    "тест",  # Test (Cyrillic)
+    "задача",  # Task (Cyrillic)
+    "логика",  # Logic (Cyrillic)
+    "метод",  # Method (Cyrillic)
+    "ядро",  # Core (Cyrillic)
+    "узел",  # Node (Cyrillic)
+    "сеть",  # Network (Cyrillic)
+    "память",  # Memory (Cyrillic)
+    "поток",  # Flow (Cyrillic)
+)
+
+ML_SUFFIXES = (
+    "объект",  # Object (Cyrillic)
+    "класс",  # Class (Cyrillic)
+    "результат",  # Result (Cyrillic)
+    "ошибка",  # Error (Cyrillic)
+    "вход",  # Input (Cyrillic)
+    "выход",  # Output (Cyrillic)
+    "проверка",  # Verify (Cyrillic)
+    "индекс",  # Index (Cyrillic)
+    "значение",  # Value (Cyrillic)
+    "тип",  # Type (Cyrillic)
+    "имя",  # Name (Cyrillic)
+    "файл",  # File (Cyrillic)
+    "путь",  # Path (Cyrillic)
+    "база",  # Base (Cyrillic)
+)
+
+
+class Theme:
+    """
+    A naming scheme. Subclasses set `name` and implement `candidate`. A theme built
+    from a small vocabulary sets `size`, its number of distinct candidates: once the
+    vocabulary runs out (or PLAIN_ATTEMPTS candidates in a row collide) its names get
+    a random numeric suffix.
+    """
+
+    name: str = ""
+    size: int | None = None
+
+    def candidate(self, rng: random.Random, original: str, kind: str) -> str:
+        """One name for original, drawn from rng. It may collide; generate retries."""
+        raise NotImplementedError
+
+    def generate(self, rng: random.Random, original: str, kind: str, taken: set[str]) -> str:
+        """A name for original that is not in taken, and adds it there."""
+        attempts = 0
+        while True:
+            name = self.candidate(rng, original, kind)
+            if self.size is not None and (attempts >= PLAIN_ATTEMPTS or len(taken) >= self.size):
+                # Numbers up to the count of names keep collisions rare
+                name = f"{name}_{rng.randrange(len(taken) + 1)}"
+            if name not in taken and name != original:
+                taken.add(name)
+                return name
+            attempts += 1
+
+    def generate_batch(
+        self, rng: random.Random, originals: Sequence[str], kinds: Sequence[str], taken: set[str]
+    ) -> list[str]:
+        """
+        Names for originals, in order. Overrides must return, and leave rng and taken
+        in, exactly what calling `generate` for each in turn would.
+        """
+        return [
+            self.generate(rng, original, kind, taken)
+            for original, kind in zip(originals, kinds, strict=True)
+        ]
+
+
+class GibberishTheme(Theme):
+    """`c_` (capitalized originals) or `f_` plus six hex digits, e.g. `f_3fa91c`."""
+
+    name = "gibberish"
+
+    def candidate(self, rng: random.Random, original: str, kind: str) -> str:
+        prefix = "c_" if original[0].isupper() else "f_"
+        return f"{prefix}{rng.getrandbits(24):06x}"
+
+    def generate_batch(
+        self, rng: random.Random, originals: Sequence[str], kinds: Sequence[str], taken: set[str]
+    ) -> list[str]:
+        names: list[str] = []
+        prefixes = ["c_" if original[0].isupper() else "f_" for original in originals]
+        while len(names) < len(originals):
+            # One draw of a 32-bit word per pending name. getrandbits(32 * n) holds the n
+            # words the generator would output one by one, the first in the lowest bits,
+            # and getrandbits(24) returns a word's top 24 bits: in hex, the first six of
+            # its eight digits. A colliding name takes the next word, like a retry, and
+            # names left over when the words run out are drawn for again.
+            count = len(originals) - len(names)
+            digits = f"{rng.getrandbits(32 * count):0{8 * count}x}"
+            i = len(names)
+            for end in range(8 * count, 0, -8):
+                name = prefixes[i] + digits[end - 8 : end - 2]
+                if name not in taken and name != originals[i]:
+                    taken.add(name)
+                    names.append(name)
+                    i += 1
+        return names
+
+
+class FantasyTheme(Theme):
+    """`CrystalBlade` classes, `forge_shard` functions, `shadow_iron` for the rest."""
+
+    name = "fantasy"
+    prefixes = FANTASY_PREFIXES
+    suffixes = FANTASY_SUFFIXES
+    verbs = FANTASY_VERBS
+    size = len(FANTASY_PREFIXES) * (len(FANTASY_SUFFIXES) + len(FANTASY_PREFIXES))
+
+    def candidate(self, rng: random.Random, original: str, kind: str) -> str:
+        if kind == "class":
+            return f"{rng.choice(self.prefixes)}{rng.choice(self.suffixes)}"
+        if kind == "function":
+            verb = rng.choice(self.verbs)
+            noun = rng.choice(self.suffixes).lower()
+            return f"{verb}_{noun}"
+        return rng.choice(self.prefixes).lower() + "_" + rng.choice(self.prefixes).lower()
+
+
+class MultilingualTheme(Theme):
+    """Arabic and Cyrillic words, which break English-centric tokenizers."""
+
+    name = "multilingual"
+    prefixes = ML_PREFIXES
+    suffixes = ML_SUFFIXES
+    size = len(ML_PREFIXES) * len(ML_SUFFIXES)
+
+    def candidate(self, rng: random.Random, original: str, kind: str) -> str:
+        return f"{rng.choice(self.prefixes)}_{rng.choice(self.suffixes)}"
+
+
+_themes: dict[str, Theme] = {}
+_entry_points_loaded = False
+
+
+def register_theme(theme, name: str | None = None):
+    """
+    Makes a Theme instance or subclass available by name (default: its `name`).
+    Returns its argument, so it also works as a class decorator.
+    """
+    instance = theme() if isinstance(theme, type) else theme
+    name = name or instance.name
+    if not name:
+        raise ValueError("A theme needs a name.")
+    _themes[name] = instance
+    return theme
+
+
+def _load_entry_points() -> None:
+    global _entry_points_loaded
+    if _entry_points_loaded:
+        return
+    _entry_points_loaded = True
+    from importlib.metadata import entry_points
+
+    for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+        # Themes registered in code win over installed ones of the same name
+        if entry_point.name not in _themes:
+            register_theme(entry_point.load(), entry_point.name)
+
+
+def get_theme(name: str) -> Theme:
+    if name not in _themes:
+        _load_entry_points()
+    try:
+        return _themes[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown theme {name!r}; available: {', '.join(available_themes())}"
+        ) from None
+
+
+def available_themes() -> list[str]:
+    _load_entry_points()
+    return sorted(_themes)
+
+
+for _theme in (GibberishTheme, FantasyTheme, MultilingualTheme):
+    register_theme(_theme)
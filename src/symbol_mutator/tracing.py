@@ -0,0 +1,225 @@
+"""
+Optional span tracing of mutation runs, exported to files rather than a live collector.
+
+Instrumented code wraps work in `span(name, category, **attributes)`. While no tracer is
+active that returns one shared no-op context manager, so the cost is a global lookup
+per span. `tracing(path)` activates a tracer for every thread and writes it on exit:
+
+- "chrome": Trace Event JSON, viewable in Perfetto or chrome://tracing. Spans become
+  complete ("X") events on their thread's track; spans opened inside asyncio tasks
+  (the benchmark's concurrent LLM calls) get one track per task, so they don't overlap.
+- "otlp": the OTLP/JSON encoding of `ExportTraceServiceRequest`, which OpenTelemetry
+  collectors and most tracing backends import.
+
+Parent/child links follow the context (a contextvar), so they are correct across
+coroutines; spans started on pool threads are roots on their own track.
+"""
+
+import contextvars
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+TRACE_FORMATS = ("chrome", "otlp")
+
+_current_span: contextvars.ContextVar[int | None] = contextvars.ContextVar(
+    "symbol_mutator_span", default=None
+)
+_tracer: "Tracer | None" = None
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return None
+
+    def set(self, **attributes) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """One timed operation. Times are perf_counter_ns values."""
+
+    __slots__ = ("tracer", "name", "category", "attributes", "error", "id", "parent", "track")
+    __slots__ += ("start", "end", "_token")
+
+    def __init__(self, tracer: "Tracer", name: str, category: str, attributes: dict):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.attributes = attributes
+        self.error: str | None = None
+
+    def __enter__(self) -> "Span":
+        self.id = next(self.tracer._ids)
+        self.parent = _current_span.get()
+        self.track = _track()
+        self._token = _current_span.set(self.id)
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.end = time.perf_counter_ns()
+        _current_span.reset(self._token)
+        if exc_type is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        # list.append is atomic, so spans from any thread can be recorded without a lock
+        self.tracer.spans.append(self)
+
+    def set(self, **attributes) -> None:
+        """Adds attributes known only once the work is under way."""
+        self.attributes.update(attributes)
+
+
+def _track() -> tuple:
+    """(thread id, thread name, asyncio task or None) the current code runs on."""
+    thread = threading.current_thread()
+    task = None
+    asyncio = sys.modules.get("asyncio")
+    if asyncio is not None:
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            pass
+    return thread.ident, thread.name, None if task is None else (id(task), task.get_name())
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class Tracer:
+    """Collects the spans of one run."""
+
+    def __init__(self, service_name: str = "symbol-mutator"):
+        self.service_name = service_name
+        self.spans: list[Span] = []
+        self.trace_id = os.urandom(16).hex()
+        self._ids = itertools.count(1)
+        # Maps perf_counter_ns to wall-clock time for OTLP's Unix-epoch timestamps
+        self._epoch_offset = time.time_ns() - time.perf_counter_ns()
+        self._origin = time.perf_counter_ns()
+
+    def span(self, name: str, category: str = "mutator", **attributes) -> Span:
+        return Span(self, name, category, attributes)
+
+    def to_chrome(self) -> dict:
+        pid = os.getpid()
+        tracks: dict = {}
+        events = []
+        for span in sorted(self.spans, key=lambda s: s.start):
+            thread_id, thread_name, task = span.track
+            key = task[0] if task else thread_id
+            if key not in tracks:
+                tracks[key] = len(tracks) + 1
+                label = f"{thread_name} / task {task[1]}" if task else thread_name
+                events.append(
+                    {
+                        "ph": "M",
+                        "name": "thread_name",
+                        "pid": pid,
+                        "tid": tracks[key],
+                        "args": {"name": label},
+                    }
+                )
+            args = dict(span.attributes)
+            if span.error is not None:
+                args["error"] = span.error
+            events.append(
+                {
+                    "ph": "X",
+                    "name": span.name,
+                    "cat": span.category,
+                    "pid": pid,
+                    "tid": tracks[key],
+                    "ts": (span.start - self._origin) / 1000,
+                    "dur": (span.end - span.start) / 1000,
+                    "args": args,
+                }
+            )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def to_otlp(self) -> dict:
+        spans = []
+        for span in sorted(self.spans, key=lambda s: s.start):
+            attributes = {"category": span.category, "thread.name": span.track[1]}
+            attributes.update(span.attributes)
+            record = {
+                "traceId": self.trace_id,
+                "spanId": f"{span.id:016x}",
+                "name": span.name,
+                "kind": 1,
+                "startTimeUnixNano": str(span.start + self._epoch_offset),
+                "endTimeUnixNano": str(span.end + self._epoch_offset),
+                "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in attributes.items()],
+                "status": {"code": 1},
+            }
+            if span.parent is not None:
+                record["parentSpanId"] = f"{span.parent:016x}"
+            if span.error is not None:
+                record["status"] = {"code": 2, "message": span.error}
+            spans.append(record)
+        resource = [{"key": "service.name", "value": {"stringValue": self.service_name}}]
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": resource},
+                    "scopeSpans": [{"scope": {"name": "symbol_mutator"}, "spans": spans}],
+                }
+            ]
+        }
+
+    def save(self, path: Path, format: str = "chrome") -> None:
+        if format not in TRACE_FORMATS:
+            raise ValueError(f"format must be one of {TRACE_FORMATS}, got {format!r}")
+        document = self.to_chrome() if format == "chrome" else self.to_otlp()
+        Path(path).write_text(json.dumps(document), encoding="utf-8")
+
+
+def span(name: str, category: str = "mutator", **attributes) -> Span | _NullSpan:
+    """A span on the active tracer, or a no-op when tracing is off."""
+    tracer = _tracer
+    if tracer is None:
+        return _NULL_SPAN
+    return Span(tracer, name, category, attributes)
+
+
+def active_tracer() -> "Tracer | None":
+    return _tracer
+
+
+@contextmanager
+def tracing(path: Path | None = None, format: str = "chrome"):
+    """
+    Traces everything run inside the block, on any thread, and writes the trace to path
+    (if given) on exit. Yields the Tracer.
+    """
+    global _tracer
+    if format not in TRACE_FORMATS:
+        raise ValueError(f"format must be one of {TRACE_FORMATS}, got {format!r}")
+    previous, tracer = _tracer, Tracer()
+    _tracer = tracer
+    try:
+        yield tracer
+    finally:
+        _tracer = previous
+        if path is not None:
+            tracer.save(path, format)
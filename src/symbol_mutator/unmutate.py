@@ -0,0 +1,135 @@
+"""
+Maps mutated identifiers back to the originals, in code and in free text.
+
+Generated names are unique and never coincide with an original name, so the inverse
+mapping is a dict and restoring text is a single scan: each maximal identifier token is
+looked up in the reverse index, making the cost linear in the text whatever the number
+of symbols. The token pattern is Unicode-aware, so the Cyrillic and Arabic names of the
+multilingual theme match like ASCII ones; non-ASCII tokens are also looked up in NFKC
+form, the form Python itself compares identifiers in, in case a model's output composed
+characters differently.
+
+Comments and docstrings removed at intensity 2 and above cannot be restored.
+"""
+
+import json
+import re
+import unicodedata
+from pathlib import Path
+
+from .mirror import walk_tree
+
+# \w does not cover combining marks, which decomposed Cyrillic and vowelled Arabic use
+_IDENTIFIER_RE = re.compile(r"[^\W\d][\w\u0300-\u036f\u0483-\u0489\u064b-\u065f\u0670]*")
+
+JSON_SUFFIXES = frozenset({".json"})
+JSON_LINES_SUFFIXES = frozenset({".jsonl", ".ndjson"})
+
+
+def invert_mapping(mapping: dict[str, str]) -> dict[str, str]:
+    """Mutated name -> original name."""
+    inverse = {}
+    for original, mutated in mapping.items():
+        if mutated in inverse:
+            raise ValueError(
+                f"{mutated!r} is the mutated name of both {inverse[mutated]!r} and {original!r}."
+            )
+        inverse[mutated] = original
+    return inverse
+
+
+class Unmutator:
+    """Reverses one mapping on strings, JSON values and files."""
+
+    def __init__(self, mapping: dict[str, str]):
+        self.inverse = invert_mapping(mapping)
+        self._normalized = {
+            unicodedata.normalize("NFKC", mutated): original
+            for mutated, original in self.inverse.items()
+            if not mutated.isascii()
+        }
+
+    def _replace(self, match: re.Match) -> str:
+        name = match.group()
+        original = self.inverse.get(name)
+        if original is not None:
+            return original
+        if not name.isascii():
+            return self._normalized.get(unicodedata.normalize("NFKC", name), name)
+        return name
+
+    def unmutate(self, text: str) -> str:
+        """Restores every mutated identifier in text (Python source, Markdown, prose...)."""
+        return _IDENTIFIER_RE.sub(self._replace, text)
+
+    def unmutate_value(self, value):
+        """Restores the strings, including dict keys, inside a decoded JSON value."""
+        if isinstance(value, str):
+            return self.unmutate(value)
+        if isinstance(value, list):
+            return [self.unmutate_value(item) for item in value]
+        if isinstance(value, dict):
+            return {self.unmutate(k): self.unmutate_value(v) for k, v in value.items()}
+        return value
+
+    def unmutate_file(self, text: str, path: Path | str) -> str:
+        """
+        Restores file contents. JSON and JSON Lines are decoded first, since escaped
+        non-ASCII names (`\\u0441...`) would not match in the raw text.
+        """
+        suffix = Path(path).suffix.lower()
+        if suffix in JSON_SUFFIXES:
+            restored = self._unmutate_json(text, indent=2)
+            return text if restored is None else restored + "\n"
+        if suffix in JSON_LINES_SUFFIXES:
+            out = []
+            for line in text.splitlines(keepends=True):
+                body = line.rstrip("\r\n")
+                restored = self._unmutate_json(body) if body.strip() else None
+                out.append(line if restored is None else restored + line[len(body) :])
+            return "".join(out)
+        return self.unmutate(text)
+
+    def _unmutate_json(self, text: str, indent: int | None = None) -> str | None:
+        """The restored document, or None if nothing changed (keeping its formatting)."""
+        value = json.loads(text)
+        restored = self.unmutate_value(value)
+        if restored == value:
+            return None
+        return json.dumps(restored, indent=indent, ensure_ascii=False)
+
+
+def unmutate(text: str, mapping: dict[str, str]) -> str:
+    """Restores the original identifiers in text mutated with mapping."""
+    return Unmutator(mapping).unmutate(text)
+
+
+def unmutate_path(
+    input_path: Path, output_path: Path | None, mapping: dict[str, str]
+) -> list[Path]:
+    """
+    Restores a file, or every UTF-8 text file under a directory, into the same relative
+    path under output_path (in place when it is None). Returns the files written.
+    """
+    unmutator = Unmutator(mapping)
+    input_path = Path(input_path)
+    if input_path.is_file():
+        files = [(input_path, Path(output_path) if output_path else input_path)]
+    else:
+        _, paths = walk_tree(input_path)
+        root = Path(output_path) if output_path else input_path
+        files = [(p, root / p.relative_to(input_path)) for p in paths if not p.is_symlink()]
+
+    written = []
+    for src, dest in files:
+        try:
+            text = src.read_text(encoding="utf-8")
+        except UnicodeDecodeError:
+            continue
+        new_text = unmutator.unmutate_file(text, src)
+        if dest == src and new_text == text:
+            continue
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        dest.write_text(new_text, encoding="utf-8")
+        written.append(dest)
+    return written
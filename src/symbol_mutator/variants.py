@@ -0,0 +1,114 @@
+"""
+Many seeds of one target from one parse and one symbol collection.
+
+A variant differs from another only in its NameGenerator: which symbols get names, and
+in which order, depends on the source alone, and so does every pass before renaming
+except the whitespace noise. Each worker therefore parses and scans the target once,
+keeps the prepared trees and the registration order, and per seed only generates names
+and renders. Seeds are spread over a process pool (rendering is CPU-bound); every
+variant is identical to a standalone `Mutator(seed=...)` run with the same options.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import libcst as cst
+
+from .core import Mutator, registration_order, scan_module
+
+
+class _Prepared:
+    """Seed-independent state of a set of sources: prepared trees and symbol order."""
+
+    def __init__(self, sources: list[tuple[str, str]], mutator_kwargs: dict):
+        self.mutator_kwargs = mutator_kwargs
+        template = Mutator(seed=0, **mutator_kwargs)
+        self.files = []
+        for name, source in sources:
+            module = cst.parse_module(source)
+            collector = scan_module(module, template.internal_prefixes)
+            order = list(registration_order(collector, template.intensity))
+            self.files.append((name, template.prepare(module), order))
+
+    def mutator(self, seed: int) -> Mutator:
+        mutator = Mutator(seed=seed, **self.mutator_kwargs)
+        for _, _, order in self.files:
+            mutator.register_names(order)
+        return mutator
+
+
+_worker: dict = {}
+
+
+def _init_worker(sources: list[tuple[str, str]], mutator_kwargs: dict) -> None:
+    _worker["prepared"] = _Prepared(sources, mutator_kwargs)
+
+
+def _render_source(seed: int) -> tuple[int, str]:
+    prepared = _worker["prepared"]
+    mutator = prepared.mutator(seed)
+    _, tree, _ = prepared.files[0]
+    return seed, mutator.render(tree)
+
+
+def _render_directory(job: tuple[int, str]) -> int:
+    seed, output_dir = job
+    prepared = _worker["prepared"]
+    mutator = prepared.mutator(seed)
+    for relative, tree, _ in prepared.files:
+        dest = Path(output_dir) / relative
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        dest.write_text(mutator.render(tree, mutator.whitespace_rng(relative)), encoding="utf-8")
+    return seed
+
+
+def _run(sources, mutator_kwargs, render, jobs: list, workers: int | None) -> list:
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    if workers <= 1:
+        _init_worker(sources, mutator_kwargs)
+        try:
+            return [render(job) for job in jobs]
+        finally:
+            _worker.clear()
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(sources, mutator_kwargs)
+    ) as pool:
+        return list(pool.map(render, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+
+
+def mutate_many(
+    source_code: str, seeds, workers: int | None = None, **mutator_kwargs
+) -> dict[int, str]:
+    """
+    Mutates one source once per seed, returning {seed: code}. Each output equals
+    `Mutator(seed=seed, **mutator_kwargs).mutate_source(source_code)`.
+    """
+    seeds = list(dict.fromkeys(seeds))
+    if not seeds:
+        return {}
+    return dict(_run([("", source_code)], mutator_kwargs, _render_source, seeds, workers))
+
+
+def mutate_directory_many(
+    input_dir: Path, output_dir: Path, seeds, workers: int | None = None, **mutator_kwargs
+) -> dict[int, Path]:
+    """
+    Writes one mutated copy of input_dir's Python files per seed, to output_dir/<seed>.
+    Each copy equals `mutate_directory(input_dir, output_dir / str(seed), seed=seed,
+    **mutator_kwargs)`. Returns {seed: output directory}.
+    """
+    input_dir = Path(input_dir)
+    if not input_dir.is_dir():
+        raise FileNotFoundError(f"Input directory {input_dir} does not exist.")
+    sources = [
+        (path.relative_to(input_dir).as_posix(), path.read_text(encoding="utf-8"))
+        for path in sorted(input_dir.rglob("*.py"))
+    ]
+    targets = {seed: Path(output_dir) / str(seed) for seed in dict.fromkeys(seeds)}
+    for target in targets.values():
+        target.mkdir(parents=True, exist_ok=True)
+    jobs = [(seed, str(target)) for seed, target in targets.items()]
+    if jobs:
+        _run(sources, mutator_kwargs, _render_directory, jobs, workers)
+    return targets
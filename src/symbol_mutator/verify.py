@@ -0,0 +1,244 @@
+"""
+Functional-equivalence check: runs a package's own test suite against its mutated copy.
+
+The tests are rewritten with the same mapping as the package, then the suite runs twice —
+once against the original (baseline) and once against the mutated package — in throwaway
+sandboxes. Test files are sharded and each shard runs in its own pytest subprocess, so
+shards of both runs execute in parallel without sharing interpreter state.
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import xml.etree.ElementTree as ET
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+from .core import Mutator
+
+PASSED = "passed"
+FAILED = "failed"
+SKIPPED = "skipped"
+MISSING = "missing"
+
+
+class VerifyReport:
+    """Per-test outcomes of the baseline and mutated runs."""
+
+    def __init__(self, baseline: dict[str, str], mutated: dict[str, str]):
+        self.baseline = baseline
+        self.mutated = mutated
+
+    @property
+    def regressions(self) -> list[str]:
+        """Tests that pass on the original package but not on the mutated one."""
+        return sorted(
+            test
+            for test, outcome in self.baseline.items()
+            if outcome == PASSED and self.mutated.get(test, MISSING) != PASSED
+        )
+
+    @property
+    def pass_rate(self) -> float:
+        """Share of baseline-passing tests that still pass after mutation."""
+        passing = [t for t, outcome in self.baseline.items() if outcome == PASSED]
+        if not passing:
+            return 1.0
+        return sum(self.mutated.get(t) == PASSED for t in passing) / len(passing)
+
+    @property
+    def ok(self) -> bool:
+        return not self.regressions
+
+    def format(self) -> str:
+        lines = [
+            f"Baseline: {_summary(self.baseline)}",
+            f"Mutated:  {_summary(self.mutated)}",
+            f"Pass rate vs baseline: {self.pass_rate:.1%}",
+        ]
+        if self.regressions:
+            lines.append("Regressions:")
+            lines.extend(
+                f"  {test}: passed -> {self.mutated.get(test, MISSING)}"
+                for test in self.regressions
+            )
+        return "\n".join(lines)
+
+
+def _summary(outcomes: dict[str, str]) -> str:
+    counts = {PASSED: 0, FAILED: 0, SKIPPED: 0}
+    for outcome in outcomes.values():
+        counts[outcome] = counts.get(outcome, 0) + 1
+    return ", ".join(f"{n} {name}" for name, n in counts.items())
+
+
+def find_test_files(tests_dir: Path) -> list[Path]:
+    tests_dir = Path(tests_dir)
+    files = set(tests_dir.rglob("test_*.py")) | set(tests_dir.rglob("*_test.py"))
+    return sorted(files)
+
+
+def shard_files(files: list[Path], shards: int) -> list[list[Path]]:
+    """Balances files across shards by size (longest processing time first)."""
+    buckets: list[tuple[int, list[Path]]] = [(0, []) for _ in range(max(1, shards))]
+    for file in sorted(files, key=lambda f: (-f.stat().st_size, str(f))):
+        index = min(range(len(buckets)), key=lambda i: buckets[i][0])
+        size, members = buckets[index]
+        buckets[index] = (size + file.stat().st_size, members + [file])
+    return [members for _, members in buckets if members]
+
+
+def parse_junit(path: Path, inverse: dict[str, str] | None = None) -> dict[str, str]:
+    """Reads pytest's JUnit XML into {test id: outcome}, un-renaming ids via inverse."""
+    outcomes = {}
+    if not path.exists():
+        return outcomes
+    for case in ET.parse(path).iter("testcase"):
+        classname = case.get("classname", "")
+        name = case.get("name", "")
+        if inverse:
+            classname = ".".join(inverse.get(part, part) for part in classname.split("."))
+            base, bracket, params = name.partition("[")
+            name = inverse.get(base, base) + bracket + params
+        if case.find("failure") is not None or case.find("error") is not None:
+            outcome = FAILED
+        elif case.find("skipped") is not None:
+            outcome = SKIPPED
+        else:
+            outcome = PASSED
+        outcomes[f"{classname}::{name}"] = outcome
+    return outcomes
+
+
+def _run_shard(
+    package_dir: Path,
+    package_name: str,
+    tests_dir: Path,
+    shard: list[Path],
+    pytest_args: list[str],
+    timeout: float | None,
+    inverse: dict[str, str] | None,
+) -> dict[str, str]:
+    """Copies package and tests into a fresh sandbox and runs one shard of the suite there."""
+    with tempfile.TemporaryDirectory(prefix="symbol-mutator-verify-") as sandbox:
+        sandbox = Path(sandbox)
+        shutil.copytree(package_dir, sandbox / "src" / package_name)
+        shutil.copytree(tests_dir, sandbox / "tests")
+        report = sandbox / "report.xml"
+
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(
+            [str(sandbox / "src")] + ([env["PYTHONPATH"]] if env.get("PYTHONPATH") else [])
+        )
+        env["PYTHONDONTWRITEBYTECODE"] = "1"
+        cmd = [
+            sys.executable,
+            "-m",
+            "pytest",
+            "-q",
+            "-p",
+            "no:cacheprovider",
+            f"--junitxml={report}",
+            *pytest_args,
+            *[str(Path("tests") / f.relative_to(tests_dir)) for f in shard],
+        ]
+        try:
+            subprocess.run(cmd, cwd=sandbox, env=env, capture_output=True, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            pass
+        return parse_junit(report, inverse)
+
+
+def _submit_suite(
+    pool: ThreadPoolExecutor,
+    package_dir: Path,
+    package_name: str,
+    tests_dir: Path,
+    shards: list[list[Path]],
+    pytest_args: list[str],
+    timeout: float | None,
+    inverse: dict[str, str] | None = None,
+) -> list[Future]:
+    return [
+        pool.submit(
+            _run_shard, package_dir, package_name, tests_dir, shard, pytest_args, timeout, inverse
+        )
+        for shard in shards
+    ]
+
+
+def _collect(futures: list[Future]) -> dict[str, str]:
+    outcomes: dict[str, str] = {}
+    for future in futures:
+        outcomes.update(future.result())
+    return outcomes
+
+
+def verify_package(
+    package_dir: Path,
+    tests_dir: Path,
+    mutator: Mutator | None = None,
+    workers: int | None = None,
+    pytest_args: list[str] | None = None,
+    timeout: float | None = None,
+    **mutator_kwargs,
+) -> VerifyReport:
+    """
+    Mutates package_dir, rewrites tests_dir with the same mapping and compares the suite's
+    per-test outcomes against the unmutated baseline.
+
+    Symbols are collected from the package only, so tests keep their own names but every
+    reference to the package's API follows the rename. If the package's own name is
+    mapped (via internal_prefixes), its directory is renamed to match.
+    """
+    if mutator is None:
+        mutator = Mutator(**mutator_kwargs)
+    package_dir = Path(package_dir)
+    tests_dir = Path(tests_dir)
+    workers = workers or os.cpu_count() or 1
+    pytest_args = pytest_args or []
+
+    test_files = find_test_files(tests_dir)
+    shards = shard_files(test_files, workers)
+
+    package_files = sorted(package_dir.rglob("*.py"))
+    for src_file in package_files:
+        mutator.collect_definitions(src_file.read_text(encoding="utf-8"))
+
+    with tempfile.TemporaryDirectory(prefix="symbol-mutator-mutated-") as workspace:
+        workspace = Path(workspace)
+        mutated_package = workspace / "package"
+        mutated_tests = workspace / "tests"
+        shutil.copytree(package_dir, mutated_package)
+        shutil.copytree(tests_dir, mutated_tests)
+        for src_file in package_files:
+            dest = mutated_package / src_file.relative_to(package_dir)
+            dest.write_text(mutator.transform_code(src_file.read_text(encoding="utf-8")), "utf-8")
+        for src_file in sorted(tests_dir.rglob("*.py")):
+            dest = mutated_tests / src_file.relative_to(tests_dir)
+            dest.write_text(mutator.transform_code(src_file.read_text(encoding="utf-8")), "utf-8")
+
+        mutated_name = mutator.mapping.get(package_dir.name, package_dir.name)
+        inverse = {new: old for old, new in mutator.mapping.items()}
+        mutated_shards = [[mutated_tests / f.relative_to(tests_dir) for f in s] for s in shards]
+
+        # Baseline and mutated shards share one pool so both suites run side by side
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            baseline = _submit_suite(
+                pool, package_dir, package_dir.name, tests_dir, shards, pytest_args, timeout
+            )
+            mutated = _submit_suite(
+                pool,
+                mutated_package,
+                mutated_name,
+                mutated_tests,
+                mutated_shards,
+                pytest_args,
+                timeout,
+                inverse,
+            )
+            baseline, mutated = _collect(baseline), _collect(mutated)
+
+    return VerifyReport(baseline, mutated)
@@ -0,0 +1,28 @@
+import pytest
+
+
+def _write_tree(root, files):
+    for name, code in files.items():
+        (root / name).parent.mkdir(parents=True, exist_ok=True)
+        (root / name).write_text(code)
+    return root
+
+
+def _read_tree(root):
+    return {p.relative_to(root).as_posix(): p.read_text() for p in sorted(root.rglob("*.py"))}
+
+
+@pytest.fixture
+def tree(tmp_path, files):
+    """Writes the requesting module's `files` fixture under tmp_path/src."""
+    return _write_tree(tmp_path / "src", files)
+
+
+@pytest.fixture
+def write_tree():
+    return _write_tree
+
+
+@pytest.fixture
+def read_tree():
+    return _read_tree
@@ -0,0 +1,104 @@
+import asyncio
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+from symbol_mutator import Mutator, amutate_directory, mutate_directory
+
+FILES = {
+    "a.py": "def alpha(x):\n    # one more\n    return x + 1\n",
+    "b.py": "from a import alpha\n\ndef beta(y):\n    return alpha(y) * 2\n",
+    "pkg/c.py": "class Gamma:\n    def run(self, size):\n        return size\n",
+    "pkg/d.py": "def delta():\n    if True:\n        return 4\n    return 5\n",
+}
+
+
+@pytest.fixture
+def files():
+    return FILES
+
+
+@pytest.mark.parametrize("intensity", [1, 5])
+def test_amutate_source_matches_sync(intensity):
+    sync = Mutator(seed=4, intensity=intensity)
+    expected = [sync.mutate_source(code) for code in FILES.values()]
+
+    mutator = Mutator(seed=4, intensity=intensity)
+
+    async def run():
+        # Started together, but run in call order like the sync calls
+        return await asyncio.gather(*[mutator.amutate_source(code) for code in FILES.values()])
+
+    assert asyncio.run(run()) == expected
+    assert mutator.mapping == sync.mapping
+    assert mutator.generator.rng.getstate() == sync.generator.rng.getstate()
+
+
+def test_amutate_source_in_process_pool():
+    code = FILES["pkg/c.py"]
+    expected = Mutator(seed=2).mutate_source(code)
+    mutator = Mutator(seed=2)
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        assert asyncio.run(mutator.amutate_source(code, executor)) == expected
+    assert "Gamma" in mutator.mapping
+
+
+def test_cancelled_call_leaves_mutator_untouched():
+    started, release = threading.Event(), threading.Event()
+
+    def block():
+        started.set()
+        release.wait()
+
+    mutator = Mutator(seed=1)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+
+        async def run():
+            blocker = asyncio.get_running_loop().run_in_executor(executor, block)
+            task = asyncio.ensure_future(mutator.amutate_source(FILES["a.py"], executor))
+            await asyncio.to_thread(started.wait)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            release.set()
+            await blocker
+
+        asyncio.run(run())
+    assert mutator.mapping == {}
+    assert asyncio.run(mutator.amutate_source(FILES["a.py"])) == Mutator(seed=1).mutate_source(
+        FILES["a.py"]
+    )
+
+
+@pytest.mark.parametrize("executor", [None, "threads", "processes"])
+def test_amutate_directory_matches_sync(tree, tmp_path, executor, read_tree):
+    expected = mutate_directory(tree, tmp_path / "expected", seed=6, intensity=5)
+    pool = {
+        None: None,
+        "threads": ThreadPoolExecutor(max_workers=2),
+        "processes": ProcessPoolExecutor(max_workers=2),
+    }[executor]
+    try:
+        report = asyncio.run(
+            amutate_directory(
+                tree, tmp_path / "out", executor=pool, max_pending=2, seed=6, intensity=5
+            )
+        )
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    assert report.to_dict() == expected.to_dict()
+    assert read_tree(tmp_path / "out") == read_tree(tmp_path / "expected")
+
+
+def test_amutate_directory_isolates_failures(tree, tmp_path):
+    (tree / "legacy.py").write_text('print "python 2"\n')
+    report = asyncio.run(amutate_directory(tree, tmp_path / "out", seed=3, errors="skip"))
+    expected = mutate_directory(tree, tmp_path / "expected", seed=3, errors="skip")
+
+    assert report.to_dict() == expected.to_dict()
+    assert [(f.path, f.phase) for f in report.failures] == [("legacy.py", "collect")]
+    with pytest.raises(Exception, match="Syntax Error"):
+        asyncio.run(amutate_directory(tree, tmp_path / "out", seed=3))
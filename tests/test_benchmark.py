@@ -0,0 +1,172 @@
+import asyncio
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from symbol_mutator import Mutator
+from symbol_mutator.benchmark import (
+    cli_provider_kwargs,
+    is_identified,
+    make_providers,
+    run_sequential_benchmark,
+    wilson_interval,
+)
+
+
+def test_wilson_interval_bounds():
+    low, high = wilson_interval(0, 20)
+    assert low == pytest.approx(0.0, abs=1e-12)
+    assert 0.0 < high < 0.2
+
+    low, high = wilson_interval(10, 20)
+    assert low < 0.5 < high
+    assert high - low == pytest.approx(2 * (0.5 - low))
+
+    # More samples -> narrower interval
+    assert wilson_interval(50, 100)[1] - wilson_interval(50, 100)[0] < high - low
+
+
+def test_is_identified():
+    target = Path("fastapi_snippet.py")
+    assert is_identified(target, "FastAPI")
+    assert is_identified(target, "fast-api")
+    assert not is_identified(target, "Unknown")
+
+
+class _LengthModel:
+    """Stands in for the n-gram model: any object with a perplexity(code) method will do."""
+
+    def perplexity(self, code):
+        return float(len(code))
+
+
+def test_sequential_benchmark_stops_on_ci_width(tmp_path):
+    target = tmp_path / "flask_snippet.py"
+    target.write_text("class Flask:\n    def route(self, rule):\n        return rule\n")
+
+    cells = asyncio.run(
+        run_sequential_benchmark(
+            [target],
+            ["mock"],
+            [1],
+            ci_width=0.5,
+            batch_size=2,
+            min_samples=2,
+            max_samples=20,
+            max_concurrency=4,
+            perplexity_model=_LengthModel(),
+        )
+    )
+
+    assert len(cells) == 1
+    cell = cells[0]
+    # The mock never identifies anything, so four seeds give a [0, 0.49] interval
+    assert cell["converged"]
+    assert cell["samples"] == 4
+    assert cell["ir"] == 0.0
+    assert cell["ci_high"] - cell["ci_low"] <= 0.5
+    assert sorted(r["seed"] for r in cell["results"]) == [42, 43, 44, 45]
+    assert all(r["perplexity"] > 0 for r in cell["results"])
+
+
+def test_ladders_are_built_off_the_event_loop(tmp_path, monkeypatch):
+    target = tmp_path / "flask_snippet.py"
+    target.write_text("class Flask:\n    pass\n")
+    real_ladder = Mutator.mutate_ladder
+
+    def slow_ladder(*args, **kwargs):
+        time.sleep(0.3)
+        return real_ladder(*args, **kwargs)
+
+    monkeypatch.setattr(Mutator, "mutate_ladder", slow_ladder)
+
+    async def run():
+        gaps = []
+        sweep = asyncio.ensure_future(
+            run_sequential_benchmark(
+                [target], ["mock"], [1, 2], batch_size=2, min_samples=4, max_samples=4
+            )
+        )
+        while not sweep.done():
+            started = time.perf_counter()
+            await asyncio.sleep(0.01)
+            gaps.append(time.perf_counter() - started)
+        return await sweep, max(gaps)
+
+    cells, longest_gap = asyncio.run(run())
+    assert all(cell["samples"] == 4 for cell in cells)
+    # A ladder built on the loop would hold it for the whole 0.3 s
+    assert longest_gap < 0.2
+
+
+def test_perplexity_is_rejected_in_package_mode(tmp_path):
+    args = ["--targets-dir", str(tmp_path), "--packages", "--perplexity"]
+    result = subprocess.run(
+        [sys.executable, "-m", "symbol_mutator.benchmark", *args], capture_output=True, text=True
+    )
+    assert result.returncode == 2
+    assert "--perplexity" in result.stderr
+
+
+def test_aggregate_answers():
+    from symbol_mutator.benchmark import aggregate_answers
+
+    combined = aggregate_answers(
+        [
+            {"library": "Flask", "score": 0.6},
+            {"library": "Unknown", "score": 0.0},
+            {"library": "django", "score": 0.3},
+            {"library": "flask", "score": 0.5},
+        ]
+    )
+    assert combined["library"] == "Flask"
+    assert combined["score"] == pytest.approx(1.1 / 4)
+    assert aggregate_answers([{"library": "Unknown", "score": 0.0}])["library"] == "Unknown"
+
+
+def test_package_benchmark(tmp_path):
+    from symbol_mutator.benchmark import run_package_benchmark
+
+    package = tmp_path / "flask"
+    package.mkdir()
+    (package / "__init__.py").write_text("from flask.app import Flask\n")
+    (package / "app.py").write_text(
+        "class Flask:\n    def route(self, rule):\n        return rule\n"
+    )
+
+    results = asyncio.run(run_package_benchmark([package], ["mock"], [1], token_budget=40))
+
+    assert len(results) == 1
+    result = results[0]
+    assert result["files_total"] == 2
+    assert result["chunks"] >= 1
+    assert result["library"] == "Unknown"
+    assert not result["identified"]
+
+
+def test_cli_provider_kwargs_are_per_provider():
+    kwargs = cli_provider_kwargs(
+        ["openai", "gemini", "mock"], "http://127.0.0.1:8089/v1", ["openai=gpt-4o-mini"]
+    )
+    assert kwargs == {"openai": {"base_url": "http://127.0.0.1:8089/v1", "model": "gpt-4o-mini"}}
+    assert cli_provider_kwargs(["anthropic"], models=["claude-x"]) == {
+        "anthropic": {"model": "claude-x"}
+    }
+    with pytest.raises(ValueError, match="ambiguous"):
+        cli_provider_kwargs(["openai", "anthropic"], models=["gpt-4o"])
+    with pytest.raises(ValueError, match="isn't selected"):
+        cli_provider_kwargs(["openai"], models=["gemini=gemini-1.5-pro"])
+    with pytest.raises(ValueError, match="takes --base-url"):
+        cli_provider_kwargs(["gemini"], "http://127.0.0.1:8089")
+
+
+def test_make_providers_routes_options(monkeypatch):
+    import symbol_mutator.benchmark as benchmark
+
+    calls = {}
+    monkeypatch.setattr(benchmark, "get_provider", lambda name, **kw: calls.setdefault(name, kw))
+    make_providers(["openai", "mock"], {"api_key": "k", "openai": {"model": "m"}})
+    assert calls == {"openai": {"api_key": "k", "model": "m"}, "mock": {"api_key": "k"}}
@@ -0,0 +1,111 @@
+import json
+
+import pytest
+
+import symbol_mutator.core as core
+from symbol_mutator import mutate_directory
+from symbol_mutator.checkpoint import Checkpoint
+from symbol_mutator.cli import main
+
+FILES = {
+    "a.py": "def alpha(x):\n    return x + 1\n",
+    "b.py": "from a import alpha\n\ndef beta(y):\n    return alpha(y) * 2\n",
+    "pkg/c.py": "class Gamma:\n    def run(self):\n        return 3\n",
+    "pkg/d.py": "def delta():\n    return 4\n",
+}
+
+
+@pytest.fixture
+def files():
+    return FILES
+
+
+@pytest.mark.parametrize("pipeline", [False, True])
+def test_broken_file_is_isolated(tree, tmp_path, pipeline, write_tree, read_tree):
+    (tree / "legacy.py").write_text('print "python 2"\n')
+    (tree / "latin1.py").write_bytes(b"name = '\xe9'\n")
+    clean = write_tree(tmp_path / "clean", FILES)
+
+    report = mutate_directory(tree, tmp_path / "out", seed=3, errors="skip", pipeline=pipeline)
+    expected = mutate_directory(clean, tmp_path / "expected", seed=3)
+
+    assert not report.ok
+    assert {(f.path, f.phase) for f in report.failures} == {
+        ("legacy.py", "collect"),
+        ("latin1.py", "collect"),
+    }
+    assert sorted(report.mutated) == sorted(FILES)
+    assert read_tree(tmp_path / "out") == read_tree(tmp_path / "expected")
+    assert expected.ok and sorted(expected.mutated) == sorted(FILES)
+    assert "legacy.py (collect): ParserSyntaxError" in report.format()
+
+
+def test_errors_raise_by_default(tree, tmp_path):
+    (tree / "legacy.py").write_text('print "python 2"\n')
+    with pytest.raises(Exception, match="Syntax Error"):
+        mutate_directory(tree, tmp_path / "out", seed=3)
+    with pytest.raises(ValueError):
+        mutate_directory(tree, tmp_path / "out", seed=3, errors="ignore")
+
+
+def test_resume_skips_collection_and_done_files(tree, tmp_path, monkeypatch, read_tree):
+    checkpoint = tmp_path / "run.ckpt"
+    mutate_directory(tree, tmp_path / "expected", seed=5, intensity=5)
+
+    # A run interrupted while writing its third file
+    real_write = core._write_text
+    calls = []
+
+    def crash_on_third(path, text):
+        calls.append(path)
+        if len(calls) == 3:
+            raise KeyboardInterrupt
+        real_write(path, text)
+
+    monkeypatch.setattr(core, "_write_text", crash_on_third)
+    with pytest.raises(KeyboardInterrupt):
+        mutate_directory(tree, tmp_path / "out", seed=5, intensity=5, checkpoint=checkpoint)
+    monkeypatch.setattr(core, "_write_text", real_write)
+    assert len(Checkpoint(checkpoint).entries()) == 2
+
+    collected = []
+    monkeypatch.setattr(core.Mutator, "collect_definitions", lambda self, code: collected.append(1))
+    report = mutate_directory(tree, tmp_path / "out", seed=5, intensity=5, checkpoint=checkpoint)
+
+    assert not collected
+    assert report.ok
+    assert len(report.resumed) == 2 and len(report.mutated) == 2
+    assert read_tree(tmp_path / "out") == read_tree(tmp_path / "expected")
+
+
+def test_changed_input_invalidates_checkpoint(tree, tmp_path):
+    checkpoint = tmp_path / "run.ckpt"
+    mutate_directory(tree, tmp_path / "out", seed=5, checkpoint=checkpoint)
+    assert mutate_directory(tree, tmp_path / "out", seed=5, checkpoint=checkpoint).resumed
+
+    (tree / "pkg/d.py").write_text("def delta():\n    return 40\n")
+    report = mutate_directory(tree, tmp_path / "out", seed=5, checkpoint=checkpoint)
+    assert not report.resumed and len(report.mutated) == len(FILES)
+    report = mutate_directory(tree, tmp_path / "out", seed=6, checkpoint=checkpoint)
+    assert not report.resumed
+
+
+def test_cli_keep_going_writes_report(tree, tmp_path, capsys):
+    (tree / "legacy.py").write_text('print "python 2"\n')
+    out = tmp_path / "out"
+    status = main(
+        [
+            "--target",
+            str(tree),
+            "--output",
+            str(out),
+            "--keep-going",
+            "--report",
+            str(tmp_path / "report.json"),
+        ]
+    )
+
+    assert status == 1
+    report = json.loads((tmp_path / "report.json").read_text())
+    assert [f["path"] for f in report["failures"]] == ["legacy.py"]
+    assert "1 failed" in capsys.readouterr().out
@@ -0,0 +1,55 @@
+from pathlib import Path
+
+from symbol_mutator.chunking import (
+    chunk_files,
+    context_budget,
+    estimate_tokens,
+    identity_score,
+    read_package,
+)
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("def f(x):\n    return x\n") < 20
+    # Non-Latin identifiers tokenize far worse than ASCII ones of the same length
+    assert estimate_tokens("система_объект") > estimate_tokens("system_objects")
+
+
+def test_context_budget():
+    assert context_budget("gpt-4o-mini") == 64_000
+    assert context_budget("claude-3-5-sonnet-20240620") == 100_000
+    assert context_budget(None) == 16_000
+
+
+def test_identity_ordering_and_budget():
+    files = {
+        "tests/test_app.py": "class TestApp:\n    pass\n",
+        "_compat.py": "def _helper():\n    pass\n",
+        "__init__.py": "from .app import App\n",
+        "app.py": "class App:\n    def run(self):\n        pass\n",
+    }
+    assert identity_score(Path("__init__.py"), files["__init__.py"]) > 5
+
+    chunks = chunk_files(files, token_budget=40)
+    assert all(c.tokens <= 40 for c in chunks)
+    order = [path for c in chunks for path, _ in c.files]
+    assert order[0] == "__init__.py"
+    assert order.index("app.py") < order.index("tests/test_app.py")
+
+    assert len(chunk_files(files, token_budget=40, max_chunks=1)) == 1
+
+
+def test_oversized_file_is_split():
+    code = "".join(f"value_{i} = {i}\n" for i in range(200))
+    chunks = chunk_files({"table.py": code}, token_budget=100)
+    assert len(chunks) > 1
+    assert "".join(piece for c in chunks for _, piece in c.files) == code
+    assert chunks[0].files[0][0].startswith("table.py (part 1/")
+
+
+def test_read_package(tmp_path):
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "__init__.py").write_text("x = 1\n")
+    (tmp_path / "pkg" / "notes.txt").write_text("ignored")
+    assert read_package(tmp_path) == {"pkg/__init__.py": "x = 1\n"}
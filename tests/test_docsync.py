@@ -0,0 +1,117 @@
+import pytest
+
+from symbol_mutator.cli import main
+from symbol_mutator.docsync import DocRewriter, sync_docs
+
+MAPPING = {"Circle": "c_1a2b3c", "area": "f_4d5e6f", "data": "f_777777", "geom": "f_abcdef"}
+
+MARKDOWN = """# Circles
+
+Use `Circle(2).area()` to get the area of the data.
+
+```python
+from geom import Circle
+Circle(1).area()  # CircleArea stays: not an exact identifier
+```
+
+Plain data prose and ``double `Circle` ticks``.
+"""
+
+RST = """Circles
+=======
+
+Call :meth:`geom.Circle.area` or ``Circle.area`` on the data. See `the docs`_.
+
+Example::
+
+    c = Circle(1)
+    c.area()
+
+Back to prose about area.
+
+.. code-block:: python
+
+    from geom import Circle
+
+>>> Circle(2).area()
+12
+
+.. note:: Circle is prose here.
+"""
+
+
+def test_markdown_rewrites_only_code():
+    out = DocRewriter(MAPPING).rewrite(MARKDOWN, "README.md")
+
+    assert "Use `c_1a2b3c(2).f_4d5e6f()` to get the area of the data." in out
+    assert "from f_abcdef import c_1a2b3c" in out
+    assert "c_1a2b3c(1).f_4d5e6f()  # CircleArea stays" in out
+    assert "Plain data prose and ``double `c_1a2b3c` ticks``." in out
+    assert "# Circles" in out
+
+
+def test_rst_rewrites_literals_roles_and_blocks():
+    out = DocRewriter(MAPPING).rewrite(RST, "index.rst")
+
+    assert ":meth:`f_abcdef.c_1a2b3c.f_4d5e6f`" in out
+    assert "``c_1a2b3c.f_4d5e6f`` on the data" in out
+    assert "`the docs`_" in out
+    assert "    c = c_1a2b3c(1)\n    c.f_4d5e6f()" in out
+    assert "Back to prose about area." in out
+    assert "    from f_abcdef import c_1a2b3c" in out
+    assert ">>> c_1a2b3c(2).f_4d5e6f()" in out
+    assert ".. note:: Circle is prose here." in out
+
+
+def test_scope_all_rewrites_prose():
+    out = DocRewriter(MAPPING, scope="all").rewrite("The Circle has an area.", "a.md")
+
+    assert out == "The c_1a2b3c has an f_4d5e6f."
+    with pytest.raises(ValueError):
+        DocRewriter(MAPPING, scope="prose")
+
+
+def test_rewrite_is_linear_in_text_not_mapping():
+    mapping = {f"name_{i}": f"f_{i:06x}" for i in range(50_000)}
+    text = "`name_7 + name_49999 + name_50000`\n" * 1000
+
+    out = DocRewriter(mapping).rewrite(text, "big.md")
+
+    assert out.count("`f_000007 + f_00c34f + name_50000`") == 1000
+
+
+def test_sync_docs_and_cli(tmp_path, capsys):
+    src = tmp_path / "project"
+    (src / "docs").mkdir(parents=True)
+    (src / "README.md").write_text(MARKDOWN)
+    (src / "docs" / "index.rst").write_text(RST)
+    (src / "notes.txt").write_text("Circle")
+
+    written = sync_docs(src, tmp_path / "out", MAPPING)
+    assert sorted(p.relative_to(tmp_path / "out").as_posix() for p in written) == [
+        "README.md",
+        "docs/index.rst",
+    ]
+
+    mapping_file = tmp_path / "mapping.json"
+    mapping_file.write_text('{"mapping": {"Circle": "c_1a2b3c"}}')
+    assert main(["docs", "--target", str(src), "--mapping", str(mapping_file)]) == 0
+    assert "`c_1a2b3c(2).area()`" in (src / "README.md").read_text()
+    assert "Rewrote 2 documentation files" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("link_mode", ["auto", "hardlink"])
+def test_mirror_sync_docs_leaves_input_untouched(tmp_path, link_mode):
+    src = tmp_path / "project"
+    (src / "docs").mkdir(parents=True)
+    (src / "geom.py").write_text("class Circle:\n    def area(self):\n        return 1\n")
+    (src / "README.md").write_text(MARKDOWN)
+    (src / "docs" / "index.rst").write_text(RST)
+    before = {p: p.read_bytes() for p in src.rglob("*") if p.is_file()}
+
+    out = tmp_path / "out"
+    argv = ["--target", str(src), "--output", str(out), "--mirror", "--link-mode", link_mode]
+    assert main([*argv, "--sync-docs"]) == 0
+
+    assert {p: p.read_bytes() for p in src.rglob("*") if p.is_file()} == before
+    assert "`Circle(2).area()`" not in (out / "README.md").read_text()
@@ -0,0 +1,162 @@
+import pytest
+
+from symbol_mutator import Mutator, mutate_directory
+from symbol_mutator.cli import main
+from symbol_mutator.equivalence import check_directory, check_source
+
+SOURCE = '''
+import os
+from geom.base import Base
+
+__version__ = "1.0"
+
+
+def area(radius, scale):
+    """Area of a scaled circle."""
+    if radius > 0 or scale:
+        y = radius * 2
+    else:
+        y = 0
+    a = 3
+    b = 4
+    return Base(y + a + b, os.sep)
+
+
+class Shape(Base):
+    def run(self):
+        return area(self.size, 2)
+'''
+
+
+def _inverse(mutator):
+    return {new: old for old, new in mutator.mapping.items()}
+
+
+@pytest.mark.parametrize("intensity", [1, 2, 3, 4, 5])
+def test_mutated_source_is_equivalent(intensity):
+    mutator = Mutator(seed=7, intensity=intensity, internal_prefixes=["geom"])
+    mutated = mutator.mutate_source(SOURCE)
+
+    assert mutated != SOURCE
+    assert check_source(SOURCE, mutated, _inverse(mutator), intensity, mutator.strip_comments) == []
+
+
+def test_inverted_or_condition_keeps_its_meaning():
+    mutator = Mutator(seed=7, intensity=4)
+    mutated = mutator.mutate_source("if a or b:\n    x = 1\nelse:\n    x = 2\n")
+
+    assert "not (a or b)" in mutated
+
+
+def test_flags_changed_structure():
+    original = "def f(x):\n    return x + 1\n\ndef g():\n    return 0\n"
+    mutated = "def f_1(x):\n    return x - 1\n\ndef g():\n    return 0\n"
+
+    divergences = check_source(original, mutated, {"f_1": "f"})
+
+    assert [(d.symbol, d.reason) for d in divergences] == [("f", "structure differs")]
+
+
+def test_swap_only_allowed_for_independent_statements():
+    original = "a = 1\nb = a\n"
+    swapped = "b = a\na = 1\n"
+
+    assert check_source("a = 1\nb = 2\n", "b = 2\na = 1\n", {}, intensity=4) == []
+    assert check_source(original, swapped, {}, intensity=4) != []
+    assert check_source("a = 1\nb = 2\n", "b = 2\na = 1\n", {}, intensity=3) != []
+
+
+def test_flags_use_renamed_without_its_binding():
+    # A name imported from an external module keeps its import, but its use is renamed
+    mutator = Mutator(seed=1)
+    mutator.collect_definitions("class Point:\n    pass\n")
+    original = "from external import Point\n\ndef make():\n    return Point()\n"
+    mutated = mutator.transform_code(original)
+
+    divergences = check_source(original, mutated, _inverse(mutator))
+
+    assert [d.reason for d in divergences] == ["renamed from 'Point' but never bound"]
+
+
+def test_check_directory(tmp_path):
+    src = tmp_path / "src" / "geom"
+    src.mkdir(parents=True)
+    (src / "__init__.py").write_text("")
+    (src / "base.py").write_text("class Base:\n    def __init__(self, *args):\n        pass\n")
+    (src / "shapes.py").write_text(SOURCE)
+    out = tmp_path / "out"
+    mutator = Mutator(seed=3, intensity=5, internal_prefixes=["geom"])
+    mutate_directory(src, out, mutator=mutator)
+
+    report = check_directory(src, out, mutator.mapping, intensity=5, workers=2)
+    assert report.ok
+    assert report.files_checked == 3
+
+    (out / "shapes.py").write_text("x = 1\n")
+    report = check_directory(src, out, mutator.mapping, intensity=5, workers=2)
+    assert not report.ok
+    assert {d.path for d in report.divergences} == {"shapes.py"}
+
+
+def test_cli_dump_mapping_and_check(tmp_path, capsys):
+    src = tmp_path / "lib"
+    src.mkdir()
+    (src / "mod.py").write_text(SOURCE)
+    out = tmp_path / "out"
+    mapping = tmp_path / "mapping.json"
+
+    assert (
+        main(
+            [
+                "--target",
+                str(src),
+                "--output",
+                str(out),
+                "--intensity",
+                "4",
+                "--internal-prefix",
+                "geom",
+                "--dump-mapping",
+                str(mapping),
+            ]
+        )
+        == 0
+    )
+    assert (
+        main(["check", "--original", str(src), "--mutated", str(out), "--mapping", str(mapping)])
+        == 0
+    )
+    assert "0 divergences" in capsys.readouterr().out
+
+
+def test_renamed_string_annotations_are_equivalent():
+    original = (
+        'class Node:\n    def copy(self) -> "Node":\n        return self\n\n__all__ = ["Node"]\n'
+    )
+    mutator = Mutator(seed=2)
+    mutated = mutator.mutate_source(original)
+
+    assert check_source(original, mutated, _inverse(mutator)) == []
+
+
+def test_only_renamed_string_positions_are_mapped_back():
+    original = """from typing import Annotated, Literal, TypeVar, cast
+
+class Node:
+    pass
+
+T = TypeVar("T", bound="list['Node']")
+
+def run(mode: Literal["Node"], n: "Annotated[Node, 'Node']") -> "list[Node]":
+    return cast("Node", mode), "Node"
+"""
+    mutator = Mutator(seed=2)
+    mutated = mutator.mutate_source(original)
+    inverse = _inverse(mutator)
+    node = mutator.mapping["Node"]
+    assert check_source(original, mutated, inverse) == []
+
+    for data in ('Literal["Node"]', "'Node']\"", '"Node"\n'):
+        broken = mutated.replace(data, data.replace("Node", node))
+        assert broken != mutated
+        assert check_source(original, broken, inverse), data
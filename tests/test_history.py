@@ -0,0 +1,94 @@
+import io
+import shutil
+import subprocess
+
+import pytest
+
+from symbol_mutator import Mutator
+from symbol_mutator.cli import main
+from symbol_mutator.history import rewrite_history, write_stream
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+
+
+def _git(repo, *args):
+    return subprocess.run(
+        ["git", "-C", str(repo), "-c", "user.name=T", "-c", "user.email=t@example.com", *args],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+
+
+@pytest.fixture
+def repo(tmp_path):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    _git(repo, "init", "--quiet", "--initial-branch=main")
+    (repo / "geometry.py").write_text("class Circle:\n    def area(self):\n        return 3\n")
+    (repo / "notes.txt").write_text("v1\n")
+    _git(repo, "add", ".")
+    _git(repo, "commit", "--quiet", "-m", "first")
+    (repo / "notes.txt").write_text("v2\n")
+    _git(repo, "commit", "--quiet", "-am", "notes only")
+    (repo / "geometry.py").write_text(
+        "class Circle:\n    def area(self):\n        return 3\n\n"
+        "def unit_circle():\n    return Circle()\n"
+    )
+    _git(repo, "commit", "--quiet", "-am", "add helper")
+    _git(repo, "tag", "v1")
+    return repo
+
+
+def test_rewrite_history(repo, tmp_path):
+    output = tmp_path / "rewritten"
+    mutator = Mutator(seed=1)
+
+    report = rewrite_history(repo, output=output, mutator=mutator, workers=2)
+
+    assert (report.commits, report.blobs, report.mutated, report.failed) == (3, 2, 2, [])
+    assert _git(output, "log", "--format=%s", "main").split("\n")[:3] == [
+        "add helper",
+        "notes only",
+        "first",
+    ]
+    head = _git(output, "show", "v1:geometry.py")
+    assert "Circle" not in head
+    assert f"return {mutator.mapping['Circle']}()" in head
+    # The first version is mutated with the same global mapping
+    assert f"class {mutator.mapping['Circle']}:" in _git(output, "show", "main~2:geometry.py")
+    assert _git(output, "show", "main~1:notes.txt") == "v2\n"
+    assert (output / "geometry.py").read_text() == head
+
+    # No object from the original history survives
+    objects = subprocess.run(
+        ["git", "-C", str(output), "cat-file", "--batch-all-objects", "--batch"],
+        check=True,
+        capture_output=True,
+    ).stdout
+    assert b"class Circle" not in objects
+
+
+def test_history_cli_writes_stream(repo, tmp_path, capsys):
+    stream = tmp_path / "import.stream"
+
+    assert main(["history", "--repo", str(repo), "--stream", str(stream), "--workers", "1"]) == 0
+
+    assert b"class Circle" not in stream.read_bytes()
+    assert "2 of 2 distinct Python blobs mutated" in capsys.readouterr().out
+
+
+def test_write_stream_points_modifies_at_marks():
+    sha = "a" * 40
+    export = io.BytesIO(
+        b"commit refs/heads/main\nmark :1\ndata 3\nmsg\n"
+        b"M 100644 " + sha.encode() + b" pkg/mod.py\n"
+        b"M 100644 " + b"b" * 40 + b" README\n\n"
+    )
+    out = io.BytesIO()
+
+    write_stream(export, out, {sha: b"x = 1\n"}, first_mark=2)
+
+    assert out.getvalue().startswith(b"blob\nmark :2\ndata 6\nx = 1\n\n")
+    assert b"M 100644 :2 pkg/mod.py\n" in out.getvalue()
+    assert b"M 100644 " + b"b" * 40 + b" README\n" in out.getvalue()
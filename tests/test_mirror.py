@@ -0,0 +1,90 @@
+import os
+
+import pytest
+
+from symbol_mutator import Mutator, mutate_directory
+from symbol_mutator.mirror import copy_file
+
+
+@pytest.mark.parametrize("link_mode", ["auto", "reflink", "copy"])
+def test_copy_file_preserves_content_and_mode(tmp_path, link_mode):
+    src = tmp_path / "script.sh"
+    src.write_bytes(b"#!/bin/sh\necho hi\n" * 1000)
+    src.chmod(0o755)
+    dest = tmp_path / "copy.sh"
+    dest.write_text("stale")
+
+    method = copy_file(src, dest, link_mode)
+
+    assert method in {"reflink", "copy_file_range", "sendfile", "copy"}
+    assert dest.read_bytes() == src.read_bytes()
+    assert os.stat(dest).st_mode & 0o777 == 0o755
+    assert not os.path.samefile(src, dest)
+
+
+def test_copy_file_hardlink_and_symlink(tmp_path):
+    src = tmp_path / "data.bin"
+    src.write_bytes(b"\x00\x01")
+    link = tmp_path / "link"
+    link.symlink_to("data.bin")
+
+    assert copy_file(src, tmp_path / "hard.bin", "hardlink") == "hardlink"
+    assert os.path.samefile(src, tmp_path / "hard.bin")
+    assert copy_file(link, tmp_path / "link2") == "symlink"
+    assert os.readlink(tmp_path / "link2") == "data.bin"
+    with pytest.raises(ValueError):
+        copy_file(src, tmp_path / "x", "teleport")
+
+
+def test_mirror_reproduces_whole_tree(tmp_path):
+    src = tmp_path / "project"
+    pkg = src / "geom"
+    pkg.mkdir(parents=True)
+    (pkg / "__pycache__").mkdir()
+    (pkg / "__pycache__" / "shapes.cpython-312.pyc").write_bytes(b"stale")
+    (src / "empty").mkdir()
+    (src / "pyproject.toml").write_text('[project]\nname = "geom"\n')
+    (pkg / "data.json").write_text('{"radius": 2}')
+    (pkg / "shapes.py").write_text("class Circle:\n    def area(self):\n        return 3\n")
+    (pkg / "shapes.pyi").write_text("class Circle:\n    def area(self) -> int: ...\n")
+    out = tmp_path / "out"
+    mutator = Mutator(seed=1)
+
+    mutate_directory(src, out, mutator=mutator, mirror=True)
+
+    assert (out / "pyproject.toml").read_text() == '[project]\nname = "geom"\n'
+    assert (out / "geom" / "data.json").read_text() == '{"radius": 2}'
+    assert (out / "empty").is_dir()
+    assert not (out / "geom" / "__pycache__").exists()
+    stub = (out / "geom" / "shapes.pyi").read_text()
+    assert "Circle" not in stub
+    assert f"class {mutator.mapping['Circle']}:" in stub
+    assert f"def {mutator.mapping['area']}(self)" in stub
+    assert mutator.mapping["Circle"] in (out / "geom" / "shapes.py").read_text()
+
+
+def test_without_mirror_only_python_is_written(tmp_path):
+    src = tmp_path / "project"
+    src.mkdir()
+    (src / "mod.py").write_text("x = 1\n")
+    (src / "notes.txt").write_text("hi")
+
+    mutate_directory(src, tmp_path / "out", seed=1)
+
+    assert sorted(p.name for p in (tmp_path / "out").iterdir()) == ["mod.py"]
+
+
+def test_mirror_recreates_directory_symlinks(tmp_path):
+    src = tmp_path / "project"
+    (src / "assets").mkdir(parents=True)
+    (src / "assets" / "logo.txt").write_text("logo")
+    (src / "static").symlink_to("assets")
+    (src / "mod.py").write_text("x = 1\n")
+    out = tmp_path / "out"
+    (out / "static").mkdir(parents=True)
+
+    mutate_directory(src, out, seed=1, mirror=True)
+
+    assert (out / "static").is_symlink()
+    assert os.readlink(out / "static") == "assets"
+    assert (out / "static" / "logo.txt").read_text() == "logo"
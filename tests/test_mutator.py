@@ -1,6 +1,8 @@
+import libcst as cst
 import pytest
 
 from symbol_mutator import Mutator, mutate_directory
+from symbol_mutator.core import SymbolRenamer
 
 # --- Fixtures ---
 
@@ -332,3 +334,321 @@ class Processor:
 
     # 5. Whitespace perturbation (heuristic check)
     assert mutated != code
+
+
+def test_pipelined_directory_mutation_matches_sequential(tmp_path):
+    input_dir = tmp_path / "input"
+    for i in range(12):
+        sub = input_dir / f"pkg{i % 3}" / "nested"
+        sub.mkdir(parents=True, exist_ok=True)
+        (sub / f"mod{i}.py").write_text(
+            f"class Thing{i}:\n    def run(self, value):\n        total = value + {i}\n"
+            f"        return total\n\ndef helper{i}(x):\n    return Thing{i}().run(x)\n"
+        )
+
+    mutate_directory(input_dir, tmp_path / "sequential", seed=7, intensity=5)
+    mutate_directory(
+        input_dir, tmp_path / "pipelined", seed=7, intensity=5, pipeline=True, prefetch=2
+    )
+
+    for src in input_dir.rglob("*.py"):
+        rel = src.relative_to(input_dir)
+        assert (tmp_path / "pipelined" / rel).read_text() == (
+            tmp_path / "sequential" / rel
+        ).read_text()
+
+
+def test_pipelined_directory_mutation_surfaces_read_errors(tmp_path):
+    input_dir = tmp_path / "input"
+    input_dir.mkdir()
+    (input_dir / "ok.py").write_text("x = 1\n")
+    (input_dir / "bad.py").write_bytes(b"\xff\xfe not utf-8")
+
+    with pytest.raises(UnicodeDecodeError):
+        mutate_directory(input_dir, tmp_path / "out", seed=1, pipeline=True)
+
+
+def test_string_annotations_and_typing_strings_are_renamed():
+    code = """
+from typing import TypeVar, cast
+
+__all__ = ["Node", "make"]
+__all__ += ("Tree",)
+
+T = TypeVar("T", bound="Node")
+U = TypeVar("U", "Node", "Tree")
+
+class Node:
+    parent: "Node | None" = None
+
+    def children(self) -> list["Node"]:
+        return [cast("Node", self)]
+
+class Tree:
+    def walk(self, nodes: "list[Node]") -> "dict[str, Tree]":
+        return {}
+
+def make() -> "Tree":
+    return Tree()
+"""
+    mutator = Mutator(seed=42)
+    mutated = mutator.mutate_source(code)
+    node, tree, make = (mutator.mapping[n] for n in ("Node", "Tree", "make"))
+
+    assert "Node" not in mutated
+    assert "Tree" not in mutated
+    assert f'__all__ = ["{node}", "{make}"]' in mutated
+    assert f'__all__ += ("{tree}",)' in mutated
+    assert f'TypeVar("T", bound="{node}")' in mutated
+    assert f'TypeVar("U", "{node}", "{tree}")' in mutated
+    assert f'parent: "{node} | None"' in mutated
+    assert f'list["{node}"]' in mutated
+    assert f'cast("{node}", self)' in mutated
+    assert f'"list[{node}]"' in mutated
+    assert f'"dict[str, {tree}]"' in mutated
+
+
+def test_literal_values_and_annotated_metadata_are_not_renamed():
+    code = """
+import typing
+from typing import Annotated, Literal
+
+def fast():
+    pass
+
+Mode = Literal["fast", "slow"]
+
+def run(mode: Literal["fast", "slow"] = "fast", other: "Literal['fast']" = "fast") -> None:
+    pass
+
+def tag(x: Annotated["fast", "fast"], y: typing.Literal["fast"], z: Annotated[Literal["fast"], 1]):
+    pass
+"""
+    mutator = Mutator(seed=42)
+    mutated = mutator.mutate_source(code)
+    fast = mutator.mapping["fast"]
+
+    assert f"def {fast}():" in mutated
+    assert 'mode: Literal["fast", "slow"] = "fast"' in mutated
+    assert "other: \"Literal['fast']\" = \"fast\"" in mutated
+    assert f'x: Annotated["{fast}", "fast"]' in mutated
+    assert 'y: typing.Literal["fast"]' in mutated
+    assert 'z: Annotated[Literal["fast"], 1]' in mutated
+
+
+@pytest.mark.parametrize("cast_first", [False, True])
+def test_string_types_rename_the_same_in_any_order(cast_first):
+    annotated = "x: \"list['Node']\" = []\n"
+    cast = "y = cast(\"list['Node']\", x)\nz = cast(\"Literal['Node']\", x)\n"
+    body = cast + annotated if cast_first else annotated + cast
+    code = "from typing import Literal, cast\n\nclass Node:\n    pass\n\n" + body
+    mutator = Mutator(seed=42)
+    mutated = mutator.mutate_source(code)
+    node = mutator.mapping["Node"]
+
+    assert f"x: \"list['{node}']\" = []" in mutated
+    assert f"y = cast(\"list['{node}']\", x)" in mutated
+    assert "z = cast(\"Literal['Node']\", x)" in mutated
+
+
+def test_string_annotation_parses_are_cached():
+    from symbol_mutator.core import _parse_string_expression
+
+    _parse_string_expression.cache_clear()
+    code = "class Node:\n    pass\n\n" + "".join(
+        f'def f{i}(a: "Node", b: "list[Node]") -> "Node":\n    pass\n\n' for i in range(50)
+    )
+
+    Mutator(seed=1).mutate_source(code)
+
+    info = _parse_string_expression.cache_info()
+    assert info.misses == 2
+
+
+def test_cli_help_does_not_import_libcst():
+    import subprocess
+    import sys
+
+    probe = (
+        "import sys\n"
+        "from symbol_mutator.cli import main\n"
+        "for argv in (['--help'], ['check', '--help'], ['--bogus']):\n"
+        "    try:\n"
+        "        main(argv)\n"
+        "    except SystemExit:\n"
+        "        pass\n"
+        "print('libcst' in sys.modules)\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", probe], capture_output=True, text=True, check=True
+    )
+
+    assert result.stdout.strip().splitlines()[-1] == "False"
+
+
+def test_vocabularies_are_shared_constants():
+    from symbol_mutator.core import NameGenerator
+    from symbol_mutator.themes import FANTASY_PREFIXES
+
+    assert isinstance(FANTASY_PREFIXES, tuple)
+    assert NameGenerator(1, "fantasy").style.prefixes is FANTASY_PREFIXES
+
+
+LADDER_CODE = '''
+"""Shapes."""
+__version__ = "1.0"
+
+import json
+
+class Shape:
+    # Base class
+    def __init__(self, name, sides):
+        self.name = name
+        self.sides = sides
+
+    def describe(self, verbose):
+        label = json.dumps(self.name)
+        count = self.sides
+        if verbose:
+            return label
+        else:
+            return count
+
+def make_shape(kind):
+    return Shape(kind, 3)
+'''
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [{"seed": 42}, {"seed": 7, "theme": "fantasy", "strip_comments": True}],
+)
+def test_mutate_ladder_matches_standalone_runs(kwargs):
+    ladder = Mutator.mutate_ladder(LADDER_CODE, intensities=[5, 1, 2, 3, 4], **kwargs)
+
+    assert sorted(ladder) == [1, 2, 3, 4, 5]
+    for intensity, code in ladder.items():
+        assert code == Mutator(intensity=intensity, **kwargs).mutate_source(LADDER_CODE)
+    assert Mutator.mutate_ladder(LADDER_CODE, [5], **kwargs) == {5: ladder[5]}
+
+
+SEGMENTED_CODE = "".join(
+    f"""
+import os as os_{i}
+
+# Section {i}
+@staticmethod
+def helper_{i}(value):
+    total = value + {i}
+    return os_{i}.path.join(str(total))
+x_{i} = 1
+y_{i} = 2
+if x_{i}:
+    z_{i} = "{i}"
+else:
+    z_{i} = None
+"doc {i}"
+class Node{i}:
+    def visit(self, other):
+        return helper_{i}(other)
+"""
+    for i in range(12)
+)
+
+
+def test_split_segments_cuts_only_at_safe_boundaries():
+    from symbol_mutator.core import split_segments
+
+    segments, config = split_segments(SEGMENTED_CODE, threshold=400)
+
+    assert len(segments) > 3
+    assert "".join(segments) == SEGMENTED_CODE
+    assert config.default_indent == "    "
+    for segment in segments[1:]:
+        first = segment.lstrip("\n").split("\n", 1)[0]
+        # Never between two simple lines, before a bare string, or inside a statement
+        assert first.startswith(("import ", "@staticmethod", "x_", "if ", "class ")), first
+
+
+@pytest.mark.parametrize("intensity", [1, 2, 4, 5])
+def test_segmented_files_mutate_like_whole_files(intensity):
+    whole = Mutator(seed=9, intensity=intensity, segment_threshold=None)
+    segmented = Mutator(seed=9, intensity=intensity, segment_threshold=400)
+
+    assert segmented.mutate_source(SEGMENTED_CODE) == whole.mutate_source(SEGMENTED_CODE)
+    assert segmented.mapping == whole.mapping
+
+
+UNTOUCHED_CODE = """import json as codec
+from .shapes import Circle
+
+TABLE = {"a": 1, "b": 2}
+LIMIT = 10
+NAMES = ["a", "b"]
+DEBUG = False
+TIMEOUT = 30.0
+RETRIES = 3
+
+
+def load(path):
+    return codec.loads(path)
+
+
+class Config:
+    def get(self, key):
+        return TABLE[key]
+
+
+def build(radius: "Circle") -> Circle:
+    return Circle(radius).scale(codec.dumps(TABLE))
+"""
+
+
+@pytest.mark.parametrize("intensity", [1, 2, 4, 5])
+def test_renaming_skips_statements_without_mapped_names(intensity, monkeypatch):
+    mutator = Mutator(seed=4, intensity=intensity)
+    mutator.collect_definitions(
+        "class Circle:\n    def scale(self, factor):\n        return factor\n"
+    )
+    tree = mutator.prepare(cst.parse_module(UNTOUCHED_CODE))
+    expected = mutator.render(tree, mutator.whitespace_rng("a.py"))
+
+    visited = []
+    real_visit = cst.CSTNode.visit
+
+    def visit(node, visitor):
+        if isinstance(visitor, SymbolRenamer) and not isinstance(node, cst.Module):
+            visited.append(type(node).__name__)
+        return real_visit(node, visitor)
+
+    monkeypatch.setattr(cst.CSTNode, "visit", visit)
+    mutated = mutator.transform_code(UNTOUCHED_CODE, rng=mutator.whitespace_rng("a.py"))
+
+    assert mutated == expected
+    if intensity < 5:
+        assert "def load(" in mutated and "TABLE[key]" in mutated
+        # Statement level: the imports and `build`, not TABLE, load or Config
+        assert visited and "Dict" not in visited and "ClassDef" not in visited
+
+
+def test_replaced_mapping_of_the_same_size_is_not_served_stale():
+    mutator = Mutator(seed=4)
+    # Few enough mapped words that statements without one are skipped
+    code = "def alpha():\n    pass\n\ndef beta():\n    pass\n" + "x = 1\n" * 10
+    for name in ("alpha", "beta"):
+        # A fresh dict of the same size may reuse the id() of the one it replaces
+        mutator.mapping = {}
+        mutator.mapping = {name: "f_000001"}
+        mutated = mutator.transform_code(code, rng=mutator.whitespace_rng("a.py"))
+        assert f"def {name}(" not in mutated
+
+
+def test_unrelated_source_is_returned_without_parsing(monkeypatch):
+    mutator = Mutator(seed=4)
+    mutator.collect_definitions("def area(radius):\n    return radius\n")
+
+    def fail(*args, **kwargs):
+        raise AssertionError("parsed")
+
+    monkeypatch.setattr(cst, "parse_module", fail)
+    assert mutator.transform_code(UNTOUCHED_CODE) is UNTOUCHED_CODE
@@ -0,0 +1,44 @@
+import math
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from symbol_mutator import Mutator  # noqa: E402
+from symbol_mutator.perplexity import NGramModel, surprise_ratio, tokenize_code  # noqa: E402
+
+CORPUS = [
+    "def add(a, b):\n    return a + b\n",
+    "def sub(a, b):\n    return a - b\n",
+    "class Point:\n    def __init__(self, x, y):\n        self.x = x\n        self.y = y\n",
+]
+
+
+def test_tokenize_code():
+    tokens = tokenize_code("def f(x):  # comment\n    return x\n")
+    assert tokens[:4] == ["def", "f", "(", "x"]
+    assert "<indent>" in tokens and "<nl>" in tokens
+    assert "# comment" not in tokens
+    # Unterminated code falls back to a plain split
+    assert tokenize_code("def f(:\n")[:2] == ["def", "f"]
+
+
+def test_distribution_is_normalized():
+    model = NGramModel(order=3).fit(CORPUS)
+    context = model.encode(tokenize_code("def add(a, b):\n    return a"))[:-1]
+    # p(w | context) over the whole vocabulary sums to one
+    total = sum(
+        math.exp(model.log_probs_of_ids(np.append(context, word_id))[-1])
+        for word_id in model.vocab.values()
+    )
+    assert total == pytest.approx(1.0)
+
+
+def test_memorized_code_is_less_surprising():
+    model = NGramModel(order=3).fit(CORPUS)
+    original = CORPUS[2]
+    mutated = Mutator(seed=42, intensity=5).mutate_source(original)
+
+    assert model.perplexity(original) < model.perplexity(mutated)
+    assert surprise_ratio(original, mutated, model) > 1.0
+    assert math.isnan(model.perplexity(""))
@@ -0,0 +1,180 @@
+import io
+import json
+import subprocess
+import sys
+import urllib.error
+import urllib.request
+
+from symbol_mutator import Mutator
+from symbol_mutator.service import MutationService, serve_http
+
+SHAPES = "class Circle:\n    def area(self):\n        return 3\n"
+USES = "from shapes import Circle\n\ndef unit():\n    return Circle().area()\n"
+
+
+def _serve(requests, **kwargs):
+    stdin = io.StringIO("".join(json.dumps(r) + "\n" for r in requests) + "not json\n")
+    stdout = io.StringIO()
+    failures = MutationService(**kwargs).serve(stdin, stdout)
+    responses = [json.loads(line) for line in stdout.getvalue().splitlines()]
+    return failures, {r["id"]: r for r in responses}
+
+
+def test_session_shares_mapping_across_requests(tmp_path):
+    (tmp_path / "uses.py").write_text(USES)
+    failures, responses = _serve(
+        [
+            {"id": 1, "op": "collect", "source": SHAPES},
+            {"id": 2, "op": "collect", "path": str(tmp_path / "uses.py")},
+            {"id": 3, "op": "transform", "source": SHAPES},
+            {
+                "id": 4,
+                "op": "transform",
+                "path": str(tmp_path / "uses.py"),
+                "output": str(tmp_path / "out" / "uses.py"),
+            },
+            {"id": 5, "op": "mapping"},
+            {"id": 6, "op": "explode"},
+        ],
+        defaults={"seed": 1},
+        workers=4,
+    )
+
+    expected = Mutator(seed=1)
+    expected.collect_definitions(SHAPES)
+    expected.collect_definitions(USES)
+    assert responses[5]["result"]["mapping"] == expected.mapping
+    assert responses[3]["result"]["source"] == expected.transform_code(SHAPES)
+    assert (tmp_path / "out" / "uses.py").read_text() == expected.transform_code(USES)
+    assert responses[6]["ok"] is False and "explode" in responses[6]["error"]
+    assert responses[None]["error"].startswith("Invalid request")
+    assert failures == 2
+
+
+def test_sessions_are_independent():
+    _, responses = _serve(
+        [
+            {"id": "a", "op": "open", "session": "a", "seed": 1},
+            {"id": "b", "op": "open", "session": "b", "seed": 2},
+            {"id": "ma", "op": "mutate", "session": "a", "source": SHAPES},
+            {"id": "mb", "op": "mutate", "session": "b", "source": SHAPES},
+            {"id": "bad", "op": "open", "session": "c", "colour": "red"},
+        ]
+    )
+
+    assert responses["ma"]["result"]["source"] == Mutator(seed=1).mutate_source(SHAPES)
+    assert responses["mb"]["result"]["source"] == Mutator(seed=2).mutate_source(SHAPES)
+    assert "colour" in responses["bad"]["error"]
+
+
+def test_serve_stdio_cli():
+    request = json.dumps({"id": 1, "op": "mutate", "source": SHAPES})
+    result = subprocess.run(
+        [sys.executable, "-m", "symbol_mutator.cli", "serve", "--stdio", "--seed", "3"],
+        input=request + "\n",
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    response = json.loads(result.stdout)
+    assert response["result"]["source"] == Mutator(seed=3).mutate_source(SHAPES)
+
+
+def test_lru_eviction_snapshots_and_restores_sessions(tmp_path):
+    service = MutationService(defaults={"seed": 5}, max_sessions=1, snapshot_dir=tmp_path)
+    try:
+        for request in [
+            {"op": "collect", "session": "a/b", "source": SHAPES},
+            {"op": "collect", "session": "other", "source": USES},
+            {"op": "collect", "session": "a/b", "source": USES},
+        ]:
+            assert service.submit(request).result()["ok"]
+        mapping = service.submit({"op": "mapping", "session": "a/b"}).result()["result"]
+    finally:
+        service.close()
+
+    expected = Mutator(seed=5)
+    expected.collect_definitions(SHAPES)
+    expected.collect_definitions(USES)
+    assert mapping["mapping"] == expected.mapping
+    assert list(service.sessions) == ["a/b"]
+    assert service.metrics.evictions == 2 and service.metrics.restores == 1
+
+    # A fresh process picks up where the snapshots left off
+    restarted = MutationService(snapshot_dir=tmp_path)
+    restarted.handle({"op": "collect", "session": "other", "source": SHAPES})
+    expected = Mutator(seed=5)
+    expected.collect_definitions(USES)
+    expected.collect_definitions(SHAPES)
+    assert restarted.sessions["other"].mutator.mapping == expected.mapping
+
+    restarted.handle({"op": "close", "session": "other"})
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["a%2Fb.json"]
+
+
+def test_closed_sessions_release_their_chains():
+    service = MutationService(workers=4)
+    try:
+        futures = []
+        for i in range(20):
+            session = f"snippet-{i}"
+            futures.append(service.submit({"op": "mutate", "session": session, "source": SHAPES}))
+            futures.append(service.submit({"op": "close", "session": session}))
+        # Reopened by a request sent after its close, so its chain must stay
+        futures.append(service.submit({"op": "close", "session": "kept"}))
+        futures.append(service.submit({"op": "transform", "session": "kept", "source": SHAPES}))
+        assert all(f.result()["ok"] for f in futures)
+    finally:
+        service.close()
+
+    assert list(service._chains) == ["kept"]
+    assert list(service.sessions) == ["kept"]
+
+
+def test_unmutate_restores_session_names():
+    service = MutationService(defaults={"seed": 2})
+    mutated = service.handle({"op": "mutate", "source": SHAPES})["result"]["source"]
+    answer = f"This is `{mutated.split()[1].rstrip(':')}` from a geometry library."
+
+    restored = service.handle({"op": "unmutate", "source": answer})["result"]["source"]
+    assert restored == "This is `Circle` from a geometry library."
+    service.handle({"op": "collect", "source": USES})
+    assert service.handle({"op": "unmutate", "source": mutated})["result"]["source"] == SHAPES
+
+
+def test_http_server(tmp_path):
+    service = MutationService(defaults={"seed": 3}, workers=2)
+    server = serve_http(service, background=True)
+
+    def post(path, payload):
+        request = urllib.request.Request(
+            server.base_url + path, json.dumps(payload).encode(), method="POST"
+        )
+        try:
+            with urllib.request.urlopen(request) as response:
+                return response.status, json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            return e.code, json.loads(e.read())
+
+    try:
+        status, response = post("/mutate", {"id": 1, "source": SHAPES})
+        assert status == 200 and response["id"] == 1
+        assert response["result"]["source"] == Mutator(seed=3).mutate_source(SHAPES)
+        status, response = post("/", {"op": "unmutate", "source": response["result"]["source"]})
+        assert response["result"]["source"] == SHAPES
+        assert post("/mutate", {"source": "def broken(:\n"})[0] == 400
+        assert post("/collect", {"path": str(tmp_path / "secret.py")})[0] == 403
+
+        with urllib.request.urlopen(server.base_url + "/metrics") as response:
+            metrics = response.read().decode()
+    finally:
+        server.shutdown()
+        server.server_close()
+        service.close()
+
+    assert 'symbol_mutator_requests_total{op="mutate",status="ok"} 1' in metrics
+    assert 'symbol_mutator_requests_total{op="mutate",status="error"} 1' in metrics
+    assert 'symbol_mutator_request_duration_seconds_count{op="unmutate"} 1' in metrics
+    assert 'symbol_mutator_request_duration_seconds_bucket{op="mutate",le="+Inf"} 2' in metrics
+    assert "symbol_mutator_sessions 1" in metrics
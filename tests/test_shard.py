@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+from symbol_mutator import Mutator, mutate_directory
+from symbol_mutator.cli import main
+from symbol_mutator.shard import collect_shard, merge_symbols, shard_files, transform_shard
+
+FILES = {
+    "geom/__init__.py": "from .shapes import Circle\n",
+    "geom/shapes.py": (
+        "class Circle:\n    def __init__(self, radius):\n        self.radius = radius\n\n"
+        "    def area(self):\n        total = 3 * self.radius\n        return total\n"
+    ),
+    "geom/util/helpers.py": "def unit():\n    value = 1\n    return value\n",
+    "geom-extra.py": "def area_of(shape):\n    return shape.area()\n",
+    "main.py": "from geom import Circle\n\ndef run(radius):\n    return Circle(radius).area()\n",
+}
+
+
+@pytest.fixture
+def files():
+    return FILES
+
+
+@pytest.mark.parametrize("intensity", [1, 5])
+def test_sharded_run_matches_single_node(tree, tmp_path, intensity, read_tree):
+    single = Mutator(seed=7, intensity=intensity)
+    mutate_directory(tree, tmp_path / "single", mutator=single)
+
+    settings = Mutator(seed=7, intensity=intensity)
+    symbols = [collect_shard(tree, settings, shard, 3) for shard in range(3)]
+    merged = merge_symbols(symbols)
+    for shard in range(3):
+        transform_shard(tree, tmp_path / "sharded", merged, shard, 3)
+
+    assert merged.mapping == single.mapping
+    assert merged.whitespace_seed == single.whitespace_seed
+    assert read_tree(tmp_path / "sharded") == read_tree(tmp_path / "single")
+    assert sum(len(shard_files(tree, s, 3)) for s in range(3)) == len(FILES)
+
+
+def test_merge_rejects_mismatched_settings(tree):
+    a = collect_shard(tree, Mutator(seed=1), 0, 2)
+    b = collect_shard(tree, Mutator(seed=2), 1, 2)
+
+    with pytest.raises(ValueError, match="different mutator settings"):
+        merge_symbols([a, b])
+    with pytest.raises(ValueError, match="more than one"):
+        merge_symbols([a, a])
+
+
+def test_sharded_cli(tree, tmp_path, read_tree):
+    for shard in ("0/2", "1/2"):
+        args = ["--target", str(tree), "--shard", shard, "--seed", "3"]
+        assert main(["collect", *args, "--output", str(tmp_path / f"{shard[0]}.json")]) == 0
+    mapping = tmp_path / "mapping.json"
+    assert (
+        main(
+            ["merge", str(tmp_path / "0.json"), str(tmp_path / "1.json"), "--output", str(mapping)]
+        )
+        == 0
+    )
+    for shard in ("0/2", "1/2"):
+        args = ["--target", str(tree), "--output", str(tmp_path / "out"), "--shard", shard]
+        assert main(["transform", *args, "--mapping", str(mapping)]) == 0
+
+    single = Mutator(seed=3)
+    mutate_directory(tree, tmp_path / "single", mutator=single)
+    assert json.loads(mapping.read_text())["mapping"] == single.mapping
+    assert read_tree(tmp_path / "out") == read_tree(tmp_path / "single")
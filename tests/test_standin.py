@@ -0,0 +1,150 @@
+import asyncio
+import json
+import urllib.error
+import urllib.request
+
+import pytest
+
+from symbol_mutator.standin import StandinConfig, parse_latency, start_server
+
+
+def _post(url, payload):
+    request = urllib.request.Request(
+        url, data=json.dumps(payload).encode(), headers={"Content-Type": "application/json"}
+    )
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())
+
+
+@pytest.fixture
+def server():
+    server = start_server(StandinConfig(answers=['{"library": "flask"}']))
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_parse_latency():
+    import random
+
+    rng = random.Random(0)
+    assert parse_latency("0.25")(rng) == 0.25
+    assert 0.1 <= parse_latency("uniform:0.1:0.2")(rng) <= 0.2
+    assert parse_latency("lognormal:0.3:0.5")(rng) > 0
+    with pytest.raises(ValueError):
+        parse_latency("gamma:1")
+
+
+def test_wire_formats(server):
+    chat = _post(
+        f"{server.base_url}/v1/chat/completions",
+        {"model": "gpt-4o", "messages": [{"role": "user", "content": "hi"}]},
+    )
+    assert chat["object"] == "chat.completion"
+    assert chat["choices"][0]["message"]["content"] == '{"library": "flask"}'
+
+    message = _post(
+        f"{server.base_url}/v1/messages",
+        {"model": "claude", "max_tokens": 10, "messages": [{"role": "user", "content": "hi"}]},
+    )
+    assert message["type"] == "message"
+    assert message["content"][0]["text"] == '{"library": "flask"}'
+    assert server.stats["ok"] == 2
+
+
+def test_injected_rate_limits():
+    server = start_server(StandinConfig(rate_limit_rate=1.0, retry_after=3))
+    try:
+        with pytest.raises(urllib.error.HTTPError) as excinfo:
+            _post(f"{server.base_url}/v1/messages", {"messages": []})
+        assert excinfo.value.code == 429
+        assert excinfo.value.headers["Retry-After"] == "3"
+        assert json.loads(excinfo.value.read())["error"]["type"] == "rate_limit_error"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_benchmark_against_standin(server, tmp_path, monkeypatch):
+    pytest.importorskip("openai")
+    from symbol_mutator.benchmark import run_benchmark
+
+    monkeypatch.setenv("OPENAI_API_KEY", "standin")
+    target = tmp_path / "flask_snippet.py"
+    target.write_text("class Flask:\n    pass\n")
+
+    results = asyncio.run(
+        run_benchmark(
+            [target],
+            ["openai"],
+            [1, 2],
+            provider_kwargs={"base_url": f"{server.base_url}/v1"},
+        )
+    )
+
+    assert len(results) == 2
+    assert all(r["identified"] for r in results)
+    assert all(r["latency"] >= 0 for r in results)
+
+
+def test_openai_batch_roundtrip(server, tmp_path):
+    pytest.importorskip("openai")
+    from symbol_mutator.llm import OpenAIProvider
+
+    provider = OpenAIProvider(api_key="standin", base_url=f"{server.base_url}/v1")
+    prompts = {f"req-{i}": f"prompt {i}" for i in range(5)}
+    input_path = tmp_path / "batch.jsonl"
+
+    answers = provider.ask_batch(prompts, json_mode=True, input_path=input_path, poll_interval=0.01)
+
+    assert answers == {cid: '{"library": "flask"}' for cid in prompts}
+    lines = [json.loads(line) for line in input_path.read_text().splitlines()]
+    assert [line["custom_id"] for line in lines] == list(prompts)
+    assert lines[0]["body"]["response_format"] == {"type": "json_object"}
+    # Batched items count as requests, like online ones
+    assert server.stats["requests"] == server.stats["ok"] == 5
+
+
+def test_anthropic_batch_drops_errored_requests():
+    pytest.importorskip("anthropic")
+    from symbol_mutator.llm import AnthropicProvider
+
+    server = start_server(StandinConfig(error_rate=1.0))
+    try:
+        provider = AnthropicProvider(api_key="standin", base_url=server.base_url)
+        answers = provider.ask_batch({"req-0": "a", "req-1": "b"}, poll_interval=0.01)
+        assert answers == {}
+        assert server.stats["requests"] == server.stats["errors"] == 2
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_batch_benchmark_joins_cells(server, tmp_path):
+    pytest.importorskip("openai")
+    from symbol_mutator.benchmark import run_batch_benchmark
+
+    target = tmp_path / "flask_snippet.py"
+    target.write_text("class Flask:\n    pass\n")
+
+    results = asyncio.run(
+        run_batch_benchmark(
+            [target],
+            ["openai"],
+            [1, 5],
+            num_seeds=2,
+            provider_kwargs={"base_url": f"{server.base_url}/v1", "api_key": "standin"},
+            batch_dir=tmp_path,
+            poll_interval=0.01,
+        )
+    )
+
+    assert sorted((r["intensity"], r["seed"]) for r in results) == [
+        (1, 42),
+        (1, 43),
+        (5, 42),
+        (5, 43),
+    ]
+    assert all(r["identified"] for r in results)
+    assert (tmp_path / "openai_batch_input.jsonl").exists()
+    assert server.stats["batches"] == 1
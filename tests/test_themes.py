@@ -0,0 +1,103 @@
+import importlib.metadata
+
+import pytest
+
+from symbol_mutator import Mutator, themes
+from symbol_mutator.cli import main
+from symbol_mutator.core import NameGenerator
+from symbol_mutator.themes import Theme, available_themes, get_theme, register_theme
+
+NAMES = [f"{'Node' if i % 3 == 0 else 'node'}_{i}" for i in range(3000)]
+KINDS = [("class", "function", "variable")[i % 3] for i in range(3000)]
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """Lets a test register themes without leaking them into other tests."""
+    monkeypatch.setattr(themes, "_themes", dict(themes._themes))
+    monkeypatch.setattr(themes, "_entry_points_loaded", False)
+
+
+@pytest.mark.parametrize("theme", ["gibberish", "fantasy", "multilingual"])
+def test_batch_generation_matches_one_at_a_time(theme):
+    one, batch = NameGenerator(7, theme), NameGenerator(7, theme)
+
+    expected = [one.generate(name, kind) for name, kind in zip(NAMES, KINDS, strict=True)]
+    names = batch.generate_batch(NAMES[:1000], KINDS[:1000])
+    names += batch.generate_batch(NAMES[1000:], KINDS[1000:])
+
+    assert names == expected
+    assert batch.rng.getstate() == one.rng.getstate()
+    assert batch.generated == one.generated == set(expected)
+
+
+def test_gibberish_batch_retries_collisions_like_generate():
+    one, batch = NameGenerator(3), NameGenerator(3)
+    # Occupy the first names the seed would give, so every early draw collides
+    taken = {one.generate(name, "variable") for name in NAMES[:50]}
+    one, batch = NameGenerator(3), NameGenerator(3)
+    one.generated.update(taken)
+    batch.generated.update(taken)
+
+    expected = [one.generate(name, "variable") for name in NAMES[:100]]
+    assert batch.generate_batch(NAMES[:100], ["variable"] * 100) == expected
+    assert batch.rng.getstate() == one.rng.getstate()
+
+
+def test_vocabulary_themes_keep_going_once_exhausted():
+    generator = NameGenerator(1, "multilingual")
+    names = generator.generate_batch(NAMES, KINDS)
+
+    assert len(set(names)) == len(NAMES)
+    assert all(name.isidentifier() for name in names)
+    assert generator.style.size < len(NAMES)
+
+
+def test_fantasy_names_every_kind():
+    generator = NameGenerator(1, "fantasy")
+    assert generator.generate("Widget", "class")[0].isupper()
+    assert generator.generate("widget", "variable").islower()
+
+
+def test_register_theme_in_code(registry):
+    @register_theme
+    class MatrixTheme(Theme):
+        name = "matrix"
+
+        def candidate(self, rng, original, kind):
+            return "neo_" + "".join(rng.choice("01") for _ in range(12))
+
+    assert "matrix" in available_themes()
+    mutator = Mutator(seed=5, theme="matrix")
+    code = mutator.mutate_source("def area(radius):\n    return radius\n")
+
+    assert mutator.mapping["area"].startswith("neo_")
+    assert mutator.mapping["area"] in code
+
+
+def test_themes_load_from_entry_points(registry, monkeypatch):
+    entry_point = importlib.metadata.EntryPoint(
+        "fancy", "symbol_mutator.themes:FantasyTheme", themes.ENTRY_POINT_GROUP
+    )
+    monkeypatch.setattr(
+        importlib.metadata,
+        "entry_points",
+        lambda group: [entry_point] if group == themes.ENTRY_POINT_GROUP else [],
+    )
+
+    assert isinstance(get_theme("fancy"), themes.FantasyTheme)
+    assert NameGenerator(2, "fancy").generate("Widget", "class") == NameGenerator(
+        2, "fantasy"
+    ).generate("Widget", "class")
+
+
+def test_unknown_theme_is_rejected(registry, monkeypatch, tmp_path, capsys):
+    monkeypatch.setattr(importlib.metadata, "entry_points", lambda group: [])
+    with pytest.raises(ValueError, match="Unknown theme 'matrix'"):
+        Mutator(seed=1, theme="matrix")
+
+    (tmp_path / "a.py").write_text("x = 1\n")
+    args = ["--target", str(tmp_path / "a.py"), "--output", str(tmp_path / "b.py")]
+    with pytest.raises(SystemExit):
+        main([*args, "--theme", "matrix"])
+    assert "Unknown theme" in capsys.readouterr().err
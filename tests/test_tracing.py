@@ -0,0 +1,101 @@
+import asyncio
+import json
+
+import pytest
+
+from symbol_mutator import Mutator, mutate_directory
+from symbol_mutator.cli import main
+from symbol_mutator.tracing import active_tracer, span, tracing
+
+CODE = "def area(radius):\n    # circle\n    if radius:\n        return 3 * radius\n    return 0\n"
+
+
+def test_spans_are_free_when_tracing_is_off():
+    assert active_tracer() is None
+    assert span("a") is span("b", "io", path="x")
+    with span("a") as s:
+        s.set(size=1)
+
+
+def test_transform_records_parse_passes_and_codegen(tmp_path):
+    with tracing(tmp_path / "trace.json") as tracer:
+        Mutator(seed=1, intensity=4).mutate_source(CODE)
+
+    names = [s.name for s in tracer.spans]
+    for name in ("parse", "SymbolCollector", "CommentStripper", "IfElseInverter"):
+        assert name in names
+    assert names.count("codegen") == 1
+    assert active_tracer() is None
+
+    events = json.loads((tmp_path / "trace.json").read_text())["traceEvents"]
+    complete = [e for e in events if e["ph"] == "X"]
+    assert len(complete) == len(tracer.spans)
+    assert all(e["dur"] >= 0 and e["ts"] >= 0 for e in complete)
+    assert {e["cat"] for e in complete} >= {"parse", "pass", "codegen"}
+
+
+@pytest.mark.parametrize("pipeline", [False, True])
+def test_directory_run_traces_files_and_io(tmp_path, pipeline):
+    src = tmp_path / "src"
+    src.mkdir()
+    (src / "a.py").write_text(CODE)
+    (src / "b.py").write_text("from a import area\n\nprint(area(2))\n")
+
+    with tracing() as tracer:
+        mutate_directory(src, tmp_path / "out", seed=1, pipeline=pipeline)
+
+    by_name: dict = {}
+    for s in tracer.spans:
+        by_name.setdefault(s.name, []).append(s)
+    assert [s.attributes["path"] for s in by_name["transform"]] == ["a.py", "b.py"]
+    assert len(by_name["read"]) == 4 and len(by_name["write"]) == 2
+    (root,) = by_name["mutate_directory"]
+    assert all(s.parent == root.id for s in by_name["collect"])
+    if pipeline:
+        assert "wait.reader" in by_name
+        assert {s.track[0] for s in by_name["write"]} != {root.track[0]}
+
+
+def test_otlp_export_links_parents_and_marks_errors(tmp_path):
+    with tracing(tmp_path / "trace.otlp.json", format="otlp"):
+        with span("outer", count=2, ratio=0.5, ok=True):
+            with pytest.raises(ValueError), span("inner"):
+                raise ValueError("boom")
+
+    document = json.loads((tmp_path / "trace.otlp.json").read_text())
+    outer, inner = document["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert inner["parentSpanId"] == outer["spanId"] and "parentSpanId" not in outer
+    assert inner["traceId"] == outer["traceId"] and len(outer["traceId"]) == 32
+    assert inner["status"] == {"code": 2, "message": "ValueError: boom"}
+    assert int(outer["endTimeUnixNano"]) >= int(inner["endTimeUnixNano"])
+    values = {a["key"]: a["value"] for a in outer["attributes"]}
+    assert values["count"] == {"intValue": "2"} and values["ok"] == {"boolValue": True}
+
+
+def test_concurrent_tasks_get_their_own_tracks():
+    async def call(name):
+        with span("llm", "llm", provider=name):
+            await asyncio.sleep(0.01)
+
+    async def run():
+        await asyncio.gather(call("a"), call("b"))
+
+    with tracing() as tracer:
+        asyncio.run(run())
+
+    events = [e for e in tracer.to_chrome()["traceEvents"] if e["ph"] == "X"]
+    assert len({e["tid"] for e in events}) == 2
+    assert all(s.parent is None for s in tracer.spans)
+
+
+def test_cli_writes_trace(tmp_path):
+    (tmp_path / "lib").mkdir()
+    (tmp_path / "lib" / "a.py").write_text(CODE)
+    trace = tmp_path / "trace.json"
+    args = ["--target", str(tmp_path / "lib"), "--output", str(tmp_path / "out")]
+
+    assert main([*args, "--trace", str(trace)]) == 0
+    assert any(e["name"] == "transform" for e in json.loads(trace.read_text())["traceEvents"])
+    with pytest.raises(ValueError):
+        with tracing(format="jaeger"):
+            pass
@@ -0,0 +1,86 @@
+import json
+
+import pytest
+
+from symbol_mutator import Mutator
+from symbol_mutator.cli import main
+from symbol_mutator.unmutate import Unmutator, invert_mapping, unmutate
+
+CODE = """from typing import TypeVar
+
+class Circle:
+    def __init__(self, radius):
+        self.radius = radius
+
+    def area(self) -> "Circle":
+        return 3 * self.radius
+
+T = TypeVar("T", bound="Circle")
+__all__ = ["Circle"]
+"""
+
+
+@pytest.mark.parametrize("intensity", [1, 3])
+def test_unmutate_restores_source(intensity):
+    mutator = Mutator(seed=5, intensity=intensity)
+    mutated = mutator.mutate_source(CODE)
+    assert "Circle" not in mutated
+
+    assert unmutate(mutated, mutator.mapping) == CODE
+
+
+def test_unmutate_restores_all_names_at_intensity_5():
+    mutator = Mutator(seed=5, intensity=5)
+
+    restored = unmutate(mutator.mutate_source(CODE), mutator.mapping)
+
+    assert "radius" in mutator.mapping
+    assert set(mutator.mapping.values()).isdisjoint(restored.split())
+    assert "Circle" in restored and "self.radius = radius" in " ".join(restored.split())
+
+
+def test_unmutate_free_text_multilingual():
+    mapping = {"Circle": "ядро_объект", "area": "معالج_вход", "data": "f_1a2b3c"}
+    answer = (
+        "The class ядро_объект (see `ядро_объект.معالج_вход()`) wraps f_1a2b3c; f_1a2b3cx stays."
+    )
+
+    assert Unmutator(mapping).unmutate(answer) == (
+        "The class Circle (see `Circle.area()`) wraps data; f_1a2b3cx stays."
+    )
+
+
+def test_unmutate_matches_decomposed_forms():
+    mapping = {"main": "главный_тип"}
+    decomposed = "главный_тип".replace("й", "и\u0306")
+
+    assert unmutate(f"call {decomposed}()", mapping) == "call main()"
+
+
+def test_invert_mapping_rejects_collisions():
+    with pytest.raises(ValueError):
+        invert_mapping({"a": "x", "b": "x"})
+
+
+def test_unmutate_json_lines_and_cli(tmp_path, capsys, monkeypatch):
+    mapping = {"Circle": "ядро_объект"}
+    responses = tmp_path / "responses"
+    responses.mkdir()
+    (responses / "out.jsonl").write_text(
+        json.dumps({"answer": "ядро_объект"}) + "\n" + json.dumps({"answer": "numpy"}) + "\n"
+    )
+    (responses / "notes.md").write_text("`ядро_объект()`\n")
+    (responses / "blob.bin").write_bytes(b"\xff\xfe")
+    mapping_file = tmp_path / "mapping.json"
+    mapping_file.write_text(json.dumps({"mapping": mapping}, ensure_ascii=True))
+
+    assert main(["unmutate", "--mapping", str(mapping_file), "--target", str(responses)]) == 0
+
+    lines = (responses / "out.jsonl").read_text().splitlines()
+    assert lines == ['{"answer": "Circle"}', json.dumps({"answer": "numpy"})]
+    assert (responses / "notes.md").read_text() == "`Circle()`\n"
+    assert "Restored 2 files" in capsys.readouterr().out
+
+    monkeypatch.setattr("sys.stdin", __import__("io").StringIO("ядро_объект!"))
+    assert main(["unmutate", "--mapping", str(mapping_file)]) == 0
+    assert capsys.readouterr().out == "Circle!"
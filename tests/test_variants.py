@@ -0,0 +1,55 @@
+import pytest
+
+from symbol_mutator import Mutator, mutate_directory
+from symbol_mutator.variants import mutate_directory_many, mutate_many
+
+CODE = '''
+"""Geometry."""
+__version__ = "1.0"
+
+class Circle:
+    def __init__(self, radius):
+        self.radius = radius  # stored as is
+
+    def area(self, scale):
+        value = 3 * self.radius
+        if scale:
+            return value * scale
+        else:
+            return value
+'''
+
+
+@pytest.mark.parametrize("intensity", [1, 5])
+def test_mutate_many_matches_standalone(intensity):
+    seeds = [1, 2, 3, 2]
+
+    variants = mutate_many(CODE, seeds, workers=1, intensity=intensity)
+
+    assert list(variants) == [1, 2, 3]
+    for seed, code in variants.items():
+        assert code == Mutator(seed=seed, intensity=intensity).mutate_source(CODE)
+    assert len(set(variants.values())) == 3
+
+
+def test_mutate_many_in_process_pool():
+    variants = mutate_many(CODE, range(6), workers=2, theme="fantasy")
+
+    assert variants == {s: Mutator(seed=s, theme="fantasy").mutate_source(CODE) for s in range(6)}
+
+
+def test_mutate_directory_many_matches_mutate_directory(tmp_path):
+    src = tmp_path / "src"
+    (src / "pkg").mkdir(parents=True)
+    (src / "pkg" / "shapes.py").write_text(CODE)
+    (src / "main.py").write_text(
+        "from pkg.shapes import Circle\n\ndef run():\n    return Circle(1)\n"
+    )
+
+    outputs = mutate_directory_many(src, tmp_path / "variants", [4, 9], workers=2, intensity=5)
+
+    assert outputs == {4: tmp_path / "variants" / "4", 9: tmp_path / "variants" / "9"}
+    for seed, out in outputs.items():
+        mutate_directory(src, tmp_path / f"single_{seed}", seed=seed, intensity=5)
+        for name in ("main.py", "pkg/shapes.py"):
+            assert (out / name).read_text() == (tmp_path / f"single_{seed}" / name).read_text()
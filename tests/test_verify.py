@@ -0,0 +1,76 @@
+from symbol_mutator import Mutator
+from symbol_mutator.cli import main
+from symbol_mutator.verify import PASSED, shard_files, verify_package
+
+
+def _make_project(root, extra_test=""):
+    package = root / "geom"
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    (package / "shapes.py").write_text(
+        "class Circle:\n"
+        "    def __init__(self, radius):\n"
+        "        self.radius = radius\n\n"
+        "    def area(self):\n"
+        "        return 3 * self.radius * self.radius\n"
+    )
+    tests = root / "tests"
+    tests.mkdir()
+    (tests / "test_shapes.py").write_text(
+        "from geom.shapes import Circle\n\n"
+        "def test_area():\n"
+        "    assert Circle(2).area() == 12\n" + extra_test
+    )
+    (tests / "test_more.py").write_text(
+        "from geom.shapes import Circle\n\ndef test_radius():\n    assert Circle(1).radius == 1\n"
+    )
+    return package, tests
+
+
+def test_verify_passes(tmp_path):
+    package, tests = _make_project(tmp_path)
+    mutator = Mutator(seed=1, intensity=5, internal_prefixes=["geom"])
+    report = verify_package(package, tests, mutator=mutator, workers=2)
+
+    assert report.ok
+    assert report.pass_rate == 1.0
+    assert report.baseline == report.mutated
+    assert set(report.baseline.values()) == {PASSED}
+    assert len(report.baseline) == 2
+
+
+def test_verify_catches_external_import_rename(tmp_path):
+    # Without the internal prefix, 'from geom.shapes import Circle' is kept but uses are renamed
+    package, tests = _make_project(tmp_path)
+    report = verify_package(package, tests, seed=1, workers=2)
+    assert not report.ok
+    assert report.pass_rate == 0.0
+
+
+def test_verify_reports_regressions(tmp_path):
+    # Looking a method up by string is exactly what renaming breaks
+    extra = "\ndef test_dynamic():\n    assert getattr(Circle(1), 'area')() == 3\n"
+    package, tests = _make_project(tmp_path, extra)
+
+    report = verify_package(package, tests, seed=1, internal_prefixes=["geom"], workers=2)
+
+    assert not report.ok
+    assert report.regressions == ["tests.test_shapes::test_dynamic"]
+    assert "passed -> failed" in report.format()
+
+
+def test_shard_files_balances(tmp_path):
+    files = []
+    for i, size in enumerate([50, 10, 10, 30]):
+        path = tmp_path / f"test_{i}.py"
+        path.write_text("x" * size)
+        files.append(path)
+    shards = shard_files(files, 2)
+    assert sorted(len(s) for s in shards) == [1, 3]
+
+
+def test_verify_cli(tmp_path, capsys):
+    package, tests = _make_project(tmp_path)
+    argv = ["verify", "--target", str(package), "--tests", str(tests), "--internal-prefix", "geom"]
+    assert main(argv) == 0
+    assert "Pass rate vs baseline: 100.0%" in capsys.readouterr().out